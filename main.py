@@ -1,40 +1,66 @@
 # main.py
+import time
+_inicio = time.perf_counter()
+
 import threading
 import asyncio
-from pulsenlp.dashboard import criar_dashboard
+from pulsenlp.dashboard import criar_dashboard, iniciar_observador
 from pulsenlp.simulation_module.async_runner import main as async_main
+from pulsenlp.nlp_module.models import warm_up
+from pulsenlp.nlp_module.sentiment_server import iniciar_servidor as iniciar_servidor_sentimento
+from pulsenlp.storage_module.comment_repository import ARQUIVO_PADRAO, remover
 import os
+import shutil
 
-json_path = "pulsenlp/data.json"
+json_path = os.path.join("pulsenlp", ARQUIVO_PADRAO)
+arrow_dir = os.path.join("pulsenlp", "data_arrow")
 topico_path  = "pulsenlp/topico.json"
 
 # Config do dashboard
-app = criar_dashboard(
-    json_path,
-    col_linha_x="round",
-    col_linha_y="rating",
-    col_barra_x="rating",
-    col_barra_y="nome",
-    colunas_filtros_linha=["round"],
-    colunas_filtro_barra=["nome"],
-    col_wordcloud="texto"
-)
-
-app.gatilho = {"atualizar": 0}  # inicializa contador interno
+def criar_app():
+    # Só depois de limpar o log: o canal de eventos e os caches partem do estado atual
+    app = criar_dashboard(
+        json_path,
+        col_linha_x="round",
+        col_linha_y="rating",
+        col_barra_x="rating",
+        col_barra_y="nome",
+        colunas_filtros_linha=["round"],
+        colunas_filtro_barra=["nome"],
+        col_wordcloud="texto",
+        columnar_dir=arrow_dir,
+    )
+    app.gatilho = {"atualizar": 0}  # inicializa contador interno
+    return app
 
 # Função wrapper para rodar o async_runner
 def rodar_async_runner():
     asyncio.run(async_main())   # main() do async_runner deve ser async
 
 if __name__ == "__main__":
-    if os.path.exists(json_path):
-        os.remove(json_path)
+    remover(json_path)
+    # A cópia colunar vai junto com o log: segmentos de uma execução anterior nunca são servidos
+    shutil.rmtree(arrow_dir, ignore_errors=True)
     if os.path.exists(topico_path):
         os.remove(topico_path)
-        
+    app = criar_app()
+
+    # 0) Modelos carregam em background enquanto o servidor sobe
+    warm_up(background=True)
+    # Modelo de sentimento compartilhado com outros processos (ex.: Reflex) via socket Unix
+    iniciar_servidor_sentimento()
+    print(f"[INFO] Inicialização até o servidor: {time.perf_counter() - _inicio:.2f}s")
+
     # 1) Start async_runner em thread separada
     t = threading.Thread(target=rodar_async_runner, daemon=True)
     t.start()
 
-    # 2) Start dashboard
-    app.run_server(debug=True, use_reloader=False)  
\ No newline at end of file
+    # 2) Observador do arquivo de comentários alimenta o canal de push do dashboard
+    observer = iniciar_observador(app, path=json_path)
+
+    # 3) Start dashboard
+    try:
+        app.run_server(debug=True, use_reloader=False)
+    finally:
+        observer.stop()
+        observer.join()  
\ No newline at end of file
@@ -0,0 +1,36 @@
+// Recebe os avisos de comentários novos do servidor via Server-Sent Events (/api/eventos).
+// O callback clientside "push.verificar" só repassa ao dcc.Store "gatilho-update"
+// o número do último evento: os callbacks do servidor leem os dados do cache,
+// então o texto dos comentários não volta ao servidor a cada atualização.
+// Um evento "resync" (log recriado ou histórico perdido) pede aos callbacks
+// que redesenhem tudo em vez de estender.
+window.pulsenlpPush = {seq: 0, resync: false};
+
+(function conectar() {
+    if (!window.EventSource) {
+        return;
+    }
+    var fonte = new EventSource("/api/eventos");
+    fonte.onmessage = function (evento) {
+        var msg = JSON.parse(evento.data);
+        window.pulsenlpPush.seq = msg.seq;
+        if (msg.resync) {
+            window.pulsenlpPush.resync = true;
+        }
+    };
+    // O EventSource reconecta sozinho, enviando o Last-Event-ID
+})();
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    push: {
+        verificar: function (_n, atual) {
+            var push = window.pulsenlpPush;
+            if (!push.resync && atual && atual.seq === push.seq) {
+                return window.dash_clientside.no_update;
+            }
+            var resposta = {seq: push.seq, resync: push.resync};
+            push.resync = false;
+            return resposta;
+        }
+    }
+});
@@ -0,0 +1,76 @@
+# Fila de micro-batching: junta pedidos concorrentes em um único lote
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Callable, List
+
+
+class MicroBatcher:
+    """
+    Agrupa itens enviados por vários produtores e processa em lotes.
+
+    Cada submit() devolve um Future. Uma thread de fundo esvazia a fila quando
+    o lote atinge max_batch_size ou quando o item mais antigo espera max_wait
+    segundos, e chama batch_fn uma única vez com todos os itens do lote.
+    batch_fn deve devolver uma lista de resultados na mesma ordem da entrada.
+    """
+
+    def __init__(self, batch_fn: Callable[[list], list], max_batch_size: int = 32, max_wait: float = 0.02):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._fila = queue.Queue()
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, item) -> Future:
+        """Enfileira um item e devolve um Future com o resultado."""
+        if self._parar.is_set():
+            raise RuntimeError("MicroBatcher já foi encerrado")
+        futuro = Future()
+        self._fila.put((item, futuro))
+        return futuro
+
+    def _coletar_lote(self) -> List[tuple]:
+        try:
+            lote = [self._fila.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+
+        # Depois do prazo ainda leva o que já está na fila, sem esperar mais
+        # (com max_wait=0 o lote é só o que se acumulou enquanto o anterior rodava)
+        prazo = time.monotonic() + self.max_wait
+        while len(lote) < self.max_batch_size:
+            restante = prazo - time.monotonic()
+            try:
+                lote.append(self._fila.get(timeout=restante) if restante > 0 else self._fila.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+    def _loop(self):
+        while not (self._parar.is_set() and self._fila.empty()):
+            lote = self._coletar_lote()
+            if not lote:
+                continue
+
+            itens = [item for item, _ in lote]
+            try:
+                resultados = list(self.batch_fn(itens))
+                if len(resultados) != len(itens):
+                    # Sem isso o zip abaixo deixaria Futures sem resposta para sempre
+                    raise ValueError(f"batch_fn devolveu {len(resultados)} resultados para {len(itens)} itens")
+            except Exception as e:
+                for _, futuro in lote:
+                    futuro.set_exception(e)
+                continue
+
+            for (_, futuro), resultado in zip(lote, resultados):
+                futuro.set_result(resultado)
+
+    def close(self, timeout: float = None):
+        """Processa o que restou na fila e encerra a thread de fundo."""
+        self._parar.set()
+        self._thread.join(timeout)
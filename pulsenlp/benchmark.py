@@ -0,0 +1,519 @@
+# Benchmarks dos caminhos críticos de NLP e armazenamento, com saída em JSON
+#
+#   python -m pulsenlp.benchmark                       # tudo, tamanhos padrão
+#   python -m pulsenlp.benchmark --so append --linhas 1000 10000
+#   python -m pulsenlp.benchmark --comparar antes.json depois.json
+import os
+
+# Cada execução mede o custo real: sem cache em disco, sem cache de
+# sentimento e sem servidor compartilhado (podem ser ligados pelo ambiente)
+os.environ.setdefault("PULSENLP_NLP_CACHE", "")
+os.environ.setdefault("PULSENLP_SENTIMENT_CACHE_ENTRIES", "0")
+os.environ.setdefault("PULSENLP_SENTIMENT_SERVER", "off")
+
+import gc
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+import traceback
+from datetime import datetime, timezone
+
+RESULTADOS_DIR = "bench_results"
+BENCHMARKS = ("process", "sentimento", "nuvem", "append", "dash")
+
+# --------------------------------- corpus ---------------------------------
+
+SUJEITOS = [
+    "o governo", "a prefeitura", "o time", "a torcida", "o técnico", "a empresa", "o aplicativo",
+    "a escola", "o hospital", "a nova lei", "o presidente", "a ministra", "o banco", "a loja",
+    "o jogador", "a imprensa", "o professor", "a universidade", "o mercado", "a polícia",
+]
+VERBOS = [
+    "anunciou", "criticou", "defendeu", "adiou", "melhorou", "piorou", "aprovou", "rejeitou",
+    "ignorou", "elogiou", "cancelou", "ampliou", "reduziu", "explicou", "prometeu", "atrasou",
+]
+OBJETOS = [
+    "o reajuste dos salários", "a reforma da previdência", "o horário do ônibus", "a final do campeonato",
+    "o preço da gasolina", "as regras do imposto", "o atendimento ao cliente", "a vacinação nas escolas",
+    "o novo estádio", "a segurança no bairro", "o aumento da conta de luz", "a obra da avenida",
+    "o contrato do atacante", "a greve dos professores", "o plano de saúde", "a taxa de juros",
+]
+QUALIFICADORES = [
+    "e isso foi ótimo", "e ninguém entendeu nada", "o que é uma vergonha", "finalmente",
+    "de novo", "sem explicação nenhuma", "e eu adorei", "e o povo ficou revoltado",
+    "como sempre", "e ficou bem melhor", "mas ainda falta muito", "e foi um desastre",
+    "kkkkk", "que absurdo", "parabéns a todos", "não sei o que pensar",
+]
+NOMES = ["Arnaldo", "Beatriz", "Carlos", "Daniela", "Eduardo", "Fernanda", "Gustavo", "Helena"]
+ESTILOS = ["Formal", "Informal", "Técnico", "Irônico"]
+TONS = ["Amigável", "Agressivo", "Neutro", "Entusiasmado"]
+TOPICOS = ["política", "esporte", "economia", "tecnologia"]
+
+
+def gerar_corpus(n: int, seed: int = 42, min_frases: int = 1, max_frases: int = 3) -> list:
+    """Comentários sintéticos em português, reproduzíveis pela seed."""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(n):
+        frases = []
+        for _ in range(rng.randint(min_frases, max_frases)):
+            frase = f"{rng.choice(SUJEITOS)} {rng.choice(VERBOS)} {rng.choice(OBJETOS)} {rng.choice(QUALIFICADORES)}"
+            frases.append(frase[0].upper() + frase[1:] + rng.choice([".", "!", "...", "?"]))
+        corpus.append(" ".join(frases))
+    return corpus
+
+
+def gerar_comentarios(n: int, seed: int = 42) -> list:
+    """Registros no formato do repositório (sem round), com rating sintético."""
+    rng = random.Random(seed)
+    return [
+        {
+            "nome": rng.choice(NOMES),
+            "style": rng.choice(ESTILOS),
+            "tone": rng.choice(TONS),
+            "texto": texto,
+            "rating": round(rng.uniform(-1, 1), 4),
+            "topic": rng.choice(TOPICOS),
+        }
+        for texto in gerar_corpus(n, seed)
+    ]
+
+# -------------------------------- medições --------------------------------
+
+def _percentil(ordenados: list, p: float) -> float:
+    if len(ordenados) == 1:
+        return ordenados[0]
+    posicao = (len(ordenados) - 1) * p / 100
+    i = int(posicao)
+    fracao = posicao - i
+    return ordenados[i] + (ordenados[min(i + 1, len(ordenados) - 1)] - ordenados[i]) * fracao
+
+
+def resumir(tempos: list, itens: int = None) -> dict:
+    """Estatísticas de uma lista de durações em segundos; `itens` dá a vazão total."""
+    if not tempos:
+        return {"n": 0}
+    ordenados = sorted(tempos)
+    total = sum(tempos)
+    resumo = {
+        "n": len(tempos),
+        "total_s": total,
+        "media_ms": statistics.fmean(tempos) * 1000,
+        "p50_ms": _percentil(ordenados, 50) * 1000,
+        "p90_ms": _percentil(ordenados, 90) * 1000,
+        "p99_ms": _percentil(ordenados, 99) * 1000,
+        "max_ms": ordenados[-1] * 1000,
+    }
+    itens = len(tempos) if itens is None else itens
+    if total > 0:
+        resumo["itens_por_s"] = itens / total
+    return resumo
+
+
+def cronometrar(funcao, *args, **kwargs) -> tuple:
+    """(resultado, segundos) de uma chamada."""
+    inicio = time.perf_counter()
+    resultado = funcao(*args, **kwargs)
+    return resultado, time.perf_counter() - inicio
+
+
+def _limpar_caches_nlp():
+    # Recomeça sem anotações em memória, para que cada variante pague o spaCy
+    from pulsenlp.nlp_module import preprocessing
+
+    preprocessing._cache = None
+
+# ------------------------------- benchmarks -------------------------------
+
+def bench_process(tamanho: int, batch_size: int = 64) -> dict:
+    """preprocessing.process texto a texto contra process_batch no mesmo volume."""
+    from pulsenlp.nlp_module.models import get_nlp
+    from pulsenlp.nlp_module.preprocessing import process, process_batch
+
+    _, carga = cronometrar(get_nlp)
+    process("Aquecimento do modelo.")
+
+    _limpar_caches_nlp()
+    corpus = gerar_corpus(tamanho, seed=1)
+    tempos = [cronometrar(process, texto)[1] for texto in corpus]
+    individual = resumir(tempos)
+
+    # Outra seed: o lote não pode reaproveitar nada do cache da rodada anterior
+    _limpar_caches_nlp()
+    corpus = gerar_corpus(tamanho, seed=2)
+    _, total = cronometrar(process_batch, corpus, batch_size=batch_size)
+    lote = {"total_s": total, "itens_por_s": tamanho / total if total else None, "batch_size": batch_size}
+
+    return {
+        "tamanho": tamanho,
+        "carga_modelo_s": carga,
+        "individual": individual,
+        "lote": lote,
+        "aceleracao_lote": lote["itens_por_s"] / individual["itens_por_s"] if lote["itens_por_s"] else None,
+    }
+
+
+def bench_sentimento(tamanho: int, batch_size: int = 32) -> dict:
+    """Latência por comentário de sentiment_analysis e vazão de sentiment_analysis_batch."""
+    from pulsenlp.nlp_module.models import SENTIMENT_MODEL, get_sentiment_analyzer
+    from pulsenlp.nlp_module.sentiment import sentiment_analysis, sentiment_analysis_batch
+    from pulsenlp.nlp_module.sentiment_backends import SENTIMENT_BACKEND
+
+    _, carga = cronometrar(get_sentiment_analyzer)
+    sentiment_analysis("Aquecimento do modelo.")
+
+    corpus = gerar_corpus(tamanho, seed=3)
+    tempos = [cronometrar(sentiment_analysis, texto)[1] for texto in corpus]
+
+    corpus = gerar_corpus(tamanho, seed=4)
+    _, total = cronometrar(sentiment_analysis_batch, corpus, batch_size=batch_size)
+
+    return {
+        "tamanho": tamanho,
+        "modelo": SENTIMENT_MODEL,
+        "backend": SENTIMENT_BACKEND,
+        "carga_modelo_s": carga,
+        "individual": resumir(tempos),
+        "lote": {"total_s": total, "itens_por_s": tamanho / total if total else None, "batch_size": batch_size},
+    }
+
+
+def bench_nuvem(tamanhos: list) -> dict:
+    """gerar_nuvem_palavras_base64 do zero e depois com 10% de comentários novos (contagem incremental)."""
+    import pandas as pd
+    from pulsenlp.wordcloud_gen import FrequenciasIncrementais, gerar_nuvem_palavras_base64
+
+    resultados = {}
+    for tamanho in tamanhos:
+        _limpar_caches_nlp()
+        df = pd.DataFrame({"texto": gerar_corpus(tamanho, seed=5)})
+        frequencias = FrequenciasIncrementais()
+        imagem, frio = cronometrar(gerar_nuvem_palavras_base64, df, "texto", frequencias)
+
+        novos = pd.DataFrame({"texto": gerar_corpus(max(1, tamanho // 10), seed=6)})
+        df = pd.concat([df, novos], ignore_index=True)
+        _, incremental = cronometrar(gerar_nuvem_palavras_base64, df, "texto", frequencias)
+
+        resultados[str(tamanho)] = {"frio_s": frio, "incremental_s": incremental, "bytes_imagem": len(imagem)}
+    return resultados
+
+
+def _gravador():
+    # append_comment_to_json importa o gerador de pensamentos (agno); sem ele,
+    # grava direto no repositório, que é o que a função faz com rating pronto
+    try:
+        from pulsenlp.simulation_module.async_runner import append_comment_to_json
+    except ImportError as e:
+        from pulsenlp.storage_module.comment_repository import get_repositorio
+
+        def gravar(c: dict, path: str):
+            get_repositorio(path).append(c)
+        return gravar, f"get_repositorio().append ({e})"
+
+    def gravar(c: dict, path: str):
+        append_comment_to_json(c["nome"], c["style"], c["tone"], c["texto"], c["topic"], rating=c["rating"], path=path)
+    return gravar, "append_comment_to_json"
+
+
+def bench_append(linhas: list, backends: list = ("jsonl", "sqlite")) -> dict:
+    """
+    Custo de gravar e reler N comentários em cada backend do repositório.
+
+    O rating já vem pronto, então só o armazenamento é medido. Também mede a
+    leitura completa e a leitura incremental das últimas 100 linhas.
+    """
+    from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+
+    gravar, via = _gravador()
+    diretorio = tempfile.mkdtemp(prefix="pulsenlp-bench-")
+    resultados = {"via": via}
+    try:
+        for backend in backends:
+            extensao = "sqlite" if backend == "sqlite" else "jsonl"
+            for n in linhas:
+                path = os.path.join(diretorio, f"bench-{n}.{extensao}")
+                comentarios = gerar_comentarios(n, seed=7)
+
+                repo = get_repositorio(path)
+                tempos, cursor = [], 0
+                for i, c in enumerate(comentarios):
+                    if i == n - 100:
+                        # Cursor de antes das 100 últimas linhas (offset no JSON Lines, round no SQLite)
+                        cursor = repo.estado()[1]
+                    tempos.append(cronometrar(gravar, c, path)[1])
+
+                todos, leitura = cronometrar(repo.ler_todos)
+                _, cursor_final = repo.estado()
+                (novos, _), incremental = cronometrar(repo.ler_desde, cursor)
+
+                resultados[f"{backend}/{n}"] = {
+                    "escrita": resumir(tempos),
+                    "leitura_total_s": leitura,
+                    "leitura_incremental_s": incremental,
+                    "linhas_lidas": len(todos),
+                    "linhas_incrementais": len(novos),
+                    "bytes": sum(os.path.getsize(path + s) for s in ("", "-wal") if os.path.exists(path + s)),
+                    "cursor_final": cursor_final,
+                }
+                remover(path)
+                gc.collect()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return resultados
+
+
+def _saidas(chave: str):
+    # "..a.b...c.d.." (várias saídas) ou "a.b" (uma saída) -> ([(id, prop)], multiplas)
+    if chave.startswith(".."):
+        return [tuple(parte.rsplit(".", 1)) for parte in chave.strip(".").split("...")], True
+    return [tuple(chave.rsplit(".", 1))], False
+
+
+class _NavegadorDash:
+    """
+    Simula o navegador chamando os callbacks do Dash pelo test_client do Flask.
+
+    Guarda os valores devolvidos pelos callbacks (stores, figuras) e os
+    reenvia como inputs/states nas chamadas seguintes, como o front-end faz.
+    Cada chamada informa se deu certo: 200, ou 204 (PreventUpdate, nada a
+    enviar); qualquer outro status é erro e não entra nas medidas de tempo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.cliente = app.server.test_client()
+        self.valores = {}
+        self.cliente.get("/")
+
+    def _valor(self, id_: str, prop: str):
+        return self.valores.get((id_, prop))
+
+    def chamar(self, chave: str, spec: dict, disparado_por: str = None) -> dict:
+        saidas, multiplas = _saidas(chave)
+        inputs = [{"id": i["id"], "property": i["property"], "value": self._valor(i["id"], i["property"])} for i in spec["inputs"]]
+        estado = [{"id": s["id"], "property": s["property"], "value": self._valor(s["id"], s["property"])} for s in spec.get("state", [])]
+        corpo = {
+            "output": chave,
+            "outputs": [{"id": i, "property": p} for i, p in saidas] if multiplas else {"id": saidas[0][0], "property": saidas[0][1]},
+            "inputs": inputs,
+            "state": estado,
+            "changedPropIds": [disparado_por or f"{inputs[0]['id']}.{inputs[0]['property']}"],
+        }
+        inicio = time.perf_counter()
+        resposta = self.cliente.post("/_dash-update-component", json=corpo)
+        duracao = time.perf_counter() - inicio
+
+        if resposta.status_code == 200:
+            for id_, props in resposta.get_json().get("response", {}).items():
+                for prop, valor in props.items():
+                    self.valores[(id_, prop)] = valor
+        ok = resposta.status_code in (200, 204)
+        return {"segundos": duracao, "status": resposta.status_code, "bytes": len(resposta.data), "ok": ok}
+
+
+def bench_dash(tamanho: int, atualizacoes: int = 5, novas: int = 50) -> dict:
+    """
+    Custo dos callbacks de atualização do dashboard.
+
+    Monta o app do main.py sobre um log sintético de `tamanho` comentários,
+    faz a carga inicial e depois `atualizacoes` rodadas com `novas` linhas
+    gravadas antes de cada uma, medindo cada callback disparado pelo gatilho.
+    """
+    from pulsenlp.dashboard import criar_dashboard
+    from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+
+    diretorio = tempfile.mkdtemp(prefix="pulsenlp-bench-")
+    path = os.path.join(diretorio, "data.jsonl")
+    try:
+        repo = get_repositorio(path)
+        repo.append_many(gerar_comentarios(tamanho, seed=8))
+
+        app, montagem = cronometrar(
+            criar_dashboard,
+            path,
+            col_linha_x="round",
+            col_linha_y="rating",
+            col_barra_x="rating",
+            col_barra_y="nome",
+            colunas_filtros_linha=["round"],
+            colunas_filtro_barra=["nome"],
+            col_wordcloud="texto",
+        )
+        navegador = _NavegadorDash(app)
+
+        # Só os callbacks de servidor que reagem ao gatilho de atualização
+        callbacks = {
+            chave: spec for chave, spec in app.callback_map.items()
+            if "callback" in spec and any(i["id"] == "gatilho-update" for i in spec["inputs"])
+        }
+
+        def rodada(numero: int) -> dict:
+            # Mesmo formato que o push.js entrega ao dcc.Store
+            navegador.valores[("gatilho-update", "data")] = {"seq": numero, "resync": False}
+            return {chave: navegador.chamar(chave, spec, "gatilho-update.data") for chave, spec in callbacks.items()}
+
+        inicial = rodada(1)
+        incrementais = []
+        for i in range(atualizacoes):
+            repo.append_many(gerar_comentarios(novas, seed=100 + i))
+            incrementais.append(rodada(i + 2))
+
+        # Respostas de erro (ex.: 500) são contadas à parte: o tempo de um
+        # traceback não é comparável ao de um callback que terminou
+        por_callback = {}
+        for chave in callbacks:
+            medidas = [r[chave] for r in incrementais]
+            certas = [m for m in medidas if m["ok"]]
+            erros = sum(not m["ok"] for m in [inicial[chave]] + medidas)
+            por_callback[chave] = {
+                "status": sorted({inicial[chave]["status"]} | {m["status"] for m in medidas}),
+                "erros": erros,
+            }
+            if erros:
+                continue
+            por_callback[chave].update({
+                "inicial_s": inicial[chave]["segundos"],
+                "inicial_bytes": inicial[chave]["bytes"],
+                "incremental": resumir([m["segundos"] for m in certas]),
+                "bytes_medio": statistics.fmean(m["bytes"] for m in certas) if certas else None,
+            })
+
+        com_erro = sorted(chave for chave, c in por_callback.items() if c["erros"])
+        if com_erro:
+            print(f"[AVISO] Callbacks com erro, fora das medidas de tempo: {', '.join(com_erro)}")
+        resultado = {
+            "tamanho": tamanho,
+            "novas_por_atualizacao": novas,
+            "montagem_app_s": montagem,
+            "callbacks_com_erro": com_erro,
+            "callbacks": por_callback,
+        }
+        if not com_erro:
+            # Totais por rodada só quando todos os callbacks responderam
+            resultado["rodada_inicial_s"] = sum(m["segundos"] for m in inicial.values())
+            resultado["rodada_incremental"] = resumir([sum(m["segundos"] for m in r.values()) for r in incrementais])
+        return resultado
+    finally:
+        remover(path)
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+# --------------------------------- execução --------------------------------
+
+def _git(*args) -> str:
+    try:
+        return subprocess.run(["git", *args], capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def metadados(args) -> dict:
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD") or None,
+        "alteracoes_locais": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "parametros": vars(args),
+        "ambiente": {k: v for k, v in sorted(os.environ.items()) if k.startswith("PULSENLP_")},
+    }
+
+
+def executar(args) -> dict:
+    planos = {
+        "process": lambda: bench_process(args.tamanho),
+        "sentimento": lambda: bench_sentimento(args.tamanho),
+        "nuvem": lambda: bench_nuvem(args.nuvem),
+        "append": lambda: bench_append(args.linhas, args.backends),
+        "dash": lambda: bench_dash(args.tamanho_dash, args.atualizacoes, args.novas),
+    }
+    resultado = {"meta": metadados(args), "benchmarks": {}}
+    for nome in args.so or BENCHMARKS:
+        print(f"[INFO] Benchmark {nome}...")
+        try:
+            resultado["benchmarks"][nome], duracao = cronometrar(planos[nome])
+            print(f"[INFO] {nome} concluído em {duracao:.1f}s")
+        except Exception as e:
+            # Um benchmark sem dependência (modelo do spaCy, pysentimiento) não derruba os outros
+            print(f"[ERRO] Benchmark {nome} falhou: {e}")
+            resultado["benchmarks"][nome] = {"erro": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc(limit=3)}
+    return resultado
+
+
+def _metricas(dados, prefixo: str = "") -> dict:
+    """Achata o JSON em {caminho: valor} só com as métricas de tempo e vazão (ignora medidas com erros)."""
+    planas = {}
+    if isinstance(dados, dict):
+        if dados.get("erros") or "erro" in dados:
+            return planas
+        for chave, valor in dados.items():
+            planas.update(_metricas(valor, f"{prefixo}{chave}/"))
+    elif isinstance(dados, (int, float)) and not isinstance(dados, bool):
+        nome = prefixo.rstrip("/").rsplit("/", 1)[-1]
+        if nome.endswith(("_s", "_ms", "_por_s")):
+            planas[prefixo.rstrip("/")] = dados
+    return planas
+
+
+def comparar(antes_path: str, depois_path: str, limiar: float = 0.05):
+    """Imprime a variação de cada métrica entre duas execuções (vazão: maior é melhor)."""
+    with open(antes_path, encoding="utf-8") as f:
+        antes = json.load(f)
+    with open(depois_path, encoding="utf-8") as f:
+        depois = json.load(f)
+
+    print(f"antes:  {antes['meta'].get('commit')} ({antes['meta'].get('data')})")
+    print(f"depois: {depois['meta'].get('commit')} ({depois['meta'].get('data')})")
+    m_antes, m_depois = _metricas(antes["benchmarks"]), _metricas(depois["benchmarks"])
+    for chave in sorted(m_antes.keys() & m_depois.keys()):
+        a, d = m_antes[chave], m_depois[chave]
+        if not a:
+            continue
+        variacao = (d - a) / a
+        melhor = variacao > 0 if chave.endswith("_por_s") else variacao < 0
+        marca = "" if abs(variacao) < limiar else ("  melhor" if melhor else "  PIOR")
+        print(f"{chave:70s} {a:12.4f} -> {d:12.4f} ({variacao:+.1%}){marca}")
+    for chave in sorted(m_antes.keys() ^ m_depois.keys()):
+        print(f"{chave:70s} só em {'antes' if chave in m_antes else 'depois'}")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Benchmarks de NLP e armazenamento do PulseNLP")
+    parser.add_argument("--so", nargs="+", choices=BENCHMARKS, help="roda só estes benchmarks")
+    parser.add_argument("--tamanho", type=int, default=500, help="comentários nos benchmarks de process e sentimento")
+    parser.add_argument("--nuvem", type=int, nargs="+", default=[100, 1000, 5000], help="tamanhos de corpus da nuvem de palavras")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[1000, 10000, 100000], help="linhas gravadas no benchmark de append")
+    parser.add_argument("--backends", nargs="+", choices=("jsonl", "sqlite"), default=["jsonl", "sqlite"])
+    parser.add_argument("--tamanho-dash", type=int, default=10000, help="comentários já gravados quando o dashboard abre")
+    parser.add_argument("--atualizacoes", type=int, default=5, help="atualizações incrementais medidas no dashboard")
+    parser.add_argument("--novas", type=int, default=50, help="comentários novos antes de cada atualização do dashboard")
+    parser.add_argument("--saida", help=f"arquivo JSON de saída (padrão: {RESULTADOS_DIR}/<data>-<commit>.json)")
+    parser.add_argument("--comparar", nargs=2, metavar=("ANTES", "DEPOIS"), help="compara duas execuções e sai")
+    args = parser.parse_args(argv)
+
+    if args.comparar:
+        comparar(*args.comparar)
+        return
+
+    resultado = executar(args)
+    saida = args.saida
+    if not saida:
+        carimbo = datetime.now().strftime("%Y%m%d-%H%M%S")
+        saida = os.path.join(RESULTADOS_DIR, f"{carimbo}-{resultado['meta']['commit'] or 'sem-git'}.json")
+    diretorio = os.path.dirname(saida)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"[INFO] Resultados em {saida}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
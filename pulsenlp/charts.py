@@ -1,23 +1,65 @@
 import plotly.graph_objs as go
 import pandas as pd
 
-def gerar_grafico_linha(df, coluna_x, coluna_y):
+from pulsenlp.downsampling import reduzir, media_movel
+
+def gerar_grafico_linha(df, coluna_x, coluna_y, max_pontos=None, viewport=None, janela_media=None, metodo="lttb", media=None):
+    """
+    Gráfico de linha do sentimento.
+
+    Com max_pontos, a série é reduzida no servidor (LTTB ou min/max) dentro do
+    viewport (x0, x1) pedido; janela_media adiciona a média móvel como
+    segunda linha. `media` recebe a média já calculada (ex.: sobre a série
+    inteira, antes de cortar df). Eixo x não numérico (ex.: nome) é enviado sem redução.
+    """
+    x = df[coluna_x].to_numpy()
+    y = df[coluna_y].to_numpy()
+    numerico = pd.api.types.is_numeric_dtype(df[coluna_x])
+    x0, x1 = viewport if viewport else (None, None)
+
+    if media is None and janela_media:
+        media = media_movel(y, janela_media)
+    if numerico and (max_pontos or viewport):
+        x_linha, y_linha = reduzir(x, y, max_pontos, x0, x1, metodo)
+    else:
+        x_linha, y_linha = x, y
+
+    poucos_pontos = len(x_linha) <= 200
     fig = go.Figure()
     fig.add_trace(go.Scatter(
-        x=df[coluna_x],
-        y=df[coluna_y],
-        mode='lines+markers',
+        x=x_linha,
+        y=y_linha,
+        mode='lines+markers' if poucos_pontos else 'lines',
         line=dict(color='#4dabf7'),
         marker=dict(size=8)
     ))
+    if media is not None:
+        x_media, y_media = reduzir(x, media, max_pontos, x0, x1, metodo) if numerico else (x, media)
+        fig.add_trace(go.Scatter(
+            x=x_media,
+            y=y_media,
+            mode='lines',
+            name=f'Média móvel ({janela_media})',
+            line=dict(color='#ffa94d', width=2),
+        ))
+
+    eixo_x = dict(title=coluna_x, showgrid=False)
+    if len(x_linha) <= 30:
+        # Um tick por rodada só enquanto couber no eixo
+        eixo_x["dtick"] = 1
+    if viewport:
+        eixo_x["range"] = list(viewport)
+
     fig.update_layout(
         title='Análise de Sentimento x Rodada',
         template='plotly_dark',
         paper_bgcolor='#1A1B1E',
         plot_bgcolor='#1A1B1E',
         font=dict(color='white'),
-        xaxis=dict(title=coluna_x, showgrid=False, dtick=1),
+        xaxis=eixo_x,
         yaxis=dict(title=coluna_y, showgrid=False),
+        showlegend=media is not None,
+        uirevision='linha',
     )
     return fig
 
@@ -5,31 +5,40 @@ import dash
 from dash import dcc, html
 import dash_mantine_components as dmc
 import pandas as pd
-import json
 from typing import List
 from pulsenlp.charts import gerar_grafico_linha, gerar_grafico_barra
-from pulsenlp.wordcloud_gen import gerar_nuvem_palavras_base64
+from pulsenlp.downsampling import media_movel
+from pulsenlp.wordcloud_gen import FrequenciasIncrementais, RenderizadorNuvem
+from pulsenlp.storage_module.dataset_cache import DatasetCache, filtrar_df
+from pulsenlp.storage_module.aggregates import AggregateStore
+from pulsenlp.storage_module.columnar_store import ColumnarStore
+from pulsenlp.storage_module.comment_repository import ARQUIVO_PADRAO
+from pulsenlp.simulation_module.control import enviar_comando
+from pulsenlp.eventos import CanalEventos, registrar_rotas
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
 
-def ler_contador_json():
-    if os.path.exists("pulsenlp/data.json"):
-        return os.path.getmtime("pulsenlp/data.json")  
-    return 0
-
 class FileChangeHandler(FileSystemEventHandler):
-    def __init__(self, app):
+    def __init__(self, app, path=os.path.join("pulsenlp", ARQUIVO_PADRAO)):
         self.app = app
+        self.nome_arquivo = os.path.basename(path)
 
     def on_modified(self, event):
-        if event.src_path.endswith("data.json"):
+        # No SQLite as gravações caem no arquivo -wal
+        if os.path.basename(event.src_path).startswith(self.nome_arquivo):
             self.app.gatilho["atualizar"] += 1
-            print(f"⚡ data.json atualizado - gatilho agora {self.app.gatilho['atualizar']}")
+            # Empurra os comentários novos para os navegadores conectados
+            canal = getattr(self.app, "canal_eventos", None)
+            if canal is not None:
+                canal.notificar()
+
+    def on_created(self, event):
+        self.on_modified(event)
 
 
-def iniciar_observador(app, path="pulsenlp/data.json"):
-    event_handler = FileChangeHandler(app)
+def iniciar_observador(app, path=os.path.join("pulsenlp", ARQUIVO_PADRAO)):
+    event_handler = FileChangeHandler(app, path)
     observer = Observer()
     observer.schedule(event_handler, path=os.path.dirname(path), recursive=False)
     observer.start()
@@ -69,19 +78,42 @@ def criar_dashboard(
     colunas_filtros_linha: List[str],
     colunas_filtro_barra: List[str],
     col_wordcloud: str,
+    wordcloud_preset: str = "media",
+    wordcloud_formato: str = "webp",
+    janela_linha: int = None,
+    max_pontos_linha: int = 2000,
+    janela_media_linha: int = None,
+    metodo_reducao: str = "lttb",
+    columnar_dir: str = None,
 ):
     app = dash.Dash(__name__)
 
-    # Função para ler o JSON
-    def ler_json():
-        if os.path.exists(json_path):
-            with open(json_path, encoding="utf-8") as f:
-                return json.load(f)
-        return {"nome": ["Arnaldo"], "texto": ["arroba"], "style": ["Formal"], "tone": ["Amigável"], "rating": [0.0], "topic": ["esporte"], "round": [0]}
+    # Canal de push: o observador do arquivo alimenta, o navegador escuta via SSE
+    app.canal_eventos = CanalEventos(json_path)
+    registrar_rotas(app.server, app.canal_eventos)
+
+    # Cache compartilhado: cada atualização só lê os comentários novos do arquivo.
+    # Com columnar_dir, o histórico é carregado dos segmentos Arrow em vez do JSON.
+    cache = DatasetCache(
+        json_path,
+        placeholder={"nome": ["Arnaldo"], "texto": ["arroba"], "style": ["Formal"], "tone": ["Amigável"], "rating": [0.0], "topic": ["esporte"], "round": [0]},
+        columnar=ColumnarStore(columnar_dir) if columnar_dir else None,
+    )
+
+    def ler_json() -> pd.DataFrame:
+        return cache.get()
+
+    # Médias por agente/tópico/estilo/tom atualizadas em O(1) por comentário novo
+    agregados = AggregateStore()
+
+    def medias_por_agente(filtros: dict) -> pd.DataFrame:
+        agregados.acompanhar(json_path)
+        medias = agregados.means("nome", filtros)
+        nomes = sorted(medias, key=str)
+        return pd.DataFrame({"nome": nomes, "rating": [medias[n] for n in nomes]})
 
     # Carregar o arquivo JSON inicial
-    data = ler_json()
-    df = pd.DataFrame(data)
+    df = ler_json()
 
     print(df)
 
@@ -90,8 +122,11 @@ def criar_dashboard(
     nome = ultimo["nome"]
     texto = ultimo["texto"]
 
-    # Gerar wordcloud em base64
-    imagem_wordcloud = gerar_nuvem_palavras_base64(df, coluna=col_wordcloud)
+    # Wordcloud (frequências acumuladas entre atualizações). A primeira imagem
+    # vem do callback inicial, para o servidor subir sem esperar o spaCy carregar.
+    frequencias = FrequenciasIncrementais()
+    renderizador = RenderizadorNuvem(preset=wordcloud_preset, formato=wordcloud_formato)
+    imagem_wordcloud = None
 
     # Criar filtros (vazios no início)
     filtros_linha = criar_filtros(colunas_filtros_linha, id_prefix="filtro-linha")
@@ -103,7 +138,13 @@ def criar_dashboard(
         withGlobalStyles=True,
         withNormalizeCSS=True,
         children=[
-            dcc.Store(id="gatilho-update", data={"atualizar": 0}),
+            # Só {"seq", "resync"} do último evento (assets/push.js): os callbacks leem os dados do cache
+            dcc.Store(id="gatilho-update", data={"seq": 0, "resync": False}),
+            # O que cada navegador já tem nos gráficos, para mandar só as diferenças
+            dcc.Store(id="linha-ultimo-round", data=None),  # {"round", "identidade", "anexados"} da última figura enviada
+            dcc.Store(id="linha-viewport", data=None),
+            dcc.Store(id="barra-estado", data=None),
+            dcc.Store(id="wordcloud-hash", data=None),  # hash das frequências da imagem que a aba já tem
             dmc.Container(
                 [
                     dmc.Card(
@@ -207,7 +248,7 @@ def criar_dashboard(
                                             dmc.CardSection(id='filtros-linha', children=filtros_linha + [html.Div(style={"height": "15px"})]),
                                             dcc.Graph(
                                                 id="grafico-linha",
-                                                figure=gerar_grafico_linha(df, col_linha_x, col_linha_y),
+                                                figure=gerar_grafico_linha(df, col_linha_x, col_linha_y, max_pontos=max_pontos_linha),
                                                 style={"flex": "1 1 auto"},
                                             ),
                                         ],
@@ -256,19 +297,20 @@ def criar_dashboard(
                 fluid=True,
                 style={"backgroundColor": "#121212", "minHeight": "100vh", "paddingTop": "25px", "paddingBottom": "25px"},
             ),
-            # Intervalos
-            dcc.Interval(id="intervalo-arquivo", interval=10000, n_intervals=0),
+            # Verificação local (só no navegador) dos eventos recebidos via SSE
+            dcc.Interval(id="intervalo-push", interval=250, n_intervals=0),
         ],
     )
 
     # ------------------------ CALLBACKS -----------------------------
 
-    @app.callback(
+    # Só dispara os callbacks do servidor quando chegam comentários novos (assets/push.js)
+    app.clientside_callback(
+        dash.ClientsideFunction(namespace="push", function_name="verificar"),
         dash.Output("gatilho-update", "data"),
-        dash.Input("intervalo-arquivo", "n_intervals")
+        dash.Input("intervalo-push", "n_intervals"),
+        dash.State("gatilho-update", "data"),
     )
-    def atualizar_gatilho(_):
-        return ler_contador_json()
 
     @app.callback(
         dash.Output("input-topico", "value"),
@@ -287,70 +329,195 @@ def criar_dashboard(
             print("Número de agentes inválido.")
             return topico
 
-        dados_para_salvar = {
-            "topico": topico,
-            "num_users": num_users
-        }
-
+        # Vai direto para a simulação (fila em memória ou HTTP local); topico.json só como último recurso
+        comando = {"acao": "iniciar", "topico": topico, "num_users": num_users_int}
         try:
-            with open("pulsenlp/topico.json", "w", encoding="utf-8") as f:
-                json.dump(dados_para_salvar, f, ensure_ascii=False, indent=4)
-            print(f"Dados salvos com sucesso: {dados_para_salvar}")
+            meio = enviar_comando(comando)
+            print(f"Comando enviado ({meio}): {comando}")
         except IOError as e:
-            print(f"Erro ao salvar o arquivo: {e}")
+            print(f"Erro ao enviar comando: {e}")
 
         return topico
     
+    def aplicar_filtros(dff, colunas, filtros):
+        # Só para trechos já em memória (ex.: comentários novos); a série inteira passa por cache.filtrar
+        return filtrar_df(dff, dict(zip(colunas, filtros)))
+
+    def serie_filtrada(df_atual, identidade, colunas, filtros, colunas_saida):
+        # Com o ColumnarStore, o filtro roda nos segmentos Arrow e só o final do log no pandas
+        return cache.filtrar(df_atual, identidade, dict(zip(colunas, filtros)), colunas_saida)
+
+    def opcoes_filtro(col):
+        return [{"label": str(v), "value": str(v)} for v in cache.opcoes(col)]
+
+    def ler_viewport(relayout):
+        """Extrai o intervalo do eixo x de um relayoutData: (viewport, mexeu_no_eixo_x)."""
+        if not relayout:
+            return None, False
+        if relayout.get("xaxis.autorange"):
+            return None, True
+        if "xaxis.range[0]" in relayout:
+            return [relayout["xaxis.range[0]"], relayout["xaxis.range[1]"]], True
+        if "xaxis.range" in relayout:
+            return list(relayout["xaxis.range"]), True
+        return None, False
+
+    def media_da_serie(dff: pd.DataFrame):
+        """Média móvel da série filtrada inteira, antes do corte janela_linha (mesmas janelas na figura e no extendData)."""
+        return media_movel(dff[col_linha_y].to_numpy(), janela_media_linha)
+
+    def cauda_filtrada(df_atual: pd.DataFrame, fim: int, n: int, filtros) -> pd.DataFrame:
+        """Últimas n linhas filtradas antes da posição fim, lendo o log de trás para frente em blocos que dobram."""
+        bloco = max(n, 1)
+        while True:
+            inicio = max(fim - bloco, 0)
+            trecho = aplicar_filtros(df_atual.iloc[inicio:fim], colunas_filtros_linha, filtros)
+            if len(trecho) >= n or inicio == 0:
+                return trecho.tail(n)
+            bloco *= 2
+
     # Atualizar gráfico de linha (com filtros funcionando)
+    # Mudança de filtro, zoom ou carga inicial -> figura completa (reduzida no servidor);
+    # comentários novos -> extendData
     @app.callback(
-        dash.Output("grafico-linha", "figure"),
-        [dash.Input("gatilho-update", "data")] +
-        [dash.Input(f"filtro-linha-{i}", "value") for i in range(len(colunas_filtros_linha))]
+        [dash.Output("grafico-linha", "figure"),
+         dash.Output("grafico-linha", "extendData"),
+         dash.Output("linha-ultimo-round", "data"),
+         dash.Output("linha-viewport", "data")],
+        [dash.Input("gatilho-update", "data"),
+         dash.Input("grafico-linha", "relayoutData")] +
+        [dash.Input(f"filtro-linha-{i}", "value") for i in range(len(colunas_filtros_linha))],
+        [dash.State("linha-ultimo-round", "data"),
+         dash.State("linha-viewport", "data")],
     )
-    def update_grafico_linha(gatilho, *filtros):
-        data = ler_json()
-        df_atualizado = pd.DataFrame(data)
-        dff = df_atualizado.copy()
-
-        for col, val in zip(colunas_filtros_linha, filtros):
-            if val:
-                dff = dff[dff[col] == val]
-
-        return gerar_grafico_linha(dff, col_linha_x, col_linha_y)
+    def update_grafico_linha(gatilho, relayout, *args):
+        *filtros, estado_linha, viewport = args
+        df_atual, identidade = cache.get_versionado()
+        if df_atual.empty:
+            raise dash.exceptions.PreventUpdate
+        round_atual = int(df_atual["round"].iloc[-1])
+        # "anexados": pontos crus somados pelo extendData desde a última figura reduzida
+        estado_atual = {"round": round_atual, "identidade": identidade, "anexados": 0}
+
+        # O último round enviado só vale para os mesmos dados: com o log recriado
+        # (ou o placeholder ainda na tela) a figura inteira é refeita em vez de estendida
+        ultimo_round = None
+        if estado_linha and identidade is not None and estado_linha.get("identidade") == identidade:
+            ultimo_round = estado_linha["round"]
+            estado_atual["anexados"] = estado_linha.get("anexados", 0)
+
+        if dash.ctx.triggered_id == "grafico-linha":
+            # Zoom/pan: busca os pontos do novo intervalo com mais resolução
+            viewport, mexeu_x = ler_viewport(relayout)
+            if not mexeu_x:
+                raise dash.exceptions.PreventUpdate
+
+        elif dash.ctx.triggered_id == "gatilho-update" and ultimo_round is not None and not (gatilho or {}).get("resync"):
+            if round_atual <= ultimo_round:
+                raise dash.exceptions.PreventUpdate
+            # Rounds são crescentes no log: busca binária em vez de varrer o histórico
+            inicio = int(df_atual["round"].searchsorted(ultimo_round, side="right"))
+            novos = aplicar_filtros(df_atual.iloc[inicio:], colunas_filtros_linha, filtros)
+            if novos.empty:
+                return dash.no_update, dash.no_update, estado_atual, dash.no_update
+
+            # Os pontos anexados não passam pela redução: depois de max_pontos_linha
+            # deles, a figura é refeita (e reduzida) em vez de crescer sem limite
+            if estado_atual["anexados"] + len(novos) <= max_pontos_linha:
+                estado_atual["anexados"] += len(novos)
+                dados = {"x": [novos[col_linha_x].tolist()], "y": [novos[col_linha_y].tolist()]}
+                traces = [0]
+                if janela_media_linha:
+                    # Só as janela_media_linha - 1 linhas filtradas anteriores entram nas janelas dos pontos novos
+                    anteriores = cauda_filtrada(df_atual, inicio, janela_media_linha - 1, filtros)
+                    media = media_da_serie(pd.concat([anteriores, novos]))[-len(novos):]
+                    dados["x"].append(novos[col_linha_x].tolist())
+                    dados["y"].append(media.tolist())
+                    traces.append(1)
+                # maxPoints também limita o trace no navegador quando não há janela_linha
+                return dash.no_update, (dados, traces, janela_linha or 2 * max_pontos_linha), estado_atual, dash.no_update
+
+        dff = serie_filtrada(df_atual, identidade, colunas_filtros_linha, filtros, [col_linha_x, col_linha_y])
+        media = media_da_serie(dff) if janela_media_linha else None
+        if janela_linha:
+            dff = dff.tail(janela_linha)
+            media = media[-len(dff):] if media is not None else None
+        figura = gerar_grafico_linha(
+            dff, col_linha_x, col_linha_y,
+            max_pontos=max_pontos_linha,
+            viewport=viewport,
+            janela_media=janela_media_linha,
+            metodo=metodo_reducao,
+            media=media,
+        )
+        estado_atual["anexados"] = 0
+        return figura, dash.no_update, estado_atual, viewport
 
     # Atualizar gráfico de barra (com filtros funcionando)
+    # Comentários novos -> Patch apenas nas barras cujas médias mudaram
     @app.callback(
-        dash.Output("grafico-barra", "figure"),
+        [dash.Output("grafico-barra", "figure"),
+         dash.Output("barra-estado", "data")],
         [dash.Input("gatilho-update", "data")] +
-        [dash.Input(f"filtro-barra-{i}", "value") for i in range(len(colunas_filtro_barra))]
+        [dash.Input(f"filtro-barra-{i}", "value") for i in range(len(colunas_filtro_barra))],
+        dash.State("barra-estado", "data"),
     )
-    def update_grafico_barra(gatilho, *filtros):
-        data = ler_json()
-        df_atualizado = pd.DataFrame(data)
-        dff = df_atualizado.copy()
-
-        for col, val in zip(colunas_filtro_barra, filtros):
-            if val:
-                dff = dff[dff[col] == val]
-
-        df_media = dff.groupby("nome", as_index=False)["rating"].mean()
-        return gerar_grafico_barra(df_media, col_barra_x, col_barra_y)
+    def update_grafico_barra(gatilho, *args):
+        *filtros, estado = args
+        if all(col in agregados.dimensoes for col in colunas_filtro_barra):
+            df_media = medias_por_agente(dict(zip(colunas_filtro_barra, filtros)))
+        else:
+            # Filtro por coluna sem agregado (ex.: round): recalcula a partir das linhas
+            df_atual, identidade = cache.get_versionado()
+            dff = serie_filtrada(df_atual, identidade, colunas_filtro_barra, filtros, ["nome", "rating"])
+            df_media = dff.groupby("nome", as_index=False, observed=True)["rating"].mean()
+        medias = dict(zip(df_media["nome"], df_media["rating"]))
+
+        if dash.ctx.triggered_id != "gatilho-update" or estado is None or (gatilho or {}).get("resync"):
+            figura = gerar_grafico_barra(df_media, col_barra_x, col_barra_y)
+            return figura, {"ordem": df_media["nome"].tolist(), "medias": medias}
+
+        ordem = estado["ordem"]
+        patch = dash.Patch()
+        mudou = False
+        for linha in df_media.itertuples(index=False):
+            linha = linha._asdict()
+            nome = linha["nome"]
+            if nome in estado["medias"] and estado["medias"][nome] == linha["rating"]:
+                continue
+            mudou = True
+            if nome in estado["medias"]:
+                i = ordem.index(nome)
+                patch["data"][0]["x"][i] = linha[col_barra_x]
+                patch["data"][0]["y"][i] = linha[col_barra_y]
+            else:
+                patch["data"][0]["x"].append(linha[col_barra_x])
+                patch["data"][0]["y"].append(linha[col_barra_y])
+                ordem = ordem + [nome]
+
+        if not mudou:
+            raise dash.exceptions.PreventUpdate
+        return patch, {"ordem": ordem, "medias": medias}
 
     # Atualizar cards (wordcloud e último comentário)
     @app.callback(
         [dash.Output("imagem-wordcloud", "src"),
+         dash.Output("wordcloud-hash", "data"),
          dash.Output("nome-comentario", "children"),
          dash.Output("texto-comentario", "children")],
-        [dash.Input("gatilho-update", "data")]
+        [dash.Input("gatilho-update", "data")],
+        dash.State("wordcloud-hash", "data"),
     )
-    def update_cards(gatilho):
-        data = ler_json()
-        df_atualizado = pd.DataFrame(data)
+    def update_cards(gatilho, hash_cliente):
+        df_atualizado, identidade = cache.get_versionado()
         ultimo = df_atualizado.iloc[-1]
         nome = ultimo["nome"]
         texto = ultimo["texto"]
-        imagem_wordcloud = gerar_nuvem_palavras_base64(df_atualizado, coluna=col_wordcloud)
-        return imagem_wordcloud, nome, texto
+        chave, imagem_wordcloud = renderizador.renderizar(frequencias.atualizar(df_atualizado[col_wordcloud], identidade))
+        # A aba já tem a imagem destas frequências: não reenvia nada
+        if chave == hash_cliente:
+            return dash.no_update, dash.no_update, nome, texto
+        return imagem_wordcloud, chave, nome, texto
 
     # Atualizar opções dos filtros de linha dinamicamente
     for i, col in enumerate(colunas_filtros_linha):
@@ -360,11 +527,7 @@ def criar_dashboard(
             prevent_initial_call=False
         )
         def update_filtro_linha(gatilho, col=col):
-            data = ler_json()
-            df_atualizado = pd.DataFrame(data)
-            valores_unicos = df_atualizado[col].dropna().unique()
-            valores_unicos = sorted(valores_unicos)
-            return [{"label": str(v), "value": str(v)} for v in valores_unicos]
+            return opcoes_filtro(col)
 
     # Atualizar opções dos filtros de barra dinamicamente
     for i, col in enumerate(colunas_filtro_barra):
@@ -374,17 +537,13 @@ def criar_dashboard(
             prevent_initial_call=False
         )
         def update_filtro_barra(gatilho, col=col):
-            data = ler_json()
-            df_atualizado = pd.DataFrame(data)
-            valores_unicos = df_atualizado[col].dropna().unique()
-            valores_unicos = sorted(valores_unicos)
-            return [{"label": str(v), "value": str(v)} for v in valores_unicos]
+            return opcoes_filtro(col)
 
     return app
 
 # ------------------------------- TESTE LOCAL -----------------------------------
 
-json_path = "pulsenlp/data.json"
+json_path = os.path.join("pulsenlp", ARQUIVO_PADRAO)
 
 app = criar_dashboard(
     json_path,
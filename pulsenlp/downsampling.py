@@ -0,0 +1,84 @@
+# Redução de pontos no servidor para séries longas (LTTB, min/max) e médias móveis
+import numpy as np
+
+
+def recortar(x: np.ndarray, y: np.ndarray, x0=None, x1=None):
+    """Mantém só o trecho visível [x0, x1] (x crescente), com um ponto extra de cada lado para a linha não cortar."""
+    if x0 is None and x1 is None:
+        return x, y
+    inicio = 0 if x0 is None else max(int(np.searchsorted(x, x0, side="left")) - 1, 0)
+    fim = len(x) if x1 is None else min(int(np.searchsorted(x, x1, side="right")) + 1, len(x))
+    return x[inicio:fim], y[inicio:fim]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_saida: int):
+    """Largest-Triangle-Three-Buckets: escolhe n_saida pontos que preservam a forma visual da série."""
+    n = len(x)
+    if n_saida >= n or n_saida < 3:
+        return x, y
+
+    x = x.astype(float)
+    y = y.astype(float)
+    passo = (n - 2) / (n_saida - 2)
+    indices = np.empty(n_saida, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_saida - 2):
+        inicio = int(i * passo) + 1
+        fim = int((i + 1) * passo) + 1
+        prox_fim = min(int((i + 2) * passo) + 1, n)
+        media_x = x[fim:prox_fim].mean()
+        media_y = y[fim:prox_fim].mean()
+
+        # Área do triângulo (ponto escolhido anterior, candidato, média do próximo bucket)
+        area = np.abs((x[a] - media_x) * (y[inicio:fim] - y[a]) - (x[a] - x[inicio:fim]) * (media_y - y[a]))
+        a = inicio + int(np.argmax(area))
+        indices[i + 1] = a
+
+    return x[indices], y[indices]
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_saida: int):
+    """
+    Mantém o primeiro e o último ponto e divide o miolo em (n_saida - 2)/2
+    buckets, guardando o mínimo e o máximo de cada um (preserva picos).
+    """
+    n = len(x)
+    if n_saida >= n or n_saida < 2:
+        return x, y
+
+    limites = np.linspace(1, n - 1, (n_saida - 2) // 2 + 1).astype(int)
+    indices = [0]
+    for inicio, fim in zip(limites[:-1], limites[1:]):
+        if fim <= inicio:
+            continue
+        trecho = y[inicio:fim]
+        indices.extend(sorted({inicio + int(np.argmin(trecho)), inicio + int(np.argmax(trecho))}))
+    indices.append(n - 1)
+    indices = np.asarray(indices)
+    return x[indices], y[indices]
+
+
+METODOS = {"lttb": lttb, "minmax": minmax}
+
+
+def reduzir(x, y, max_pontos: int, x0=None, x1=None, metodo: str = "lttb"):
+    """Recorta a série no viewport pedido e reduz para no máximo max_pontos."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    x, y = recortar(x, y, x0, x1)
+    if max_pontos and len(x) > max_pontos:
+        x, y = METODOS[metodo](x, y, max_pontos)
+    return x, y
+
+
+def media_movel(y, janela: int) -> np.ndarray:
+    """Média móvel à direita via soma acumulada; os primeiros pontos usam a janela disponível."""
+    y = np.asarray(y, dtype=float)
+    if janela <= 1 or len(y) == 0:
+        return y
+    acumulada = np.concatenate(([0.0], np.cumsum(y)))
+    fim = np.arange(1, len(y) + 1)
+    inicio = np.maximum(fim - janela, 0)
+    return (acumulada[fim] - acumulada[inicio]) / (fim - inicio)
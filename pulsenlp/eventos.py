@@ -0,0 +1,123 @@
+# Canal de eventos para empurrar comentários novos ao navegador (SSE / long-poll)
+import json
+import threading
+from collections import deque
+
+import flask
+
+from pulsenlp.storage_module.comment_repository import get_repositorio
+
+
+class CanalEventos:
+    """
+    Transforma o crescimento do log de comentários em eventos numerados.
+
+    notificar() é chamado pelo observador do watchdog (ou pelo próprio escritor)
+    e lê só as linhas novas do arquivo; cada leitura com comentários novos vira
+    um evento (seq, [comentarios], resync). Os clientes esperam em esperar() sem
+    nenhum polling: quando nada muda, nenhuma thread acorda.
+
+    resync=True avisa que o cliente deve descartar o que tem e recarregar tudo:
+    é emitido quando o log é recriado e entregue a quem pede eventos que já
+    saíram do histórico (ou de uma execução anterior do servidor).
+    """
+
+    def __init__(self, path: str, historico: int = 256):
+        self.path = path
+        self._cond = threading.Condition()
+        self._eventos = deque(maxlen=historico)
+        self._seq = 0
+        self._repositorio = get_repositorio(path)
+        existentes = self._repositorio.ler_todos()
+        self.ultimo = existentes[-1] if existentes else None
+        self._identidade, self._offset = self._repositorio.estado()
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+    def notificar(self):
+        """Lê os comentários gravados desde a última notificação e acorda quem estiver esperando."""
+        with self._cond:
+            identidade, fim = self._repositorio.estado()
+            resync = identidade != self._identidade or fim < self._offset
+            if resync:
+                # Log recriado (mesmo que já maior que o offset antigo): recomeça do início
+                self._identidade = identidade
+                self._offset = 0
+                self.ultimo = None
+
+            novos, self._offset = self._repositorio.ler_desde(self._offset)
+            if not novos and not resync:
+                return
+
+            self._seq += 1
+            self._eventos.append((self._seq, novos, resync))
+            if novos:
+                self.ultimo = novos[-1]
+            self._cond.notify_all()
+
+    def esperar(self, desde: int, timeout: float = 25.0) -> list:
+        """Bloqueia até existir evento com seq > desde (ou até o timeout) e retorna esses eventos."""
+        with self._cond:
+            mais_antigo = self._eventos[0][0] if self._eventos else self._seq + 1
+            if desde > self._seq or desde < mais_antigo - 1:
+                # Cliente de uma execução anterior do servidor, ou eventos que já
+                # saíram do histórico: não dá para entregar só o delta
+                return [(self._seq, [], True)]
+            self._cond.wait_for(lambda: self._seq > desde, timeout=timeout)
+            return [evento for evento in self._eventos if evento[0] > desde]
+
+
+def _mensagem_sse(seq: int, comentarios: list, resync: bool = False) -> str:
+    dados = json.dumps({"seq": seq, "comentarios": comentarios, "resync": resync}, ensure_ascii=False, separators=(",", ":"))
+    return f"id: {seq}\ndata: {dados}\n\n"
+
+
+def registrar_rotas(server: flask.Flask, canal: CanalEventos):
+    """
+    Expõe o canal no servidor Flask do Dash.
+
+    - GET /api/eventos: Server-Sent Events; ao conectar, envia o último
+      comentário e depois só os deltas (retoma via Last-Event-ID, ou recebe
+      um evento com "resync": true se não houver como retomar);
+    - GET /api/eventos/poll?desde=N&timeout=25: long-poll em JSON, para
+      clientes sem EventSource.
+    """
+
+    @server.route("/api/eventos")
+    def eventos_sse():
+        desde = flask.request.headers.get("Last-Event-ID", type=int)
+
+        def gerar():
+            ultimo_visto = desde
+            if ultimo_visto is None:
+                ultimo_visto = canal.seq
+                yield _mensagem_sse(ultimo_visto, [canal.ultimo] if canal.ultimo else [])
+            while True:
+                eventos = canal.esperar(ultimo_visto, timeout=15.0)
+                if not eventos:
+                    # Mantém a conexão viva atrás de proxies
+                    yield ": ping\n\n"
+                    continue
+                for seq, comentarios, resync in eventos:
+                    yield _mensagem_sse(seq, comentarios, resync)
+                    ultimo_visto = seq
+
+        return flask.Response(
+            flask.stream_with_context(gerar()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    @server.route("/api/eventos/poll")
+    def eventos_poll():
+        desde = flask.request.args.get("desde", default=0, type=int)
+        timeout = min(flask.request.args.get("timeout", default=25.0, type=float), 60.0)
+        eventos = canal.esperar(desde, timeout=timeout)
+        resyncs = [i for i, (_, _, resync) in enumerate(eventos) if resync]
+        if resyncs:
+            # O que veio antes do último resync não vale mais
+            eventos = eventos[resyncs[-1]:]
+        comentarios = [c for _, lote, _ in eventos for c in lote]
+        return flask.jsonify({"seq": eventos[-1][0] if eventos else desde, "comentarios": comentarios, "resync": bool(resyncs)})
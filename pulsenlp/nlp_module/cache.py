@@ -0,0 +1,108 @@
+# Cache de anotações do spaCy endereçado pelo conteúdo do texto
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+CACHE_PATH = os.getenv("PULSENLP_NLP_CACHE", os.path.join("pulsenlp", "nlp_cache.sqlite"))
+CACHE_MAX_ENTRADAS = int(os.getenv("PULSENLP_NLP_CACHE_ENTRIES", "20000"))
+CACHE_MAX_BYTES = int(os.getenv("PULSENLP_NLP_CACHE_BYTES", str(64 * 1024 * 1024)))
+
+
+def normalizar_texto(text: str) -> str:
+    """Forma canônica para comparar textos: Unicode NFC e espaços colapsados (não é usada na chave)."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class AnnotationCache:
+    """
+    Cache de duas camadas para resultados de NLP.
+
+    A chave é o hash de (modelo, tipo de anotação, texto exato), então a
+    troca de modelo ou de versão nunca reaproveita resultados antigos. O texto
+    não é normalizado: sentenças e tokens SPACE dependem das quebras de linha e
+    dos espaços, então dois textos só dividem uma entrada se forem idênticos.
+    A primeira camada é um LRU em memória limitado por número de entradas e por
+    bytes (tamanho do JSON); a segunda é um arquivo SQLite que sobrevive a
+    reinícios do processo. Com path vazio, só a camada em memória é usada.
+    """
+
+    def __init__(self, model_id: str, path: str = CACHE_PATH, max_entradas: int = CACHE_MAX_ENTRADAS, max_bytes: int = CACHE_MAX_BYTES):
+        self.model_id = model_id
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._memoria = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+
+        if path:
+            diretorio = os.path.dirname(path)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS anotacoes (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+            self._db.commit()
+
+    def chave(self, tipo: str, text: str) -> str:
+        # "v2": chaves antigas eram do texto normalizado e não são mais lidas
+        bruto = f"v2\0{self.model_id}\0{tipo}\0{text}"
+        return hashlib.sha256(bruto.encode("utf-8")).hexdigest()
+
+    def _guardar_memoria(self, chave: str, valor_json: str):
+        if chave in self._memoria:
+            self._bytes -= len(self._memoria.pop(chave))
+        self._memoria[chave] = valor_json
+        self._bytes += len(valor_json)
+        while self._memoria and (len(self._memoria) > self.max_entradas or self._bytes > self.max_bytes):
+            _, antigo = self._memoria.popitem(last=False)
+            self._bytes -= len(antigo)
+
+    def get_many(self, tipo: str, texts: list) -> dict:
+        """Retorna {indice: valor} para os textos encontrados no cache."""
+        encontrados = {}
+        faltando = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                chave = self.chave(tipo, text)
+                if chave in self._memoria:
+                    self._memoria.move_to_end(chave)
+                    encontrados[i] = json.loads(self._memoria[chave])
+                else:
+                    faltando.setdefault(chave, []).append(i)
+
+            if self._db is not None and faltando:
+                chaves = list(faltando)
+                for inicio in range(0, len(chaves), 500):
+                    lote = chaves[inicio:inicio + 500]
+                    marcadores = ",".join("?" * len(lote))
+                    linhas = self._db.execute(f"SELECT chave, valor FROM anotacoes WHERE chave IN ({marcadores})", lote)
+                    for chave, valor_json in linhas:
+                        self._guardar_memoria(chave, valor_json)
+                        valor = json.loads(valor_json)
+                        for i in faltando[chave]:
+                            encontrados[i] = valor
+        return encontrados
+
+    def set_many(self, tipo: str, texts: list, valores: list):
+        with self._lock:
+            linhas = []
+            for text, valor in zip(texts, valores):
+                chave = self.chave(tipo, text)
+                valor_json = json.dumps(valor, ensure_ascii=False)
+                self._guardar_memoria(chave, valor_json)
+                linhas.append((chave, valor_json))
+
+            if self._db is not None and linhas:
+                self._db.executemany("INSERT OR REPLACE INTO anotacoes (chave, valor) VALUES (?, ?)", linhas)
+                self._db.commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,89 @@
+# Registro de modelos com carregamento preguiçoso (lazy) e thread-safe
+import time
+import threading
+from typing import Callable, Dict, Iterable
+
+SPACY_MODEL = "pt_core_news_sm"
+SENTIMENT_MODEL = "pysentimiento/bertweet-pt-sentiment"
+
+
+class ModelRegistry:
+    """
+    Guarda as funções que carregam cada modelo e carrega cada um só na primeira vez que é pedido.
+
+    Vários threads pedindo o mesmo modelo ao mesmo tempo esperam um único
+    carregamento. O tempo de cada carga fica em `tempos_carga` e é impresso no log.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable] = {}
+        self._modelos = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.tempos_carga: Dict[str, float] = {}
+
+    def register(self, nome: str, loader: Callable):
+        with self._lock:
+            self._loaders[nome] = loader
+            self._locks[nome] = threading.Lock()
+
+    def is_loaded(self, nome: str) -> bool:
+        return nome in self._modelos
+
+    def get(self, nome: str):
+        """Retorna o modelo, carregando-o na primeira chamada."""
+        if nome in self._modelos:
+            return self._modelos[nome]
+
+        with self._locks[nome]:
+            if nome not in self._modelos:
+                inicio = time.perf_counter()
+                self._modelos[nome] = self._loaders[nome]()
+                self.tempos_carga[nome] = time.perf_counter() - inicio
+                print(f"[INFO] Modelo '{nome}' carregado em {self.tempos_carga[nome]:.2f}s")
+        return self._modelos[nome]
+
+    def warm_up(self, nomes: Iterable[str] = None, background: bool = True):
+        """Carrega os modelos antecipadamente; em background, devolve a thread usada."""
+        nomes = list(nomes) if nomes is not None else list(self._loaders)
+
+        def carregar():
+            for nome in nomes:
+                try:
+                    self.get(nome)
+                except Exception as e:
+                    print(f"[ERRO] Falha ao pré-carregar modelo '{nome}': {e}")
+
+        if not background:
+            carregar()
+            return None
+
+        thread = threading.Thread(target=carregar, name="warm-up-modelos", daemon=True)
+        thread.start()
+        return thread
+
+
+def _carregar_spacy():
+    import spacy
+    return spacy.load(SPACY_MODEL)
+
+def _carregar_sentimento():
+    # Backend escolhido por PULSENLP_SENTIMENT_BACKEND (torch, int8, onnx, onnx-int8)
+    from pulsenlp.nlp_module.sentiment_backends import carregar_sentimento
+    return carregar_sentimento(SENTIMENT_MODEL)
+
+
+registry = ModelRegistry()
+registry.register("spacy", _carregar_spacy)
+registry.register("sentiment", _carregar_sentimento)
+
+def get_nlp():
+    """Pipeline spaCy (pt_core_news_sm), carregado na primeira chamada."""
+    return registry.get("spacy")
+
+def get_sentiment_analyzer():
+    """Analisador de sentimento (pysentimiento ou backend otimizado), carregado na primeira chamada."""
+    return registry.get("sentiment")
+
+def warm_up(nomes: Iterable[str] = None, background: bool = True):
+    return registry.warm_up(nomes, background=background)
@@ -1,35 +1,142 @@
 import spacy
 import re
+import threading
+from typing import Iterable, List
+from pulsenlp.nlp_module.cache import AnnotationCache
+from pulsenlp.nlp_module.models import get_nlp, SPACY_MODEL
 
-nlp = spacy.load("pt_core_news_sm")
+# O modelo só é carregado na primeira análise (ver nlp_module.models)
+_cache = None
+_cache_lock = threading.Lock()
 
-def process(text: str):
+def _get_cache() -> AnnotationCache:
+    # Resultados ficam em cache por hash do texto + nome/versão do modelo
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnnotationCache(f"{SPACY_MODEL}-{spacy.util.get_package_version(SPACY_MODEL)}")
+    return _cache
+
+# Componentes que cada tarefa NÃO precisa; são desligados nas versões em lote
+COMPONENTES_DESNECESSARIOS = {
+    "lemmas": ["parser", "ner"],
+    "pos": ["parser", "ner", "lemmatizer"],
+    "noun_chunks": ["ner", "lemmatizer"],
+    "entities": ["parser", "lemmatizer"],
+    "sentences": ["ner", "lemmatizer"],
+}
+
+def _normalizar(text: str) -> str:
     # Normalização
     text_normalized = text.lower()
 
     # Aplicando Regex (mantendo só letras e espaços)
-    text_regex = re.sub(r'[^a-záéíóúâêîôûãõç\s]', '', text_normalized)
+    return re.sub(r'[^a-záéíóúâêîôûãõç\s]', '', text_normalized)
+
+def _desligar(tarefa: str) -> List[str]:
+    return [nome for nome in COMPONENTES_DESNECESSARIOS[tarefa] if nome in get_nlp().pipe_names]
 
-    # Processando
-    doc = nlp(text_regex)
+def _pipe(texts: Iterable[str], tarefa: str, batch_size: int, n_process: int):
+    return get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process, disable=_desligar(tarefa))
 
+# Extração de cada anotação a partir de um Doc já processado
+def _lemas(doc) -> list:
     # Remover stopwords e tokens de pontuação, pegar lemas
-    lemmas = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
+    return [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
+
+def _pos(doc) -> list:
+    return [(token.text, token.pos_, token.tag_, spacy.explain(token.tag_)) for token in doc]
+
+def _chunks(doc) -> list:
+    return [chunk.text for chunk in doc.noun_chunks]
 
-    return lemmas
+def _entidades(doc) -> list:
+    return [(ent.text, ent.label_, spacy.explain(ent.label_)) for ent in doc.ents]
+
+def _sentencas(doc) -> list:
+    return [sent.text for sent in doc.sents]
+
+def _tuplas(itens: list) -> list:
+    # Listas vindas do cache (JSON) voltam ao formato de tuplas original
+    return [tuple(item) for item in itens]
+
+def _com_cache(tipo: str, texts: Iterable[str], calcular) -> list:
+    """Busca cada texto no cache e só manda para o spaCy os que faltam, em um único lote."""
+    texts = list(texts)
+    resultados = _get_cache().get_many(tipo, texts)
+    pendentes = [i for i in range(len(texts)) if i not in resultados]
+    if pendentes:
+        textos_pendentes = [texts[i] for i in pendentes]
+        novos = calcular(textos_pendentes)
+        _get_cache().set_many(tipo, textos_pendentes, novos)
+        resultados.update(zip(pendentes, novos))
+    return [resultados[i] for i in range(len(texts))]
+
+def process(text: str):
+    return process_batch([text])[0]
 
 def pos_tagging(text: str):
-    doc = nlp(text)
-    return [(token.text, token.pos_, token.tag_, spacy.explain(token.tag_)) for token in doc]
+    return pos_tagging_batch([text])[0]
 
 def noun_chunks(text: str):
-    doc = nlp(text)
-    return [chunk.text for chunk in doc.noun_chunks]
+    return noun_chunks_batch([text])[0]
 
 def named_entities(text: str):
-    doc = nlp(text)
-    return [(ent.text, ent.label_, spacy.explain(ent.label_)) for ent in doc.ents]
+    return named_entities_batch([text])[0]
 
 def sentence_segmentation(text: str):
-    doc = nlp(text)
-    return [sent.text for sent in doc.sents]
+    return sentence_segmentation_batch([text])[0]
+
+# ------------------------- Versões em lote (nlp.pipe) -------------------------
+
+def process_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[list]:
+    """Lemas de vários textos em uma única passada, sem parser nem NER."""
+    def calcular(pendentes):
+        docs = _pipe((_normalizar(t) for t in pendentes), "lemmas", batch_size, n_process)
+        return [_lemas(doc) for doc in docs]
+    return _com_cache("lemmas", texts, calcular)
+
+def pos_tagging_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[list]:
+    def calcular(pendentes):
+        return [_pos(doc) for doc in _pipe(pendentes, "pos", batch_size, n_process)]
+    return [_tuplas(r) for r in _com_cache("pos", texts, calcular)]
+
+def noun_chunks_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[list]:
+    def calcular(pendentes):
+        return [_chunks(doc) for doc in _pipe(pendentes, "noun_chunks", batch_size, n_process)]
+    return _com_cache("noun_chunks", texts, calcular)
+
+def named_entities_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[list]:
+    def calcular(pendentes):
+        return [_entidades(doc) for doc in _pipe(pendentes, "entities", batch_size, n_process)]
+    return [_tuplas(r) for r in _com_cache("entities", texts, calcular)]
+
+def sentence_segmentation_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[list]:
+    def calcular(pendentes):
+        return [_sentencas(doc) for doc in _pipe(pendentes, "sentences", batch_size, n_process)]
+    return _com_cache("sentences", texts, calcular)
+
+def _anotacoes(doc) -> dict:
+    return {
+        "lemmas": [token.lemma_.lower() for token in doc if not token.is_stop and token.is_alpha],
+        "pos": _pos(doc),
+        "noun_chunks": _chunks(doc),
+        "entities": _entidades(doc),
+        "sentences": _sentencas(doc),
+    }
+
+def analyze(text: str) -> dict:
+    """
+    Todas as anotações de um texto a partir de uma única passada do pipeline completo.
+
+    Os lemas vêm do texto original (em minúsculas), não do texto normalizado
+    de process(), então podem diferir em casos como nomes próprios.
+    """
+    return analyze_batch([text])[0]
+
+def analyze_batch(texts: Iterable[str], batch_size: int = 64, n_process: int = 1) -> List[dict]:
+    """Versão em lote de analyze."""
+    def calcular(pendentes):
+        return [_anotacoes(doc) for doc in get_nlp().pipe(pendentes, batch_size=batch_size, n_process=n_process)]
+    resultados = _com_cache("analyze", texts, calcular)
+    return [dict(r, pos=_tuplas(r["pos"]), entities=_tuplas(r["entities"])) for r in resultados]
@@ -1,13 +1,143 @@
-from pysentimiento import create_analyzer
+import os
+import re
+import threading
+from pulsenlp.batching import MicroBatcher
+from pulsenlp.nlp_module.models import get_sentiment_analyzer, SENTIMENT_MODEL
+from pulsenlp.nlp_module.sentiment_cache import get_sentiment_cache
 
-model = "pysentimiento/bertweet-pt-sentiment"
+model = SENTIMENT_MODEL
 
-analyzer = create_analyzer(task="sentiment", lang="pt", model_name=model)
+# Textos com mais palavras que isso são divididos em trechos (o modelo trunca em 128 tokens); 0 desliga
+SENTIMENT_CHUNK_WORDS = int(os.getenv("PULSENLP_SENTIMENT_CHUNK_WORDS", "60"))
+SENTIMENT_SPLITTER = os.getenv("PULSENLP_SENTIMENT_SPLITTER", "regra")  # "regra" ou "spacy"
+
+_FIM_SENTENCA = re.compile(r"(?<=[.!?…])\s+|\n+")
 
 def sentiment_analysis(text: str) -> dict:
-    result = analyzer.predict(text)
+    return sentiment_analysis_batch([text])[0]
+
+def _analisar_local(texts: list, batch_size: int = 32) -> list:
+    scores = []
+    for i in range(0, len(texts), batch_size):
+        results = get_sentiment_analyzer().predict(list(texts[i:i + batch_size]))
+        scores.extend(r.probas['POS'] - r.probas['NEG'] for r in results)
+    return scores
+
+def _analisar_remoto(texts: list):
+    """Scores pelo servidor compartilhado (sentiment_server), ou None se não houver um no ar."""
+    from pulsenlp.nlp_module.sentiment_server import get_sentiment_client, marcar_indisponivel
+
+    cliente = get_sentiment_client()
+    if cliente is None:
+        return None
+    try:
+        return cliente.score_many(texts)
+    except OSError as e:
+        print(f"[AVISO] Servidor de sentimento indisponível ({e}); usando o modelo local.")
+        marcar_indisponivel()
+        return None
+
+def _pontuar(texts: list, batch_size: int) -> list:
+    scores = _analisar_remoto(texts)
+    if scores is None:
+        scores = _analisar_local(texts, batch_size)
+    return scores
+
+def _dividir_sentencas(texts: list) -> list:
+    if SENTIMENT_SPLITTER == "spacy":
+        from pulsenlp.nlp_module.preprocessing import sentence_segmentation_batch
+        return sentence_segmentation_batch(texts)
+    # Regra simples: quebra depois de . ! ? … seguidos de espaço, e em quebras de linha
+    return [[s for s in _FIM_SENTENCA.split(t) if s.strip()] for t in texts]
+
+def dividir_em_trechos(sentencas: list, max_palavras: int = SENTIMENT_CHUNK_WORDS) -> list:
+    """Junta sentenças consecutivas em trechos de até max_palavras; uma sentença maior que isso é cortada em janelas."""
+    trechos, atual = [], []
+    for sentenca in sentencas:
+        palavras = sentenca.split()
+        if atual and len(atual) + len(palavras) > max_palavras:
+            trechos.append(" ".join(atual))
+            atual = []
+        while len(palavras) > max_palavras:
+            trechos.append(" ".join(palavras[:max_palavras]))
+            palavras = palavras[max_palavras:]
+        atual.extend(palavras)
+    if atual:
+        trechos.append(" ".join(atual))
+    return trechos
+
+def _pontuar_em_trechos(texts: list, batch_size: int) -> list:
+    """
+    Pontua textos longos por trechos, sem truncar.
+
+    Os trechos de todos os textos vão juntos em uma única chamada em lote, e
+    o score de cada texto é a média dos scores dos seus trechos ponderada
+    pelo número de palavras.
+    """
+    longos = [i for i, t in enumerate(texts) if SENTIMENT_CHUNK_WORDS and len(t.split()) > SENTIMENT_CHUNK_WORDS]
+    if not longos:
+        return _pontuar(texts, batch_size)
+
+    sentencas = dict(zip(longos, _dividir_sentencas([texts[i] for i in longos])))
+    trechos, donos, pesos = [], [], []
+    for i, texto in enumerate(texts):
+        for trecho in (dividir_em_trechos(sentencas[i], SENTIMENT_CHUNK_WORDS) if i in sentencas else [texto]):
+            trechos.append(trecho)
+            donos.append(i)
+            pesos.append(max(len(trecho.split()), 1))
+
+    soma = [0.0] * len(texts)
+    peso_total = [0] * len(texts)
+    for dono, peso, score in zip(donos, pesos, _pontuar(trechos, batch_size)):
+        soma[dono] += peso * score
+        peso_total[dono] += peso
+    return [s / p for s, p in zip(soma, peso_total)]
+
+def sentiment_analysis_batch(texts: list, batch_size: int = 32) -> list:
+    """
+    Calcula POS - NEG para vários textos, em lotes com padding dinâmico.
+
+    Scores já conhecidos vêm do SentimentCache; textos longos são pontuados
+    por trechos (_pontuar_em_trechos). Para o resto, se houver um
+    servidor de sentimento no ar, os textos vão para ele (um modelo residente
+    para todos os processos); senão, o modelo é carregado aqui.
+    """
+    if not texts:
+        return []
+
+    # Textos já avaliados (idênticos ou quase) vêm do cache; repetidos no lote são avaliados uma vez
+    cache = get_sentiment_cache()
+    scores = cache.buscar_muitos(texts) if cache is not None else {}
+    pendentes = {}
+    for i, texto in enumerate(texts):
+        if i not in scores:
+            pendentes.setdefault(texto, []).append(i)
+
+    if pendentes:
+        textos_pendentes = [texts[indices[0]] for indices in pendentes.values()]
+        novos = _pontuar_em_trechos(textos_pendentes, batch_size)
+        if cache is not None:
+            cache.guardar_muitos(textos_pendentes, novos)
+        for indices, score in zip(pendentes.values(), novos):
+            for i in indices:
+                scores[i] = score
+
+    return [scores[i] for i in range(len(texts))]
+
+_batcher = None
+_batcher_lock = threading.Lock()
 
-    return result.probas['POS'] - result.probas['NEG']
+def get_sentiment_batcher(max_batch_size: int = 32, max_wait: float = 0.02) -> MicroBatcher:
+    """Fila compartilhada: agentes concorrentes recebem Futures e a inferência roda em lote."""
+    global _batcher
+    with _batcher_lock:
+        if _batcher is None:
+            _batcher = MicroBatcher(
+                lambda texts: sentiment_analysis_batch(texts, batch_size=max_batch_size),
+                max_batch_size=max_batch_size,
+                max_wait=max_wait,
+            )
+    return _batcher
 
 
 if __name__ == "__main__":
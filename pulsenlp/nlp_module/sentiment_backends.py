@@ -0,0 +1,277 @@
+# Backends de CPU para o modelo de sentimento: fp32 (torch), int8 dinâmico e ONNX Runtime
+import os
+import re
+import json
+import time
+import statistics
+
+import numpy as np
+
+from pulsenlp.nlp_module.sentiment_executor import TORCH_THREADS, limitar_threads_torch
+
+SENTIMENT_BACKEND = os.getenv("PULSENLP_SENTIMENT_BACKEND", "torch")  # "torch", "int8", "onnx" ou "onnx-int8"
+BACKENDS = ("torch", "int8", "onnx", "onnx-int8")
+ONNX_DIR = os.getenv("PULSENLP_ONNX_DIR", os.path.join("pulsenlp", "onnx_model"))
+METADADOS_ONNX = "analisador.json"  # rótulos, pré-processamento e limite de tokens, ao lado do model.onnx
+
+# Corpus fixo para comparar os backends com o modelo fp32
+CORPUS_PARIDADE = [
+    "Adorei o atendimento, todos foram muito gentis e rápidos!",
+    "O produto chegou quebrado e ninguém responde meus e-mails.",
+    "A reunião foi remarcada para quinta-feira às 15h.",
+    "Que jogo incrível, o time finalmente jogou como campeão!!!",
+    "Péssima experiência, nunca mais compro nessa loja.",
+    "O relatório tem 20 páginas e cobre o último trimestre.",
+    "kkkkkk não acredito que ele disse isso ao vivo",
+    "Estou cansado de tanto trânsito todo santo dia...",
+    "Excelente aula, aprendi muito sobre ciência de dados.",
+    "O governo anunciou novas regras para o imposto de renda.",
+    "Nossa, que filme chato, dormi na metade 😴",
+    "Amei a nova atualização do app, ficou bem mais rápido 😍",
+    "O preço subiu de novo, assim fica difícil.",
+    "A previsão do tempo indica chuva no fim de semana.",
+    "Que vergonha essa arbitragem, roubaram descaradamente!",
+    "Obrigado a todos pelo apoio, vocês são demais ❤️",
+    "O ônibus atrasou quarenta minutos hoje de manhã.",
+    "Não sei o que pensar sobre essa proposta ainda.",
+    "Comida maravilhosa e ambiente super aconchegante.",
+    "@USER seu comentário foi totalmente desnecessário",
+]
+
+
+class ClassificadorCPU:
+    """
+    Substituto de `analyzer.predict` para os backends otimizados.
+
+    Reaproveita do analisador pysentimiento (ou dos metadados exportados
+    junto do ONNX) o pré-processamento de tweets, o tokenizer e os rótulos, e
+    troca só a execução do modelo (`executar` recebe os tensores numpy do
+    tokenizer e devolve os logits). predict() aceita um texto ou uma lista e
+    devolve AnalyzerOutput, como o original.
+    """
+
+    def __init__(self, analyzer, executar, backend: str):
+        self.analyzer = analyzer
+        self.executar = executar
+        self.backend = backend
+
+    def predict(self, inputs):
+        from pysentimiento.analyzer import AnalyzerOutput
+        from pysentimiento.preprocessing import preprocess_tweet
+
+        unico = isinstance(inputs, str)
+        textos = [inputs] if unico else list(inputs)
+        if not textos:
+            return []
+
+        tokenizer = self.analyzer.tokenizer
+        preprocessados = [preprocess_tweet(t, **self.analyzer.preprocessing_args) for t in textos]
+        codificado = tokenizer(
+            preprocessados,
+            padding=True,
+            truncation=True,
+            max_length=tokenizer.model_max_length,
+            return_tensors="np",
+        )
+        logits = np.asarray(self.executar(codificado), dtype=np.float64)
+
+        # Softmax estável por linha
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+
+        id2label = self.analyzer.id2label
+        saidas = [
+            AnalyzerOutput(texto, context=None, probas={id2label[i]: float(p[i]) for i in id2label})
+            for texto, p in zip(preprocessados, probs)
+        ]
+        return saidas[0] if unico else saidas
+
+
+def _analisador_fp32(model_name: str):
+    from pysentimiento import create_analyzer
+    return create_analyzer(task="sentiment", lang="pt", model_name=model_name)
+
+
+def _executar_torch(modelo):
+    import torch
+
+    def executar(codificado):
+        with torch.inference_mode():
+            saida = modelo(
+                input_ids=torch.from_numpy(codificado["input_ids"]),
+                attention_mask=torch.from_numpy(codificado["attention_mask"]),
+            )
+        return saida.logits.numpy()
+
+    return executar
+
+
+def _carregar_int8(analyzer):
+    import torch
+
+    # Quantização dinâmica: pesos das camadas Linear em int8, ativações quantizadas em tempo de execução.
+    # inplace: as camadas fp32 são substituídas, sem manter as duas cópias do modelo em memória
+    modelo = torch.quantization.quantize_dynamic(analyzer.model.cpu().eval(), {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return _executar_torch(modelo)
+
+
+def _pasta_onnx(model_name: str) -> str:
+    return os.path.join(ONNX_DIR, re.sub(r"[^\w.-]", "_", model_name))
+
+
+def _caminho_onnx(model_name: str, quantizado: bool) -> str:
+    return os.path.join(_pasta_onnx(model_name), "model-int8.onnx" if quantizado else "model.onnx")
+
+
+class _AnalisadorExportado:
+    """O que o ClassificadorCPU usa do analisador pysentimiento, lido da pasta do ONNX (sem carregar o torch)."""
+
+    def __init__(self, pasta: str):
+        from transformers import AutoTokenizer
+
+        with open(os.path.join(pasta, METADADOS_ONNX), encoding="utf-8") as f:
+            metadados = json.load(f)
+        self.tokenizer = AutoTokenizer.from_pretrained(pasta)
+        self.tokenizer.model_max_length = metadados["model_max_length"]
+        self.preprocessing_args = metadados["preprocessing_args"]
+        self.id2label = {int(i): rotulo for i, rotulo in metadados["id2label"].items()}
+
+
+def _salvar_metadados(analyzer, pasta: str):
+    os.makedirs(pasta, exist_ok=True)
+    analyzer.tokenizer.save_pretrained(pasta)
+    metadados = {
+        "id2label": analyzer.id2label,
+        "preprocessing_args": analyzer.preprocessing_args,
+        "model_max_length": analyzer.tokenizer.model_max_length,
+    }
+    with open(os.path.join(pasta, METADADOS_ONNX), "w", encoding="utf-8") as f:
+        json.dump(metadados, f, ensure_ascii=False, indent=2)
+
+
+def _exportar_onnx(analyzer, caminho: str):
+    import torch
+
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    modelo = analyzer.model.cpu().eval()
+    modelo.config.return_dict = False
+    exemplo = analyzer.tokenizer(["texto de exemplo"], return_tensors="pt")
+    try:
+        torch.onnx.export(
+            modelo,
+            (exemplo["input_ids"], exemplo["attention_mask"]),
+            caminho,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["logits"],
+            dynamic_axes={"input_ids": {0: "lote", 1: "tokens"}, "attention_mask": {0: "lote", 1: "tokens"}, "logits": {0: "lote"}},
+            opset_version=14,
+        )
+    finally:
+        modelo.config.return_dict = True
+    print(f"[INFO] Modelo exportado para ONNX em {caminho}")
+
+
+def _carregar_onnx(model_name: str, quantizado: bool) -> ClassificadorCPU:
+    import onnxruntime as ort
+
+    pasta = _pasta_onnx(model_name)
+    caminho = _caminho_onnx(model_name, quantizado=False)
+    if not (os.path.exists(caminho) and os.path.exists(os.path.join(pasta, METADADOS_ONNX))):
+        # Só na primeira execução: o modelo fp32 é carregado para exportar e descartado em seguida
+        analyzer = _analisador_fp32(model_name)
+        if not os.path.exists(caminho):
+            _exportar_onnx(analyzer, caminho)
+        _salvar_metadados(analyzer, pasta)
+        del analyzer
+    if quantizado:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        caminho_int8 = _caminho_onnx(model_name, quantizado=True)
+        if not os.path.exists(caminho_int8):
+            quantize_dynamic(caminho, caminho_int8, weight_type=QuantType.QInt8)
+        caminho = caminho_int8
+
+    opcoes = ort.SessionOptions()
+    opcoes.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if TORCH_THREADS:
+        opcoes.intra_op_num_threads = TORCH_THREADS
+    sessao = ort.InferenceSession(caminho, opcoes, providers=["CPUExecutionProvider"])
+
+    def executar(codificado):
+        entradas = {
+            "input_ids": codificado["input_ids"].astype(np.int64),
+            "attention_mask": codificado["attention_mask"].astype(np.int64),
+        }
+        return sessao.run(["logits"], entradas)[0]
+
+    return ClassificadorCPU(_AnalisadorExportado(pasta), executar, "onnx-int8" if quantizado else "onnx")
+
+
+def carregar_sentimento(model_name: str, backend: str = SENTIMENT_BACKEND):
+    """Analisador de sentimento no backend pedido; "torch" devolve o pysentimiento sem alterações."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de sentimento desconhecido: {backend} (use {', '.join(BACKENDS)})")
+
+    # Só o backend pedido é carregado: o ONNX lê o modelo exportado sem passar pelo torch
+    # (threads intra-op de PULSENLP_TORCH_THREADS vão direto para a sessão do ONNX Runtime)
+    if backend in ("onnx", "onnx-int8"):
+        return _carregar_onnx(model_name, quantizado=backend == "onnx-int8")
+
+    limitar_threads_torch(TORCH_THREADS)
+    analyzer = _analisador_fp32(model_name)
+    if backend == "torch":
+        return analyzer
+    return ClassificadorCPU(analyzer, _carregar_int8(analyzer), backend)
+
+
+def _pontuar(analisador, textos: list) -> tuple:
+    """Scores POS - NEG, rótulos e latência (ms) de cada texto, um por vez como no runner."""
+    scores, rotulos, latencias = [], [], []
+    analisador.predict(textos[0])  # aquecimento
+    for texto in textos:
+        inicio = time.perf_counter()
+        resultado = analisador.predict(texto)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        scores.append(resultado.probas["POS"] - resultado.probas["NEG"])
+        rotulos.append(resultado.output)
+    return scores, rotulos, latencias
+
+
+def verificar_paridade(backend: str, model_name: str = None, textos: list = None) -> dict:
+    """
+    Compara um backend com o modelo fp32 no corpus fixo.
+
+    Retorna as diferenças de score (POS - NEG), a concordância de rótulos e a
+    latência mediana por comentário de cada um.
+    """
+    from pulsenlp.nlp_module.models import SENTIMENT_MODEL
+
+    model_name = model_name or SENTIMENT_MODEL
+    textos = textos or CORPUS_PARIDADE
+
+    referencia = carregar_sentimento(model_name, "torch")
+    candidato = carregar_sentimento(model_name, backend)
+    scores_ref, rotulos_ref, lat_ref = _pontuar(referencia, textos)
+    scores, rotulos, lat = _pontuar(candidato, textos)
+
+    deltas = [abs(a - b) for a, b in zip(scores_ref, scores)]
+    return {
+        "backend": backend,
+        "textos": len(textos),
+        "delta_max": max(deltas),
+        "delta_medio": statistics.fmean(deltas),
+        "concordancia_rotulos": sum(a == b for a, b in zip(rotulos_ref, rotulos)) / len(textos),
+        "latencia_fp32_ms": statistics.median(lat_ref),
+        "latencia_ms": statistics.median(lat),
+        "aceleracao": statistics.median(lat_ref) / statistics.median(lat),
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import json
+
+    # python -m pulsenlp.nlp_module.sentiment_backends [int8|onnx|onnx-int8]
+    backend = sys.argv[1] if len(sys.argv) > 1 else "int8"
+    print(json.dumps(verificar_paridade(backend), indent=2))
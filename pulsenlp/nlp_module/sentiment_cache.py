@@ -0,0 +1,207 @@
+# Cache de scores de sentimento: textos idênticos (hash) e quase idênticos (SimHash)
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+from pulsenlp.nlp_module.cache import AnnotationCache, CACHE_PATH, normalizar_texto
+
+SENTIMENT_CACHE_PATH = os.getenv("PULSENLP_SENTIMENT_CACHE", CACHE_PATH)  # vazio: só memória
+SENTIMENT_CACHE_ENTRADAS = int(os.getenv("PULSENLP_SENTIMENT_CACHE_ENTRIES", "20000"))  # 0 desliga o cache
+DISTANCIA_MAX = int(os.getenv("PULSENLP_SENTIMENT_NEAR_DUP", "0"))  # bits diferentes no SimHash; 0 (padrão) desliga
+MIN_TOKENS_SIMILAR = 4
+
+# Palavras que mudam ou intensificam a opinião: um texto parecido que difere
+# em uma delas nunca empresta o score ("recomendo" x "não recomendo")
+PALAVRAS_SENSIVEIS = frozenset("""
+    não nao nem nunca jamais nada nenhum nenhuma ninguém ninguem sem tampouco
+    mas porém porem contudo entretanto todavia embora apesar
+    muito muita muitos muitas pouco pouca super mega bem mal mais menos tão tao demais
+    bom boa bons boas ótimo otimo ótima otima excelente incrível incrivel maravilhoso maravilhosa perfeito perfeita
+    melhor melhores pior piores ruim ruins péssimo pessimo péssima pessima horrível horrivel terrível terrivel
+    adoro adorei amo amei gosto gostei curti odeio odiei detesto detestei recomendo vergonha absurdo lixo
+    feliz triste chato chata legal lindo linda feio feia certo errado errada
+    sim claro talvez
+""".split())
+PONTUACAO_NEUTRA = frozenset(".,;:-–—\"'()[]/…")
+
+
+def _tokens(texto: str) -> list:
+    return re.findall(r"\w+", normalizar_texto(texto).lower())
+
+
+def _tokens_com_simbolos(texto: str) -> list:
+    # Emojis e pontuação viram tokens próprios (o SimHash os ignora)
+    return re.findall(r"\w+|[^\w\s]", normalizar_texto(texto).lower())
+
+
+def _sensivel(token: str) -> bool:
+    if token in PALAVRAS_SENSIVEIS:
+        return True
+    # Emojis, ! e ? carregam opinião; vírgula, ponto etc. não
+    return not token[0].isalnum() and token not in PONTUACAO_NEUTRA
+
+
+def diferenca_neutra(a: list, b: list) -> bool:
+    """True se as listas de tokens só diferem em tokens que não mudam a polaridade (ver PALAVRAS_SENSIVEIS)."""
+    for operacao, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if operacao != "equal" and any(_sensivel(t) for t in a[i1:i2] + b[j1:j2]):
+            return False
+    return True
+
+
+def simhash(tokens: list, bits: int = 64) -> int:
+    """SimHash de 64 bits sobre palavras e bigramas: textos parecidos diferem em poucos bits."""
+    pesos = [0] * bits
+    for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(bits):
+            pesos[i] += 1 if (h >> i) & 1 else -1
+    return sum(1 << i for i, p in enumerate(pesos) if p > 0)
+
+
+class SimHashIndex:
+    """
+    Busca de assinaturas SimHash a até `distancia_max` bits de distância.
+
+    A assinatura é dividida em distancia_max + 1 faixas; duas assinaturas com
+    no máximo distancia_max bits diferentes coincidem em pelo menos uma faixa
+    inteira, então só os candidatos dos baldes dessas faixas são comparados.
+    Limitado a `max_entradas`, descartando as mais antigas.
+    """
+
+    def __init__(self, distancia_max: int = DISTANCIA_MAX, max_entradas: int = SENTIMENT_CACHE_ENTRADAS, bits: int = 64):
+        self.distancia_max = distancia_max
+        self.max_entradas = max_entradas
+        self.n_faixas = distancia_max + 1
+        self.largura = bits // self.n_faixas
+        self._valores = OrderedDict()
+        self._baldes = [{} for _ in range(self.n_faixas)]
+
+    def _faixas(self, assinatura: int):
+        mascara = (1 << self.largura) - 1
+        return [(assinatura >> (i * self.largura)) & mascara for i in range(self.n_faixas)]
+
+    def adicionar(self, assinatura: int, valor):
+        if assinatura in self._valores:
+            self._valores.move_to_end(assinatura)
+            self._valores[assinatura] = valor
+            return
+        self._valores[assinatura] = valor
+        for balde, faixa in zip(self._baldes, self._faixas(assinatura)):
+            balde.setdefault(faixa, set()).add(assinatura)
+
+        while len(self._valores) > self.max_entradas:
+            antiga, _ = self._valores.popitem(last=False)
+            for balde, faixa in zip(self._baldes, self._faixas(antiga)):
+                balde[faixa].discard(antiga)
+                if not balde[faixa]:
+                    del balde[faixa]
+
+    def buscar(self, assinatura: int):
+        """Valor da assinatura mais próxima dentro do limite, ou None."""
+        melhor, melhor_distancia = None, self.distancia_max + 1
+        for balde, faixa in zip(self._baldes, self._faixas(assinatura)):
+            for candidata in balde.get(faixa, ()):
+                distancia = bin(assinatura ^ candidata).count("1")
+                if distancia < melhor_distancia:
+                    melhor, melhor_distancia = candidata, distancia
+        return None if melhor is None else self._valores[melhor]
+
+
+class SentimentCache:
+    """
+    Evita reavaliar opiniões repetidas.
+
+    Primeiro procura o texto exato no AnnotationCache (LRU em memória +
+    SQLite opcional), com o id do modelo, do backend e da divisão em trechos
+    na chave. Com distancia_max > 0 (opcional, PULSENLP_SENTIMENT_NEAR_DUP),
+    um texto com pelo menos MIN_TOKENS_SIMILAR palavras reaproveita o score
+    de um texto já avaliado cujo SimHash difere em até distancia_max bits,
+    desde que a diferença token a token não toque em negações, palavras de
+    opinião, emojis ou !/?.
+    Os contadores mostram quanto de inferência o cache economizou.
+    """
+
+    def __init__(self, model_id: str, path: str = SENTIMENT_CACHE_PATH, max_entradas: int = SENTIMENT_CACHE_ENTRADAS, distancia_max: int = DISTANCIA_MAX):
+        self._exato = AnnotationCache(model_id, path=path, max_entradas=max_entradas)
+        self._similares = SimHashIndex(distancia_max, max_entradas) if distancia_max > 0 else None
+        self._lock = threading.Lock()
+        self.exatos = 0
+        self.aproximados = 0
+        self.inferidos = 0
+
+    def _assinatura(self, texto: str):
+        tokens = _tokens(texto)
+        return simhash(tokens) if len(tokens) >= MIN_TOKENS_SIMILAR else None
+
+    def _guardar_similar(self, assinatura: int, texto: str, score):
+        # O índice guarda os tokens junto do score para conferir a diferença na busca
+        self._similares.adicionar(assinatura, (_tokens_com_simbolos(texto), score))
+
+    def _buscar_similar(self, assinatura: int, texto: str):
+        candidato = self._similares.buscar(assinatura)
+        if candidato is None:
+            return None
+        tokens, score = candidato
+        return score if diferenca_neutra(tokens, _tokens_com_simbolos(texto)) else None
+
+    def buscar_muitos(self, texts: list) -> dict:
+        """Retorna {indice: score} para os textos que não precisam de inferência."""
+        encontrados = self._exato.get_many("sentimento", texts)
+        with self._lock:
+            self.exatos += len(encontrados)
+            if self._similares is None:
+                return encontrados
+            for i, texto in enumerate(texts):
+                assinatura = self._assinatura(texto)
+                if assinatura is None:
+                    continue
+                if i in encontrados:
+                    # Scores vindos do SQLite também alimentam a busca por similares
+                    self._guardar_similar(assinatura, texto, encontrados[i])
+                    continue
+                score = self._buscar_similar(assinatura, texto)
+                if score is not None:
+                    encontrados[i] = score
+                    self.aproximados += 1
+        return encontrados
+
+    def guardar_muitos(self, texts: list, scores: list):
+        self._exato.set_many("sentimento", texts, scores)
+        with self._lock:
+            self.inferidos += len(texts)
+            if self._similares is not None:
+                for texto, score in zip(texts, scores):
+                    assinatura = self._assinatura(texto)
+                    if assinatura is not None:
+                        self._guardar_similar(assinatura, texto, score)
+
+    def estatisticas(self) -> dict:
+        total = self.exatos + self.aproximados + self.inferidos
+        return {
+            "exatos": self.exatos,
+            "aproximados": self.aproximados,
+            "inferidos": self.inferidos,
+            "taxa_reuso": (self.exatos + self.aproximados) / total if total else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_sentiment_cache():
+    """Cache compartilhado do processo, ou None se PULSENLP_SENTIMENT_CACHE_ENTRIES=0."""
+    global _cache
+    if SENTIMENT_CACHE_ENTRADAS <= 0:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            from pulsenlp.nlp_module.models import SENTIMENT_MODEL
+            from pulsenlp.nlp_module.sentiment_backends import SENTIMENT_BACKEND
+            from pulsenlp.nlp_module.sentiment import SENTIMENT_CHUNK_WORDS, SENTIMENT_SPLITTER
+            # O score de textos longos depende de como são divididos em trechos
+            _cache = SentimentCache(f"{SENTIMENT_MODEL}:{SENTIMENT_BACKEND}:trechos={SENTIMENT_CHUNK_WORDS}/{SENTIMENT_SPLITTER}")
+    return _cache
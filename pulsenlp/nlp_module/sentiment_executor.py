@@ -0,0 +1,90 @@
+# Executa a análise de sentimento fora do event loop do asyncio
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+SENTIMENT_EXECUTOR = os.getenv("PULSENLP_SENTIMENT_EXECUTOR", "batch")  # "batch", "thread" ou "process"
+SENTIMENT_WORKERS = int(os.getenv("PULSENLP_SENTIMENT_WORKERS", "1"))
+TORCH_THREADS = int(os.getenv("PULSENLP_TORCH_THREADS", "0")) or None
+
+
+def limitar_threads_torch(torch_threads):
+    """Limita as threads intra-op do torch no processo atual."""
+    if not torch_threads:
+        return
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+
+
+def _iniciar_worker(torch_threads):
+    """Inicializador do processo filho: limita threads e carrega o modelo uma única vez."""
+    limitar_threads_torch(torch_threads)
+    from pulsenlp.nlp_module.models import get_sentiment_analyzer
+    get_sentiment_analyzer()  # modelo fica residente no worker
+
+
+def _pontuar_no_worker(text: str) -> float:
+    from pulsenlp.nlp_module.sentiment import sentiment_analysis
+    return sentiment_analysis(text)
+
+
+class SentimentExecutor:
+    """
+    Pontua textos sem bloquear o event loop.
+
+    Modos:
+    - "batch": envia para a fila de micro-batching compartilhada (uma thread de inferência);
+    - "thread": ThreadPoolExecutor com limite de threads do torch;
+    - "process": ProcessPoolExecutor em que cada worker mantém sua própria cópia do modelo.
+    """
+
+    def __init__(self, mode: str = SENTIMENT_EXECUTOR, max_workers: int = SENTIMENT_WORKERS, torch_threads: int = TORCH_THREADS):
+        if mode not in ("batch", "thread", "process"):
+            raise ValueError(f"Modo de execução desconhecido: {mode}")
+        self.mode = mode
+        self._pool = None
+
+        if mode == "batch":
+            limitar_threads_torch(torch_threads)
+        elif mode == "thread":
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix="sentiment",
+                initializer=limitar_threads_torch,
+                initargs=(torch_threads,),
+            )
+        elif mode == "process":
+            self._pool = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_iniciar_worker,
+                initargs=(torch_threads,),
+            )
+
+    async def ascore(self, text: str) -> float:
+        """Retorna o score POS - NEG do texto, aguardando sem travar os outros agentes."""
+        if self.mode == "batch":
+            from pulsenlp.nlp_module.sentiment import get_sentiment_batcher
+            return await asyncio.wrap_future(get_sentiment_batcher().submit(text))
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _pontuar_no_worker, text)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+_executor = None
+
+def get_sentiment_executor() -> SentimentExecutor:
+    """Executor compartilhado, configurado pelas variáveis de ambiente PULSENLP_*."""
+    global _executor
+    if _executor is None:
+        _executor = SentimentExecutor()
+    return _executor
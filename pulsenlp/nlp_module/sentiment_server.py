@@ -0,0 +1,217 @@
+# Servidor local de sentimento: um único modelo residente atendendo vários processos
+import os
+import json
+import time
+import atexit
+import socket
+import struct
+import tempfile
+import threading
+import socketserver
+
+# Diretório por usuário: o socket de outro usuário nunca está no caminho padrão
+_DIRETORIO_PADRAO = os.path.join(tempfile.gettempdir(), f"pulsenlp-{os.getuid()}" if hasattr(os, "getuid") else "pulsenlp")
+SOCKET_PATH = os.getenv("PULSENLP_SENTIMENT_SOCKET", os.path.join(_DIRETORIO_PADRAO, "sentiment.sock"))
+SENTIMENT_SERVER = os.getenv("PULSENLP_SENTIMENT_SERVER", "auto")  # "auto" usa o servidor se houver; "off" nunca
+ESPERA_APOS_FALHA = 30.0
+
+# Protocolo: cada mensagem é um quadro [tamanho: uint32 big-endian][JSON UTF-8].
+# Pedido: lista de textos. Resposta: lista de scores (POS - NEG) ou {"erro": "..."}.
+_CABECALHO = struct.Struct(">I")
+
+
+class ErroServidorSentimento(OSError):
+    """O servidor respondeu com erro (ou com um quadro inválido); quem chama cai no modelo local."""
+
+
+def _enviar_quadro(conexao: socket.socket, dados):
+    corpo = json.dumps(dados, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    conexao.sendall(_CABECALHO.pack(len(corpo)) + corpo)
+
+
+def _receber_exato(conexao: socket.socket, n: int) -> bytes:
+    partes = []
+    while n:
+        parte = conexao.recv(n)
+        if not parte:
+            return None
+        partes.append(parte)
+        n -= len(parte)
+    return b"".join(partes)
+
+
+def _ler_quadro(conexao: socket.socket):
+    cabecalho = _receber_exato(conexao, _CABECALHO.size)
+    if cabecalho is None:
+        return None
+    corpo = _receber_exato(conexao, _CABECALHO.unpack(cabecalho)[0])
+    return None if corpo is None else json.loads(corpo)
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        from pulsenlp.nlp_module.sentiment import get_sentiment_batcher
+
+        # Conexão persistente: vários pedidos em sequência no mesmo socket
+        while True:
+            textos = _ler_quadro(self.request)
+            if textos is None:
+                return
+            try:
+                # Cada texto entra no MicroBatcher do processo: pedidos de clientes
+                # diferentes que chegam juntos são inferidos no mesmo lote
+                futuros = [get_sentiment_batcher().submit(t) for t in textos]
+                resposta = [f.result() for f in futuros]
+            except Exception as e:
+                resposta = {"erro": str(e)}
+            _enviar_quadro(self.request, resposta)
+
+
+_servidor = None
+
+def servidor_local_ativo() -> bool:
+    """True se este processo está servindo o modelo (então ele mesmo pontua localmente)."""
+    return _servidor is not None
+
+
+def _responde(caminho: str) -> bool:
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(1.0)
+            s.connect(caminho)
+        return True
+    except OSError:
+        return False
+
+
+def iniciar_servidor(caminho: str = SOCKET_PATH, background: bool = True):
+    """
+    Serve o modelo de sentimento no socket Unix `caminho`.
+
+    Se outro processo já está servindo nesse caminho, não faz nada e retorna
+    None; um socket órfão (de um processo que morreu) é removido. Se o caminho
+    não puder ser usado (ex.: socket de outro usuário), também retorna None e
+    cada processo pontua com o próprio modelo. O socket já nasce com 0600.
+    """
+    global _servidor
+    if not hasattr(socket, "AF_UNIX"):
+        print("[AVISO] Sockets Unix indisponíveis: o sentimento roda em cada processo.")
+        return None
+    try:
+        diretorio = os.path.dirname(caminho)
+        if diretorio:
+            os.makedirs(diretorio, mode=0o700, exist_ok=True)
+        if os.path.exists(caminho):
+            if _responde(caminho):
+                print(f"[INFO] Servidor de sentimento já ativo em {caminho}")
+                return None
+            os.unlink(caminho)
+
+        # umask antes do bind: não há janela em que o socket fique aberto a outros usuários
+        umask_anterior = os.umask(0o177)
+        try:
+            servidor = socketserver.ThreadingUnixStreamServer(caminho, _Handler)
+        finally:
+            os.umask(umask_anterior)
+    except OSError as e:
+        print(f"[AVISO] Servidor de sentimento indisponível em {caminho} ({e}); o sentimento roda em cada processo.")
+        return None
+
+    servidor.daemon_threads = True
+    _servidor = servidor
+    atexit.register(parar_servidor)
+    print(f"[INFO] Servidor de sentimento em {caminho}")
+
+    if background:
+        threading.Thread(target=servidor.serve_forever, name="servidor-sentimento", daemon=True).start()
+    else:
+        servidor.serve_forever()
+    return servidor
+
+
+def parar_servidor():
+    global _servidor
+    if _servidor is None:
+        return
+    _servidor.shutdown()
+    _servidor.server_close()
+    caminho = _servidor.server_address
+    if isinstance(caminho, str) and os.path.exists(caminho):
+        os.unlink(caminho)
+    _servidor = None
+
+
+class SentimentClient:
+    """Cliente do servidor de sentimento, com uma conexão persistente por thread."""
+
+    def __init__(self, caminho: str = SOCKET_PATH, timeout: float = 30.0):
+        self.caminho = caminho
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _conexao(self) -> socket.socket:
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is None:
+            conexao = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conexao.settimeout(self.timeout)
+            try:
+                conexao.connect(self.caminho)
+            except OSError:
+                conexao.close()
+                raise
+            self._local.conexao = conexao
+        return conexao
+
+    def _fechar(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
+
+    def score_many(self, texts: list) -> list:
+        """Scores POS - NEG dos textos; OSError se o servidor não responder ou responder com erro."""
+        try:
+            conexao = self._conexao()
+            _enviar_quadro(conexao, list(texts))
+            resposta = _ler_quadro(conexao)
+        except OSError:
+            self._fechar()
+            raise
+        except ValueError as e:
+            # Quadro corrompido: a conexão fica fora de sincronia
+            self._fechar()
+            raise ErroServidorSentimento(f"resposta inválida do servidor de sentimento: {e}") from e
+        if resposta is None:
+            self._fechar()
+            raise ConnectionError("Servidor de sentimento fechou a conexão")
+        if isinstance(resposta, dict):
+            raise ErroServidorSentimento(resposta.get("erro", "erro no servidor de sentimento"))
+        return resposta
+
+
+_cliente = None
+_indisponivel_ate = 0.0
+
+def get_sentiment_client():
+    """Cliente do servidor compartilhado, ou None se o sentimento deve rodar neste processo."""
+    global _cliente
+    if SENTIMENT_SERVER == "off" or servidor_local_ativo() or not hasattr(socket, "AF_UNIX"):
+        return None
+    if time.monotonic() < _indisponivel_ate or not os.path.exists(SOCKET_PATH):
+        return None
+    if _cliente is None:
+        _cliente = SentimentClient(SOCKET_PATH)
+    return _cliente
+
+
+def marcar_indisponivel():
+    """Após uma falha, passa um tempo sem tentar o servidor (evita um connect por texto)."""
+    global _indisponivel_ate
+    _indisponivel_ate = time.monotonic() + ESPERA_APOS_FALHA
+
+
+if __name__ == "__main__":
+    from pulsenlp.nlp_module.models import warm_up
+
+    warm_up(["sentiment"], background=False)
+    iniciar_servidor(background=False)
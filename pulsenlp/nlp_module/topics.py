@@ -1,34 +1,160 @@
 # Detecção de assuntos (LDA, embeddings, etc.)
+import os
+import threading
+from collections import Counter
 
-from preprocessing import process
+from pulsenlp.nlp_module.preprocessing import process, process_batch
 
-from gensim import corpora
+from gensim import utils
+from gensim.corpora import HashDictionary
 from gensim.models.ldamodel import LdaModel
 
-def detect_topic(text_list):
-    # Pré-processamento dos textos para o LDA
-    textos_processados = [process(text) for text in text_list]
+TOPICS_DIR = os.getenv("PULSENLP_TOPICS_DIR", os.path.join("pulsenlp", "topic_model"))
+
+
+class TopicEngine:
+    """
+    Modelo de tópicos persistente, atualizado online em mini-lotes.
+
+    Usa um HashDictionary (vocabulário de tamanho fixo) para que palavras novas
+    não exijam reconstruir o modelo: cada mini-lote de comentários entra via
+    LdaModel.update. Dicionário e modelo são salvos em disco após cada
+    atualização e recarregados na próxima execução. Atribuir um tópico a um
+    comentário é uma única inferência no modelo, independente do histórico.
+    Com path=None o modelo fica só em memória (nada é lido nem salvo).
+    """
+
+    def __init__(self, num_topics: int = 3, path: str = TOPICS_DIR, batch_size: int = 16, passes: int = 1, id_range: int = 2 ** 16):
+        self.num_topics = num_topics
+        self.path = path
+        self.batch_size = batch_size
+        self.passes = passes
+        self._pendentes = []
+        self._rotulos = {}
+        self._lock = threading.Lock()
+
+        caminho_modelo = os.path.join(path, "lda.model") if path else None
+        if caminho_modelo and os.path.exists(caminho_modelo):
+            self.dicionario = HashDictionary.load(os.path.join(path, "dicionario.dict"))
+            self.modelo = LdaModel.load(caminho_modelo)
+            # O load devolve uma cópia do dicionário em id2word: religa ao mesmo
+            # objeto, senão o vocabulário visto pelo modelo para de acompanhar add_documents
+            self.modelo.id2word = self.dicionario
+        else:
+            self.dicionario = HashDictionary(id_range=id_range, debug=True)
+            self.modelo = None
+
+    def update(self, textos: list):
+        """Treina (ou continua treinando) o modelo com um mini-lote de textos."""
+        lemas = [l for l in process_batch(textos) if l]
+        if not lemas:
+            return
+
+        with self._lock:
+            self.dicionario.add_documents(lemas)
+            corpus = [self.dicionario.doc2bow(l) for l in lemas]
+            if self.modelo is None:
+                self.modelo = LdaModel(
+                    corpus=corpus,
+                    id2word=self.dicionario,
+                    num_topics=self.num_topics,
+                    passes=self.passes,
+                    chunksize=self.batch_size,
+                )
+            else:
+                self.modelo.update(corpus)
+            self._rotulos = {}
+            self.save()
+
+    def observe(self, texto: str):
+        """Acumula um comentário e atualiza o modelo quando o mini-lote enche."""
+        with self._lock:
+            self._pendentes.append(texto)
+            if len(self._pendentes) < self.batch_size:
+                return
+            lote, self._pendentes = self._pendentes, []
+        self.update(lote)
+
+    def palavras_chave(self, topic_id: int, topn: int = 5) -> list:
+        """Pares (palavra, peso) mais relevantes do tópico."""
+        palavras = []
+        for term_id, peso in self.modelo.get_topic_terms(topic_id, topn=topn):
+            # No HashDictionary um id pode agrupar mais de uma palavra; usa a mais frequente
+            tokens = self.dicionario.id2token.get(term_id) or {str(term_id)}
+            palavra = max(tokens, key=lambda t: self.dicionario.dfs_debug.get(t, 0))
+            palavras.append((palavra, float(peso)))
+        return palavras
 
-    # Criação do dicionário e corpus
-    dicionario = corpora.Dictionary(textos_processados)
-    corpus = [dicionario.doc2bow(texto) for texto in textos_processados]
+    def rotulo(self, topic_id: int) -> str:
+        if topic_id not in self._rotulos:
+            self._rotulos[topic_id] = ", ".join(p for p, _ in self.palavras_chave(topic_id, topn=3))
+        return self._rotulos[topic_id]
 
-    # Treinamento do modelo LDA (com 3 tópicos de exemplo)
-    lda_model = LdaModel(corpus=corpus, id2word=dicionario, num_topics=3, passes=10)
+    def _bow(self, lemas: list) -> list:
+        # Como doc2bow, mas sem tocar no dicionário: com debug=True o doc2bow
+        # conta documento e palavra até em consultas
+        ids = Counter(self.dicionario.myhash(utils.to_utf8(l)) % self.dicionario.id_range for l in lemas)
+        return sorted(ids.items())
+
+    def inferir(self, texto: str):
+        """Id do tópico mais provável do texto, ou None; só leitura, não altera o modelo."""
+        with self._lock:
+            if self.modelo is None:
+                return None
+            bow = self._bow(process(texto))
+            topicos = self.modelo.get_document_topics(bow)
+            if not topicos:
+                return None
+            return max(topicos, key=lambda x: x[1])[0]
+
+    def assign(self, texto: str):
+        """Retorna (id, rótulo) do tópico mais provável do texto, ou None se ainda não há modelo."""
+        topic_id = self.inferir(texto)
+        if topic_id is None:
+            return None
+        with self._lock:
+            return topic_id, self.rotulo(topic_id)
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        self.dicionario.save(os.path.join(self.path, "dicionario.dict"))
+        self.modelo.save(os.path.join(self.path, "lda.model"))
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_topic_engine() -> TopicEngine:
+    """Motor de tópicos compartilhado pelo processo."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TopicEngine()
+    return _engine
+
+
+def detect_topic(text_list):
+    """
+    Palavras-chave do tópico principal de text_list[0], no formato peso*"palavra".
 
-    # Análise do texto de interesse
-    texto_para_analisar = process(text_list[0])
-    bow_texto = dicionario.doc2bow(texto_para_analisar)
-    topicos_texto = lda_model.get_document_topics(bow_texto)
+    Só inferência: usa o modelo persistente se ele já existe (o treino é feito
+    por quem ingere comentários, via observe/update). Sem modelo salvo, treina
+    um modelo temporário em memória com os próprios textos, sem gravar nada.
+    """
+    engine = get_topic_engine()
+    if engine.modelo is None:
+        engine = TopicEngine(path=None, passes=10)
+        engine.update(text_list)
 
-    # Encontrando o tópico com a maior probabilidade
-    topico_principal = max(topicos_texto, key=lambda x: x[1])
+    topic_id = engine.inferir(text_list[0])
+    if topic_id is None:
+        return []
+    return [f'{peso:.3f}*"{palavra}"' for palavra, peso in engine.palavras_chave(topic_id, topn=5)]
 
-    # O tópico é um par (ID do tópico, Probabilidade).
-    # Precisamos do ID para ver as palavras-chave do tópico.
-    palavras_chave_topico = lda_model.print_topic(topico_principal[0], topn=5)
-    
-    return palavras_chave_topico.split('+')
 
-text = ["Esse é um texto de teste para a minha aplicação", "Mais um teste para checagem de operação.", "O meu ventilador está quebrado.", "Como ser um cientista de dados excelente"]
-detect_topic(text)
\ No newline at end of file
+if __name__ == "__main__":
+    # TESTE
+    text = ["Esse é um texto de teste para a minha aplicação", "Mais um teste para checagem de operação.", "O meu ventilador está quebrado.", "Como ser um cientista de dados excelente"]
+    print(detect_topic(text))
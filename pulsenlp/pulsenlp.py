@@ -1,11 +1,17 @@
 import reflex as rx
 from rxconfig import config
 from collections import defaultdict
-import json
 from pulsenlp.simulation_module.async_runner import main
+from pulsenlp.simulation_module.control import get_control_channel
+import os
+from pulsenlp.storage_module.comment_repository import ARQUIVO_PADRAO, get_repositorio
+from pulsenlp.storage_module.aggregates import AggregateStore
 import asyncio
 
-DATA_PATH = "pulsenlp/data.json"
+DATA_PATH = os.path.join("pulsenlp", ARQUIVO_PADRAO)
+
+# Estatísticas de sentimento por agente, atualizadas só com os comentários novos
+agregados = AggregateStore()
 
 
 class AppState(rx.State):
@@ -15,13 +21,10 @@ class AppState(rx.State):
     agents: dict = {}
 
     def _save_state(self):
-        """Salva topico e num_users em um arquivo JSON."""
-        data = {
-            "topico": self.topico,
-            "num_users": self.num_users
-        }
-        with open("pulsenlp/topico.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=4)
+        """Envia topico e num_users para a simulação (main() roda neste processo) pelo canal de controle."""
+        comando = {"acao": "iniciar", "topico": self.topico, "num_users": self.num_users}
+        # Se o main() ainda está subindo, o comando espera na fila
+        get_control_channel().enviar(comando, esperar=False)
     
     @rx.event
     def recreate_cards(self):
@@ -44,32 +47,29 @@ class AppState(rx.State):
 
     @rx.event
     def start_simulation(self):
+        if not get_control_channel().ativo:
+            asyncio.create_task(main())
         self.simulation_started = True
         self._save_state()
-        asyncio.create_task(main())
         print(f"Simulação iniciada com tópico: {self.topico} e {self.num_users} agentes.")
 
     @rx.event
     def stop_simulation(self):
         self.simulation_started = False
+        get_control_channel().enviar({"acao": "parar"}, esperar=False)
         print("Simulação parada.")
 
     @rx.event
     def set_agent_data(self, agent_data):
         self.agent_data = agent_data
 
-        # Calcula a média de cada agente ao mesmo tempo
-        avg_dict = {}
-        for nome, data in agent_data.items():
-            if data:
-                avg_dict[nome] = sum(d["sentiment"] for d in data) / len(data)
-            else:
-                avg_dict[nome] = 0
-        self.agent_avg = avg_dict
+        # Médias vêm dos agregados em streaming, sem percorrer os comentários
+        agregados.acompanhar(DATA_PATH)
+        medias = agregados.means("nome")
+        self.agent_avg = {nome: medias.get(nome, 0) for nome in agent_data}
 
 def load_json(data_path):
-    with open(data_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return get_repositorio(data_path).ler_todos()
 
 def prepare_agent_data(json_data):
     agents = defaultdict(list)
@@ -1,32 +1,35 @@
 import os
 import json
+import time
 import random
 import asyncio
+from contextlib import nullcontext
 from pulsenlp.simulation_module.thought_generator import UserAgent
-from pulsenlp.simulation_module.user_profiles import UserProfile
 from pulsenlp.simulation_module.state_manager import save_state, load_state
+from pulsenlp.storage_module.comment_repository import ARQUIVO_PADRAO, get_repositorio
+from pulsenlp.simulation_module.control import TOPICO_CONFIG_PATH, CONTROL_PORT, get_control_channel, iniciar_servidor_http
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
 
 from pulsenlp.nlp_module.sentiment import sentiment_analysis
+from pulsenlp.nlp_module.sentiment_executor import get_sentiment_executor
 
 ### TESTE
 # Análise de sentimentos
 
 ### TESTE
 
-DATA_PATH = os.path.join("pulsenlp", "data.json")
-TOPICO_CONFIG_PATH = os.path.join("pulsenlp", "topico.json")
+DATA_PATH = os.path.join("pulsenlp", ARQUIVO_PADRAO)
 
-def append_comment_to_json(agent_name: str, agent_style: str, agent_tone: str, text: str, topic: str):
-    """Adiciona um comentário ao arquivo JSON com análise de sentimento."""
-    try:
-        if os.path.exists(DATA_PATH):
-            with open(DATA_PATH, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        else:
-            data = []
+# Subtópicos por LDA online (requer gensim); desligado por padrão
+TOPIC_MODEL_ATIVO = os.getenv("PULSENLP_TOPIC_MODEL", "0") == "1"
 
-        # Calcula o rating usando NLP
-        rating = sentiment_analysis(text)
+def append_comment_to_json(agent_name: str, agent_style: str, agent_tone: str, text: str, topic: str, rating: float = None, subtopico: str = None, path: str = None):
+    """Adiciona um comentário ao repositório (JSON Lines ou SQLite) com análise de sentimento; retorna se gravou."""
+    try:
+        # Calcula o rating usando NLP, se ainda não foi calculado
+        if rating is None:
+            rating = sentiment_analysis(text)
 
         new_entry = {
             "nome": agent_name,
@@ -35,26 +38,89 @@ def append_comment_to_json(agent_name: str, agent_style: str, agent_tone: str, t
             "texto": text,
             "rating": rating,
             "topic": topic,
-            "round": len(data) + 1
         }
-        data.append(new_entry)
-
-        with open(DATA_PATH, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if subtopico is not None:
+            new_entry["subtopico"] = subtopico
+        # O round é atribuído pelo próprio repositório
+        get_repositorio(path or DATA_PATH).append(new_entry)
+        return True
 
     except Exception as e:
         print(f"[ERRO] Falha ao salvar comentário no JSON: {e}")
+        return False
+
 
+def _vaga(sessao, recurso: str):
+    return sessao.vaga(recurso) if sessao is not None else nullcontext()
 
-async def simulate_user(agent: UserAgent, topico: str, delay_range=(5, 20)):
-    """Loop assíncrono: gera pensamentos em tempo real para um usuário."""
+
+async def simulate_user(agent: UserAgent, topico: str, delay_range=(5, 20), sessao=None):
+    """
+    Loop assíncrono: gera pensamentos em tempo real para um usuário.
+
+    Dentro de uma sessão (sessions.Sessao), o tópico é relido a cada
+    comentário, LLM e sentimento respeitam a divisão justa entre sessões e os
+    comentários vão para o arquivo da sessão.
+    """
     while True:
         await asyncio.sleep(random.uniform(*delay_range))  # espera aleatória
-        thought = agent.generate_thought(topico)
+        if sessao is not None:
+            topico = sessao.topico
+        try:
+            inicio = time.monotonic()
+            # A vaga da sessão só é ocupada durante cada chamada ao modelo, não nas esperas entre tentativas
+            thought = await agent.agenerate_thought(topico, vaga=lambda: _vaga(sessao, "llm"))
+            if sessao is not None:
+                sessao.metricas.registrar_latencia("llm", time.monotonic() - inicio)
+        except Exception as e:
+            print(f"[ERRO] {agent.user_profile.name}: {e}")
+            if sessao is not None:
+                sessao.metricas.registrar_falha()
+            continue
         print(f"[{agent.user_profile.name}] 💬 {thought}")
 
-        # Salvar no JSON com rating de sentimento
-        append_comment_to_json(agent.user_profile.name, agent.user_profile.style, agent.user_profile.tone, thought, topico)
+        # Sentimento calculado fora do event loop; os outros agentes seguem rodando
+        try:
+            inicio = time.monotonic()
+            async with _vaga(sessao, "sentimento"):
+                rating = await get_sentiment_executor().ascore(thought)
+            if sessao is not None:
+                sessao.metricas.registrar_latencia("sentimento", time.monotonic() - inicio)
+        except Exception as e:
+            print(f"[ERRO] Falha na análise de sentimento: {e}")
+            if sessao is not None:
+                sessao.metricas.registrar_falha()
+            continue
+
+        subtopico = None
+        if TOPIC_MODEL_ATIVO:
+            try:
+                subtopico = await asyncio.to_thread(atribuir_subtopico, thought)
+            except Exception as e:
+                print(f"[ERRO] Falha na detecção de subtópico: {e}")
+
+        # Salvar com rating de sentimento; fora do event loop, para gravações
+        # simultâneas de vários agentes entrarem no mesmo lote do SQLite
+        gravou = await asyncio.to_thread(
+            append_comment_to_json,
+            agent.user_profile.name, agent.user_profile.style, agent.user_profile.tone, thought, topico,
+            rating=rating, subtopico=subtopico, path=sessao.path if sessao is not None else None,
+        )
+        if sessao is not None:
+            if gravou:
+                sessao.metricas.registrar_comentario()
+            else:
+                sessao.metricas.registrar_falha()
+
+
+def atribuir_subtopico(texto: str):
+    """Alimenta o modelo de tópicos online com o comentário e retorna o rótulo do seu tópico."""
+    from pulsenlp.nlp_module.topics import get_topic_engine
+
+    engine = get_topic_engine()
+    engine.observe(texto)
+    resultado = engine.assign(texto)
+    return resultado[1] if resultado else None
 
 
 def load_topic():
@@ -64,63 +130,96 @@ def load_topic():
     return {"topico": "Discussão livre", "num_users": 3}
 
 
-async def main(num_users=3, resume=False):
-    print("async_runner aguardando tópico...")
-    last_topico = None
+def _ler_topico_config():
+    """Lê topico.json; retorna None se ainda não existe, está incompleto ou sem tópico."""
+    if not os.path.exists(TOPICO_CONFIG_PATH):
+        return None
+    try:
+        with open(TOPICO_CONFIG_PATH, encoding="utf-8") as f:
+            dados = json.load(f)
+        topico = dados.get("topico")
+        if not topico or topico.strip() == "":
+            return None
+        return topico, int(dados.get("num_users", 1))
+    except Exception as e:
+        # JSON pela metade, num_users inválido etc.: espera a próxima gravação
+        print("Erro lendo topico.json:", e)
+        return None
 
-    while True:
-        # Se não existir ainda, espera
-        if not os.path.exists("pulsenlp/topico.json"):
-            await asyncio.sleep(1)
-            continue
 
-        try:
-            with open("pulsenlp/topico.json", encoding="utf-8") as f:
-                dados = json.load(f)
-        except Exception as e:
-            print("Erro lendo topico.json:", e)
-            await asyncio.sleep(1)
-            continue
+class TopicoFileHandler(FileSystemEventHandler):
+    """Modo antigo: cada alteração do topico.json vira um comando "iniciar" no canal de controle."""
 
-        topico = dados.get("topico")
-        num_users = dados.get("num_users", 1)
+    def __init__(self, canal):
+        self.canal = canal
+        self.ultimo = None
 
-        # Se não tem tópico ainda
-        if not topico or topico.strip() == "":
-            await asyncio.sleep(1)
-            continue
+    def on_modified(self, event):
+        if os.path.basename(event.src_path) == os.path.basename(TOPICO_CONFIG_PATH):
+            self.verificar()
 
-        # Detecta mudança de tópico
-        if topico != last_topico:
-            print(f"Novo tópico detectado: {topico} com {num_users} agentes")
-            last_topico = topico
-            break
+    def verificar(self):
+        # Roda na thread do watchdog: uma exceção aqui mataria o observador
+        try:
+            config = _ler_topico_config()
+            if config is None or config == self.ultimo:
+                return
+            self.ultimo = config
+            topico, num_users = config
+            self.canal.enviar({"acao": "iniciar", "topico": topico, "num_users": num_users}, esperar=False)
+        except Exception as e:
+            print(f"[ERRO] Falha ao aplicar topico.json: {e}")
 
-    config = load_topic()
-    topico = config["topico"]
-    num_users = config["num_users"]
+    def on_created(self, event):
+        self.on_modified(event)
 
-    print(f"[INFO] Iniciando conversa sobre: {topico} ({num_users} agentes)")
 
-    if resume:
-        agents = load_state()
-        if not agents:
-            users = [UserProfile.generate_random() for _ in range(num_users)]
-            agents = [UserAgent(users) for user in users]
-    else:
-        users = [UserProfile.generate_random() for _ in range(num_users)]
-        agents = [UserAgent(user) for user in users]
+async def main(num_users=3, resume=False, scheduler=None):
+    """
+    Roda as simulações comandadas pelo canal de controle (control.py).
 
-    for agent in agents:
-        print(agent.user_profile)
+    Os comandos chegam pela fila em memória (dashboard/Reflex no mesmo
+    processo), pelo endpoint HTTP local (outros processos) ou, como modo
+    antigo, por alterações no topico.json, observadas pelo watchdog. Nada
+    disso faz polling: o loop só acorda quando chega um comando. A sessão
+    "padrao" escreve em DATA_PATH.
+    """
+    from pulsenlp.simulation_module.sessions import SessionScheduler
 
-    tasks = [asyncio.create_task(simulate_user(agent, topico)) for agent in agents]
+    canal = get_control_channel()
+    # Dois cliques antes de o loop se vincular ao canal não sobem dois runners
+    if not canal.reservar():
+        print("[AVISO] A simulação já está rodando neste processo; os comandos seguem pelo canal.")
+        return
+    scheduler = scheduler or SessionScheduler()
 
+    servidor = observer = None
     try:
-        await asyncio.gather(*tasks)
+        if CONTROL_PORT:
+            try:
+                servidor = iniciar_servidor_http(canal)
+            except OSError as e:
+                print(f"[AVISO] Endpoint de controle indisponível: {e}")
+
+        handler = TopicoFileHandler(canal)
+        observer = Observer()
+        observer.schedule(handler, path=os.path.dirname(TOPICO_CONFIG_PATH) or ".", recursive=False)
+        observer.start()
+        handler.verificar()  # topico.json gravado antes de a simulação subir
+
+        print("async_runner aguardando comandos...")
+        await canal.processar(scheduler, path_padrao=DATA_PATH, agentes_iniciais=(load_state() or None) if resume else None)
     except asyncio.CancelledError:
         print("[INFO] Tasks canceladas.")
-        save_state(agents)
+        if "padrao" in scheduler.sessoes:
+            save_state(scheduler.sessoes["padrao"].agentes)
+        await scheduler.parar_todas()
+    finally:
+        if observer is not None:
+            observer.stop()
+        if servidor is not None:
+            servidor.shutdown()
+        canal.liberar()
 
 if __name__ == "__main__":
     try:
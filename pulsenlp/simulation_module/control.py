@@ -0,0 +1,227 @@
+# Canal de controle da simulação: iniciar, parar, trocar tópico e número de agentes
+import os
+import json
+import asyncio
+import threading
+import urllib.request
+from concurrent.futures import Future, TimeoutError as FuturoTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = int(os.getenv("PULSENLP_CONTROL_PORT", "8765"))  # 0 desliga o endpoint HTTP
+TOPICO_CONFIG_PATH = os.path.join("pulsenlp", "topico.json")
+
+ACOES = ("iniciar", "parar", "topico", "agentes", "status")
+
+
+class ControlChannel:
+    """
+    Fila de comandos consumida pelo event loop da simulação.
+
+    Os comandos são dicts como {"acao": "topico", "sessao": "padrao",
+    "topico": "..."} e são aplicados no SessionScheduler assim que chegam:
+    não há polling, a tarefa de consumo fica parada na fila. enviar() pode ser
+    chamado de qualquer thread. Comandos enviados antes de a simulação subir
+    ficam guardados e são aplicados quando o loop se vincula ao canal.
+    Só um consumidor por vez: quem for rodar processar() chama reservar() antes.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._fila = None
+        self._pendentes = []
+        self._reservado = False
+        self._lock = threading.Lock()
+
+    @property
+    def ativo(self) -> bool:
+        return self._loop is not None and not self._loop.is_closed()
+
+    def reservar(self) -> bool:
+        """Reserva o canal para um consumidor; False se outro já o reservou (mesmo antes de o loop se vincular)."""
+        with self._lock:
+            if self._reservado:
+                return False
+            self._reservado = True
+            return True
+
+    def liberar(self):
+        with self._lock:
+            self._reservado = False
+
+    def _colocar(self, item):
+        self._loop.call_soon_threadsafe(self._fila.put_nowait, item)
+
+    def enviar(self, comando: dict, esperar: bool = True, timeout: float = 10.0):
+        """Enfileira um comando; com esperar=True, bloqueia até o resultado (não use de dentro do loop)."""
+        futuro = Future()
+        with self._lock:
+            if self.ativo:
+                self._colocar((comando, futuro))
+            else:
+                self._pendentes.append((comando, futuro))
+        return futuro.result(timeout) if esperar else futuro
+
+    async def aenviar(self, comando: dict) -> dict:
+        """Versão assíncrona de enviar(), para quem já está em um event loop."""
+        return await asyncio.wrap_future(self.enviar(comando, esperar=False))
+
+    async def processar(self, scheduler, path_padrao: str = None, agentes_iniciais: list = None):
+        """Consome os comandos no event loop atual até ser cancelado."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._fila = asyncio.Queue()
+            for item in self._pendentes:
+                self._fila.put_nowait(item)
+            self._pendentes = []
+
+        try:
+            while True:
+                comando, futuro = await self._fila.get()
+                try:
+                    resultado = await _aplicar(scheduler, comando, path_padrao, agentes_iniciais)
+                    agentes_iniciais = None
+                except Exception as e:
+                    print(f"[ERRO] Comando de controle falhou ({comando}): {e}")
+                    resultado = {"ok": False, "erro": str(e)}
+                if not futuro.done():
+                    futuro.set_result(resultado)
+        finally:
+            with self._lock:
+                self._loop = None
+
+
+async def _aplicar(scheduler, comando: dict, path_padrao: str, agentes_iniciais: list) -> dict:
+    acao = comando.get("acao")
+    if acao not in ACOES:
+        raise ValueError(f"Ação desconhecida: {acao}")
+
+    sessao_id = comando.get("sessao") or "padrao"
+    sessao = scheduler.sessoes.get(sessao_id)
+
+    if acao == "iniciar":
+        topico = comando.get("topico")
+        if not topico or topico.strip() == "":
+            raise ValueError("Tópico não pode ser vazio.")
+        num_users = int(comando.get("num_users", 3))
+        if sessao is None:
+            path = comando.get("path") or (path_padrao if sessao_id == "padrao" else None)
+            scheduler.iniciar(topico, num_users, sessao_id=sessao_id, path=path, peso=float(comando.get("peso", 1.0)), agentes=agentes_iniciais)
+        else:
+            # Sessão já rodando: "iniciar" de novo vira troca de tópico/agentes
+            if topico != sessao.topico:
+                scheduler.mudar_topico(sessao_id, topico)
+            if num_users != len(sessao.agentes):
+                scheduler.redimensionar(sessao_id, num_users)
+    elif acao == "parar":
+        await scheduler.parar(sessao_id)
+    elif acao == "topico":
+        scheduler.mudar_topico(sessao_id, comando["topico"])
+    elif acao == "agentes":
+        scheduler.redimensionar(sessao_id, int(comando["num_users"]))
+
+    return {"ok": True, "sessoes": scheduler.metricas()}
+
+
+_canal = None
+
+def get_control_channel() -> ControlChannel:
+    """Canal de controle do processo."""
+    global _canal
+    if _canal is None:
+        _canal = ControlChannel()
+    return _canal
+
+
+# ------------------------------ entre processos ------------------------------
+
+def iniciar_servidor_http(canal: ControlChannel, porta: int = CONTROL_PORT, timeout: float = 10.0):
+    """
+    Expõe o canal em http://127.0.0.1:<porta> para outros processos.
+
+    - POST /comando com o JSON do comando -> resultado;
+    - GET /sessoes -> métricas das sessões.
+
+    Sem resposta da simulação em `timeout` segundos, responde 504.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _executar(self, comando: dict):
+            try:
+                resultado = canal.enviar(comando, timeout=timeout)
+            except FuturoTimeout:
+                # Simulação ocupada (ou ainda subindo): o comando continua na fila
+                return self._responder(504, {"ok": False, "erro": "tempo esgotado aguardando a simulação"})
+            self._responder(200 if resultado.get("ok") else 400, resultado)
+
+        def _responder(self, codigo: int, dados: dict):
+            corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+            self.send_response(codigo)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def do_GET(self):
+            if self.path != "/sessoes":
+                return self._responder(404, {"ok": False, "erro": "rota desconhecida"})
+            self._executar({"acao": "status"})
+
+        def do_POST(self):
+            if self.path != "/comando":
+                return self._responder(404, {"ok": False, "erro": "rota desconhecida"})
+            try:
+                tamanho = int(self.headers.get("Content-Length", 0))
+                comando = json.loads(self.rfile.read(tamanho) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                return self._responder(400, {"ok": False, "erro": "JSON inválido"})
+            self._executar(comando)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((CONTROL_HOST, porta), Handler)
+    threading.Thread(target=servidor.serve_forever, name="controle-http", daemon=True).start()
+    print(f"[INFO] Controle da simulação em http://{CONTROL_HOST}:{porta}")
+    return servidor
+
+
+def enviar_http(comando: dict, porta: int = CONTROL_PORT, timeout: float = 5.0) -> dict:
+    """Envia um comando ao endpoint HTTP de outro processo."""
+    requisicao = urllib.request.Request(
+        f"http://{CONTROL_HOST}:{porta}/comando",
+        data=json.dumps(comando, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+        return json.loads(resposta.read())
+
+
+def enviar_comando(comando: dict) -> str:
+    """
+    Entrega um comando pelo meio mais direto disponível e retorna qual foi usado.
+
+    1. fila em memória, se a simulação roda neste processo;
+    2. endpoint HTTP local, se roda em outro processo;
+    3. topico.json (só "iniciar"), o modo antigo, acompanhado pelo async_runner.
+    """
+    canal = get_control_channel()
+    if canal.ativo:
+        canal.enviar(comando, esperar=False)
+        return "memoria"
+
+    if CONTROL_PORT:
+        try:
+            enviar_http(comando)
+            return "http"
+        except OSError:
+            pass
+
+    if comando.get("acao") == "iniciar":
+        with open(TOPICO_CONFIG_PATH, "w", encoding="utf-8") as f:
+            json.dump({"topico": comando["topico"], "num_users": comando.get("num_users", 3)}, f, ensure_ascii=False, indent=4)
+        return "arquivo"
+
+    print(f"[AVISO] Simulação não encontrada para o comando: {comando}")
+    return "nenhum"
@@ -0,0 +1,121 @@
+# Escolha de modelo com base na saúde de cada um (latência, erros e circuit breaker)
+import os
+import time
+import random
+import threading
+from typing import List
+
+MAX_TENTATIVAS = int(os.getenv("PULSENLP_LLM_MAX_RETRIES", "5"))
+COOLDOWN_SEGUNDOS = float(os.getenv("PULSENLP_LLM_COOLDOWN", "60"))
+FALHAS_PARA_ABRIR = int(os.getenv("PULSENLP_LLM_FAILURES_TO_OPEN", "3"))
+
+
+class NenhumModeloDisponivel(RuntimeError):
+    """Todos os modelos estão com o circuito aberto (ou falharam em todas as tentativas)."""
+
+
+class ModelHealth:
+    """Estatísticas de um modelo: latência e taxa de erro como médias móveis exponenciais."""
+
+    def __init__(self):
+        self.latencia = None
+        self.taxa_erro = 0.0
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+
+    def disponivel(self, agora: float) -> bool:
+        # Depois do cooldown o circuito fica meio-aberto: uma nova tentativa é permitida
+        return agora >= self.aberto_ate
+
+
+class ModelScheduler:
+    """
+    Agendador de fallback compartilhado por todos os agentes.
+
+    Mede latência e erros de cada modelo, abre o circuito de um modelo após
+    FALHAS_PARA_ABRIR falhas seguidas (ele fica fora por COOLDOWN_SEGUNDOS) e
+    direciona novas requisições para o modelo saudável mais rápido.
+    """
+
+    def __init__(self, models: List[str], cooldown: float = COOLDOWN_SEGUNDOS, falhas_para_abrir: int = FALHAS_PARA_ABRIR, alpha: float = 0.3):
+        self.models = list(models)
+        self.cooldown = cooldown
+        self.falhas_para_abrir = falhas_para_abrir
+        self.alpha = alpha
+        self._saude = {m: ModelHealth() for m in self.models}
+        self._lock = threading.Lock()
+
+    def _custo(self, model: str) -> float:
+        saude = self._saude[model]
+        # Penaliza modelos que erram com frequência mesmo quando o circuito está fechado
+        return saude.latencia * (1 + 4 * saude.taxa_erro)
+
+    def escolher(self, preferido: str = None, evitar=()) -> str:
+        """
+        Retorna o modelo saudável mais rápido; sem medições, mantém o preferido
+        ou segue a ordem da lista. Modelos em `evitar` (ex.: o que acabou de
+        falhar) só são usados se não houver outra opção. Se todos os circuitos
+        estiverem abertos, levanta NenhumModeloDisponivel em vez de chamar um
+        modelo que sabidamente está fora.
+        """
+        agora = time.monotonic()
+        with self._lock:
+            saudaveis = [m for m in self.models if self._saude[m].disponivel(agora)]
+            saudaveis = [m for m in saudaveis if m not in evitar] or saudaveis
+            if not saudaveis:
+                volta = min(s.aberto_ate for s in self._saude.values()) - agora
+                raise NenhumModeloDisponivel(f"Nenhum modelo disponível: todos os circuitos abertos (o primeiro volta em {volta:.0f}s)")
+
+            medidos = [m for m in saudaveis if self._saude[m].latencia is not None]
+            if medidos:
+                return min(medidos, key=self._custo)
+            if preferido in saudaveis:
+                return preferido
+            return saudaveis[0]
+
+    def registrar_sucesso(self, model: str, latencia: float):
+        with self._lock:
+            saude = self._saude.setdefault(model, ModelHealth())
+            saude.latencia = latencia if saude.latencia is None else (1 - self.alpha) * saude.latencia + self.alpha * latencia
+            saude.taxa_erro = (1 - self.alpha) * saude.taxa_erro
+            saude.falhas_seguidas = 0
+            saude.aberto_ate = 0.0
+
+    def registrar_falha(self, model: str):
+        with self._lock:
+            saude = self._saude.setdefault(model, ModelHealth())
+            saude.taxa_erro = (1 - self.alpha) * saude.taxa_erro + self.alpha
+            saude.falhas_seguidas += 1
+            if saude.falhas_seguidas >= self.falhas_para_abrir:
+                saude.aberto_ate = time.monotonic() + self.cooldown
+                print(f"[AVISO] Circuito aberto para {model} por {self.cooldown:.0f}s")
+
+    @staticmethod
+    def backoff(tentativa: int, base: float = 0.5, teto: float = 30.0) -> float:
+        """Backoff exponencial com jitter completo: espera aleatória entre 0 e min(teto, base * 2^tentativa)."""
+        return random.uniform(0, min(teto, base * 2 ** tentativa))
+
+    def snapshot(self) -> dict:
+        """Estado atual de cada modelo, para logs e métricas."""
+        agora = time.monotonic()
+        with self._lock:
+            return {
+                m: {
+                    "latencia": s.latencia,
+                    "taxa_erro": s.taxa_erro,
+                    "aberto": not s.disponivel(agora),
+                }
+                for m, s in self._saude.items()
+            }
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_model_scheduler(models: List[str]) -> ModelScheduler:
+    """Agendador único por processo, compartilhado entre todos os agentes."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ModelScheduler(models)
+    return _scheduler
@@ -0,0 +1,59 @@
+# Limites de concorrência e de taxa para as chamadas aos LLMs
+import os
+import time
+import asyncio
+
+MAX_LLM_CONCURRENCY = int(os.getenv("PULSENLP_MAX_LLM_CONCURRENCY", "8"))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("PULSENLP_LLM_RPM", "30"))
+
+
+class RateLimiter:
+    """
+    Token bucket assíncrono: no máximo `rate` requisições por segundo, com rajadas de até `burst`.
+
+    Cada acquire() reserva o seu token na hora (o saldo pode ficar negativo) e
+    dorme só o tempo que falta para ele, sem lock: os pedidos seguintes já
+    calculam a própria espera atrás dos anteriores.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._ultimo = time.monotonic()
+
+    def _reabastecer(self):
+        agora = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (agora - self._ultimo) * self.rate)
+        self._ultimo = agora
+
+    async def acquire(self):
+        """Reserva um token e espera até ele estar disponível."""
+        # Sem await entre reabastecer e reservar: o event loop já serializa esta parte
+        self._reabastecer()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return
+        try:
+            await asyncio.sleep(-self._tokens / self.rate)
+        except asyncio.CancelledError:
+            # Desistiu antes da vez: devolve a reserva
+            self._tokens += 1
+            raise
+
+
+_semaforo = None
+_limitadores = {}
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """Semáforo global: teto de requisições simultâneas aos provedores."""
+    global _semaforo
+    if _semaforo is None:
+        _semaforo = asyncio.Semaphore(MAX_LLM_CONCURRENCY)
+    return _semaforo
+
+def get_rate_limiter(model_id: str) -> RateLimiter:
+    """Limitador por modelo, para não estourar o limite de requisições (HTTP 429) do provedor."""
+    if model_id not in _limitadores:
+        _limitadores[model_id] = RateLimiter(rate=LLM_REQUESTS_PER_MINUTE / 60, burst=max(1, MAX_LLM_CONCURRENCY))
+    return _limitadores[model_id]
@@ -0,0 +1,239 @@
+# Várias simulações (tópico + agentes + arquivo de saída) rodando no mesmo processo
+import os
+import time
+import asyncio
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+
+from pulsenlp.simulation_module.rate_limit import MAX_LLM_CONCURRENCY
+from pulsenlp.simulation_module.user_profiles import UserProfile
+from pulsenlp.simulation_module.thought_generator import UserAgent
+from pulsenlp.storage_module.comment_repository import ARQUIVO_PADRAO
+
+SENTIMENT_SLOTS = int(os.getenv("PULSENLP_SENTIMENT_SLOTS", "32"))
+SESSOES_DIR = os.getenv("PULSENLP_SESSIONS_DIR", os.path.join("pulsenlp", "sessoes"))
+
+
+class FairShare:
+    """
+    Divide uma capacidade fixa (vagas simultâneas) entre sessões de forma justa.
+
+    Enquanto sobra vaga, qualquer pedido passa direto. Quando há fila, a próxima
+    vaga vai para a sessão com menor tempo virtual (vagas recebidas / peso):
+    uma sessão com 10 agentes não ocupa o LLM inteiro enquanto outra com 2
+    espera. Uma sessão que volta a pedir depois de ociosa entra com o menor
+    tempo virtual das ativas, sem crédito acumulado.
+    """
+
+    def __init__(self, capacidade: int):
+        self.capacidade = capacidade
+        self._em_uso = 0
+        self._filas = {}
+        self._tempo_virtual = {}
+        self._pesos = {}
+
+    def definir_peso(self, sessao: str, peso: float):
+        self._pesos[sessao] = max(peso, 1e-6)
+
+    def remover(self, sessao: str):
+        self._filas.pop(sessao, None)
+        self._tempo_virtual.pop(sessao, None)
+        self._pesos.pop(sessao, None)
+
+    def _conceder(self, sessao: str):
+        self._em_uso += 1
+        self._tempo_virtual[sessao] = self._tempo_virtual.get(sessao, 0.0) + 1 / self._pesos.get(sessao, 1.0)
+
+    def _despachar(self):
+        while self._em_uso < self.capacidade:
+            candidatas = [s for s, fila in self._filas.items() if fila]
+            if not candidatas:
+                return
+            sessao = min(candidatas, key=lambda s: self._tempo_virtual.get(s, 0.0))
+            futuro = self._filas[sessao].popleft()
+            if futuro.done():
+                continue
+            self._conceder(sessao)
+            futuro.set_result(None)
+
+    async def acquire(self, sessao: str):
+        if self._em_uso < self.capacidade and not any(self._filas.values()):
+            self._conceder(sessao)
+            return
+
+        fila = self._filas.setdefault(sessao, deque())
+        if not fila:
+            ativas = [self._tempo_virtual.get(s, 0.0) for s, f in self._filas.items() if f and s != sessao]
+            if ativas:
+                self._tempo_virtual[sessao] = max(self._tempo_virtual.get(sessao, 0.0), min(ativas))
+
+        futuro = asyncio.get_running_loop().create_future()
+        fila.append(futuro)
+        try:
+            await futuro
+        except asyncio.CancelledError:
+            if futuro.done() and not futuro.cancelled():
+                # A vaga chegou junto com o cancelamento: devolve
+                self.release()
+            elif futuro in fila:
+                fila.remove(futuro)
+            raise
+
+    def release(self):
+        self._em_uso -= 1
+        self._despachar()
+
+    @asynccontextmanager
+    async def vaga(self, sessao: str):
+        await self.acquire(sessao)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+class MetricasSessao:
+    """Contadores e latências (média móvel exponencial) de uma sessão."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.inicio = time.monotonic()
+        self.comentarios = 0
+        self.falhas = 0
+        self.latencias = {}
+        self._instantes = deque(maxlen=1000)
+
+    def registrar_latencia(self, etapa: str, segundos: float):
+        anterior = self.latencias.get(etapa)
+        self.latencias[etapa] = segundos if anterior is None else self.alpha * segundos + (1 - self.alpha) * anterior
+
+    def registrar_comentario(self):
+        self.comentarios += 1
+        self._instantes.append(time.monotonic())
+
+    def registrar_falha(self):
+        self.falhas += 1
+
+    def por_minuto(self, janela: float = 60.0) -> float:
+        agora = time.monotonic()
+        recentes = sum(1 for t in self._instantes if agora - t <= janela)
+        return recentes * 60.0 / min(janela, max(agora - self.inicio, 1e-6))
+
+    def to_dict(self) -> dict:
+        return {
+            "comentarios": self.comentarios,
+            "falhas": self.falhas,
+            "comentarios_por_minuto": round(self.por_minuto(), 2),
+            "latencia_llm": self.latencias.get("llm"),
+            "latencia_sentimento": self.latencias.get("sentimento"),
+            "duracao": round(time.monotonic() - self.inicio, 1),
+        }
+
+
+class Sessao:
+    """Uma simulação: tópico, agentes, arquivo de saída e métricas próprios."""
+
+    def __init__(self, sessao_id: str, topico: str, path: str, agendador: "SessionScheduler", peso: float = 1.0):
+        self.id = sessao_id
+        self.topico = topico
+        self.path = path
+        self.peso = peso
+        self.agendador = agendador
+        self.agentes = []
+        self.metricas = MetricasSessao()
+        self._tarefas = {}
+
+    @property
+    def ativa(self) -> bool:
+        return any(not t.done() for t in self._tarefas.values())
+
+    def vaga(self, recurso: str):
+        """Context manager assíncrono que reserva uma vaga de "llm" ou "sentimento" para a sessão."""
+        return self.agendador.recursos[recurso].vaga(self.id)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "topico": self.topico,
+            "path": self.path,
+            "agentes": [a.user_profile.name for a in self.agentes],
+            "ativa": self.ativa,
+            **self.metricas.to_dict(),
+        }
+
+
+class SessionScheduler:
+    """
+    Gerencia várias sessões de simulação no mesmo event loop.
+
+    O acesso ao LLM e ao sentimento passa por um FairShare por recurso, com
+    capacidades PULSENLP_MAX_LLM_CONCURRENCY e PULSENLP_SENTIMENT_SLOTS. Os
+    métodos devem ser chamados de dentro do event loop da simulação.
+    """
+
+    def __init__(self, capacidade_llm: int = MAX_LLM_CONCURRENCY, capacidade_sentimento: int = SENTIMENT_SLOTS, delay_range=(5, 20)):
+        self.recursos = {"llm": FairShare(capacidade_llm), "sentimento": FairShare(capacidade_sentimento)}
+        self.delay_range = delay_range
+        self.sessoes = {}
+        self._ids = itertools.count(1)
+
+    def _novo_agente(self, sessao: Sessao, agente: UserAgent = None):
+        from pulsenlp.simulation_module.async_runner import simulate_user
+
+        agente = agente or UserAgent(UserProfile.generate_random())
+        tarefa = asyncio.create_task(simulate_user(agente, sessao.topico, self.delay_range, sessao=sessao))
+        sessao.agentes.append(agente)
+        sessao._tarefas[id(agente)] = tarefa
+
+    def iniciar(self, topico: str, num_users: int = 3, sessao_id: str = None, path: str = None, peso: float = 1.0, agentes: list = None) -> Sessao:
+        """Cria uma sessão e começa a simular seus agentes."""
+        sessao_id = sessao_id or f"sessao-{next(self._ids)}"
+        if sessao_id in self.sessoes and self.sessoes[sessao_id].ativa:
+            raise ValueError(f"Sessão já está rodando: {sessao_id}")
+
+        path = path or os.path.join(SESSOES_DIR, f"{sessao_id}{os.path.splitext(ARQUIVO_PADRAO)[1]}")
+        sessao = Sessao(sessao_id, topico, path, self, peso)
+        for recurso in self.recursos.values():
+            recurso.definir_peso(sessao_id, peso)
+
+        for agente in (agentes or [None] * num_users):
+            self._novo_agente(sessao, agente)
+        self.sessoes[sessao_id] = sessao
+        print(f"[INFO] Sessão {sessao_id} iniciada: {topico} ({len(sessao.agentes)} agentes)")
+        return sessao
+
+    async def parar(self, sessao_id: str):
+        """Cancela os agentes da sessão; o arquivo de saída é mantido."""
+        sessao = self.sessoes.pop(sessao_id, None)
+        if sessao is None:
+            return None
+        for tarefa in sessao._tarefas.values():
+            tarefa.cancel()
+        await asyncio.gather(*sessao._tarefas.values(), return_exceptions=True)
+        for recurso in self.recursos.values():
+            recurso.remover(sessao_id)
+        print(f"[INFO] Sessão {sessao_id} parada.")
+        return sessao
+
+    def mudar_topico(self, sessao_id: str, topico: str):
+        """Troca o tópico de uma sessão em andamento; vale a partir do próximo comentário de cada agente."""
+        self.sessoes[sessao_id].topico = topico
+        print(f"[INFO] Sessão {sessao_id}: novo tópico {topico}")
+
+    def redimensionar(self, sessao_id: str, num_users: int):
+        """Adiciona ou remove agentes de uma sessão em andamento."""
+        sessao = self.sessoes[sessao_id]
+        while len(sessao.agentes) < num_users:
+            self._novo_agente(sessao)
+        while len(sessao.agentes) > max(num_users, 0):
+            agente = sessao.agentes.pop()
+            sessao._tarefas.pop(id(agente)).cancel()
+
+    def metricas(self) -> dict:
+        """Estado e throughput de cada sessão."""
+        return {sessao_id: sessao.to_dict() for sessao_id, sessao in self.sessoes.items()}
+
+    async def parar_todas(self):
+        for sessao_id in list(self.sessoes):
+            await self.parar(sessao_id)
@@ -1,9 +1,14 @@
 import os
+import time
+import asyncio
+from contextlib import nullcontext
 from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.memory.manager import UserMemory
 from agno.models.groq.groq import Groq  # <- provedor Groq no Agno
 from pulsenlp.simulation_module.user_profiles import UserProfile
+from pulsenlp.simulation_module.rate_limit import get_llm_semaphore, get_rate_limiter
+from pulsenlp.simulation_module.model_scheduler import get_model_scheduler, MAX_TENTATIVAS, NenhumModeloDisponivel
 
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
@@ -27,31 +32,91 @@ class UserAgent(Agent):
         self.user_profile = user_profile
         self.models = modelos_disponiveis
         self.current = 0
+        self._clientes = {}
 
         super().__init__(
             role=f"Usuário {user_profile.name} ({user_profile.style}, {user_profile.tone}) comentando sobre um tópico fornecido",
             instructions="Você é um usuário com um perfil específico." \
             "Gere pensamentos baseados no tópico que foi fornecido, mantendo congruência com o estilo e tom que lhe foram dados.",
-            model=Groq(id=self.models[self.current], api_key=GROQ_API_KEY),
+            model=self._cliente(self.models[self.current]),
             #memory=UserMemory(),
             **kwargs
         )
 
+    def _cliente(self, model_id: str) -> Groq:
+        """Reaproveita o cliente Groq de cada modelo em vez de recriá-lo a cada troca."""
+        if model_id not in self._clientes:
+            self._clientes[model_id] = Groq(id=model_id, api_key=GROQ_API_KEY)
+        return self._clientes[model_id]
+
+    def _usar_modelo(self, model_id: str):
+        if model_id != self.models[self.current]:
+            print(f"[INFO] Trocando para modelo: {model_id}")
+            self.current = self.models.index(model_id)
+        self.model = self._cliente(model_id)
+
     def _switch_model(self):
         """Troca para o próximo modelo da lista."""
-        self.current = (self.current + 1) % len(self.models)
-        print(f"[INFO] Trocando para modelo: {self.models[self.current]}")
-        self.model = Groq(id=self.models[self.current], api_key=GROQ_API_KEY)
+        self._usar_modelo(self.models[(self.current + 1) % len(self.models)])
 
     def generate_thought(self, topico) -> str:
-        """Gera um pensamento do usuário, trocando de modelo se falhar."""
-        try:
-            response = self.run(f"Diga uma opinião curta sobre o seguinte tópico: {topico}")
-            return str(response.content)
-        except Exception as e:
-            print(f"[ERRO] {e} -> tentando próximo modelo...")
-            self._switch_model()
-            return self.generate_thought(topico)
+        """Gera um pensamento do usuário, trocando de modelo com backoff se falhar."""
+        scheduler = get_model_scheduler(self.models)
+        prompt = f"Diga uma opinião curta sobre o seguinte tópico: {topico}"
+        falhou = set()
+
+        for tentativa in range(MAX_TENTATIVAS):
+            model_id = scheduler.escolher(self.models[self.current], evitar=falhou)
+            self._usar_modelo(model_id)
+            inicio = time.monotonic()
+            try:
+                response = self.run(prompt)
+                scheduler.registrar_sucesso(model_id, time.monotonic() - inicio)
+                return str(response.content)
+            except Exception as e:
+                scheduler.registrar_falha(model_id)
+                falhou.add(model_id)
+                print(f"[ERRO] {e} -> tentando próximo modelo...")
+                if tentativa < MAX_TENTATIVAS - 1:
+                    time.sleep(scheduler.backoff(tentativa))
+
+        raise NenhumModeloDisponivel(f"Nenhum modelo respondeu após {MAX_TENTATIVAS} tentativas")
+
+    async def agenerate_thought(self, topico, vaga=None) -> str:
+        """
+        Versão assíncrona de generate_thought, limitada pelo limite de taxa do modelo e pelo semáforo global (só durante a chamada).
+
+        `vaga` é uma função que devolve um context manager assíncrono (ex.: a
+        vaga "llm" da sessão); ele também só é ocupado durante a chamada ao
+        modelo, nunca nas esperas de backoff ou de limite de taxa.
+        """
+        scheduler = get_model_scheduler(self.models)
+        prompt = f"Diga uma opinião curta sobre o seguinte tópico: {topico}"
+        falhou = set()
+
+        for tentativa in range(MAX_TENTATIVAS):
+            model_id = scheduler.escolher(self.models[self.current], evitar=falhou)
+            self._usar_modelo(model_id)
+            try:
+                # O token do modelo vem antes do semáforo: quem espera um modelo
+                # limitado não ocupa as vagas globais das chamadas a outros modelos
+                await get_rate_limiter(model_id).acquire()
+                async with (vaga() if vaga is not None else nullcontext()), get_llm_semaphore():
+                    inicio = time.monotonic()
+                    if hasattr(self, "arun"):
+                        response = await self.arun(prompt)
+                    else:
+                        response = await asyncio.to_thread(self.run, prompt)
+                scheduler.registrar_sucesso(model_id, time.monotonic() - inicio)
+                return str(response.content)
+            except Exception as e:
+                scheduler.registrar_falha(model_id)
+                falhou.add(model_id)
+                print(f"[ERRO] {e} -> tentando próximo modelo...")
+                if tentativa < MAX_TENTATIVAS - 1:
+                    await asyncio.sleep(scheduler.backoff(tentativa))
+
+        raise NenhumModeloDisponivel(f"Nenhum modelo respondeu após {MAX_TENTATIVAS} tentativas")
 
 
 # ====================== TESTE ======================
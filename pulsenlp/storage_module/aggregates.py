@@ -0,0 +1,137 @@
+# Agregados em streaming do sentimento (por agente, tópico, estilo e tom)
+import math
+import threading
+from typing import Dict, Iterable
+
+from pulsenlp.storage_module.comment_repository import get_repositorio
+
+DIMENSOES = ("nome", "topic", "style", "tone")
+
+
+class RunningStats:
+    """Contagem, média, variância (Welford), mínimo, máximo e média móvel exponencial, em O(1) por valor."""
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.ema = None
+
+    def update(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+        self.ema = x if self.ema is None else self.alpha * x + (1 - self.alpha) * self.ema
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def merge(self, outro: "RunningStats") -> "RunningStats":
+        """Combina dois agregados (fórmula paralela de Chan); a EMA só é mantida se um dos lados estiver vazio."""
+        junto = RunningStats(self.alpha)
+        junto.count = self.count + outro.count
+        if junto.count == 0:
+            return junto
+        delta = outro.mean - self.mean
+        junto.mean = self.mean + delta * outro.count / junto.count
+        junto._m2 = self._m2 + outro._m2 + delta ** 2 * self.count * outro.count / junto.count
+        junto.min = min(self.min, outro.min)
+        junto.max = max(self.max, outro.max)
+        if not self.count or not outro.count:
+            junto.ema = self.ema if self.count else outro.ema
+        return junto
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": self.variance,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "ema": self.ema,
+        }
+
+
+class AggregateStore:
+    """
+    Mantém RunningStats do rating por valor de cada dimensão e por célula
+    (combinação nome/topic/style/tone).
+
+    Consultas sem filtro usam os agregados por dimensão direto; visões
+    filtradas (ex.: média por agente dentro de um tópico) combinam as células
+    que batem com o filtro, sem tocar nos comentários brutos.
+    """
+
+    def __init__(self, dimensoes: Iterable[str] = DIMENSOES, coluna: str = "rating", alpha: float = 0.2):
+        self.dimensoes = tuple(dimensoes)
+        self.coluna = coluna
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._lock_leitura = threading.Lock()
+        self._resetar()
+
+    def _resetar(self):
+        self._por_dimensao: Dict[str, Dict[str, RunningStats]] = {d: {} for d in self.dimensoes}
+        self._celulas: Dict[tuple, RunningStats] = {}
+        self._offset = 0
+        self._inode = None
+
+    def update(self, comentario: dict):
+        valor = comentario.get(self.coluna)
+        if not isinstance(valor, (int, float)):
+            return
+        with self._lock:
+            for dim in self.dimensoes:
+                chave = comentario.get(dim)
+                self._por_dimensao[dim].setdefault(chave, RunningStats(self.alpha)).update(valor)
+            celula = tuple(comentario.get(d) for d in self.dimensoes)
+            self._celulas.setdefault(celula, RunningStats(self.alpha)).update(valor)
+
+    def update_many(self, comentarios: Iterable[dict]):
+        for comentario in comentarios:
+            self.update(comentario)
+
+    def acompanhar(self, path: str):
+        """Incorpora os comentários gravados no log desde a última chamada."""
+        repositorio = get_repositorio(path)
+        with self._lock_leitura:
+            inode, fim = repositorio.estado()
+            if inode is None:
+                # Dados apagados: os agregados antigos não valem mais
+                if self._inode is not None:
+                    with self._lock:
+                        self._resetar()
+                return
+            if inode != self._inode or fim < self._offset:
+                # Arquivo recriado: recomeça os agregados
+                with self._lock:
+                    self._resetar()
+                    self._inode = inode
+            novos, self._offset = repositorio.ler_desde(self._offset)
+            self.update_many(novos)
+
+    def view(self, agrupar_por: str, filtros: dict = None) -> Dict[str, RunningStats]:
+        """Agregados por valor de `agrupar_por`, opcionalmente restritos a {dimensao: valor}."""
+        filtros = {d: v for d, v in (filtros or {}).items() if v not in (None, "")}
+        with self._lock:
+            if not filtros:
+                return dict(self._por_dimensao[agrupar_por])
+
+            i_grupo = self.dimensoes.index(agrupar_por)
+            indices = {self.dimensoes.index(d): str(v) for d, v in filtros.items()}
+            resultado = {}
+            for celula, stats in self._celulas.items():
+                if all(str(celula[i]) == v for i, v in indices.items()):
+                    chave = celula[i_grupo]
+                    resultado[chave] = resultado[chave].merge(stats) if chave in resultado else stats
+            return resultado
+
+    def means(self, agrupar_por: str, filtros: dict = None) -> Dict[str, float]:
+        return {chave: stats.mean for chave, stats in self.view(agrupar_por, filtros).items()}
@@ -0,0 +1,228 @@
+# Histórico de comentários em formato colunar (segmentos Arrow IPC / Feather v2)
+import os
+import json
+import glob
+import shutil
+import threading
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+
+from pulsenlp.storage_module.comment_repository import JsonlRepository, get_repositorio
+
+COLUNAS_CATEGORICAS = ("nome", "style", "tone", "topic", "subtopico")
+
+SCHEMA = pa.schema([
+    ("nome", pa.dictionary(pa.int32(), pa.string())),
+    ("style", pa.dictionary(pa.int32(), pa.string())),
+    ("tone", pa.dictionary(pa.int32(), pa.string())),
+    ("texto", pa.string()),
+    ("rating", pa.float64()),
+    ("topic", pa.dictionary(pa.int32(), pa.string())),
+    ("round", pa.int64()),
+    ("subtopico", pa.dictionary(pa.int32(), pa.string())),
+])
+
+
+class ColumnarStore:
+    """
+    Cópia colunar do log JSON Lines, em segmentos Arrow IPC dentro de um diretório.
+
+    sincronizar() converte as linhas novas do log em um segmento quando há pelo
+    menos `min_linhas` pendentes; com mais de `max_segmentos` arquivos, eles são
+    compactados em um só. nome/style/tone/topic/subtopico usam dictionary
+    encoding, então listar opções de filtro só lê os dicionários e filtros de
+    igualdade comparam códigos inteiros. A leitura usa memory-map e aplica o
+    filtro em cada record batch, sem parse de texto.
+
+    O cursor já convertido do repositório (offset em bytes ou round) e o
+    número de linhas ficam em `_estado.json`; se os dados forem recriados
+    (identidade diferente ou cursor menor), os segmentos são descartados.
+    Os segmentos guardam as primeiras `linhas` linhas do log, na mesma ordem.
+    """
+
+    def __init__(self, diretorio: str, min_linhas: int = 500, max_segmentos: int = 8):
+        self.diretorio = diretorio
+        self.min_linhas = min_linhas
+        self.max_segmentos = max_segmentos
+        self._lock = threading.Lock()
+        os.makedirs(diretorio, exist_ok=True)
+        self._estado = self._ler_estado()
+
+    # ---------------------------- estado / segmentos ----------------------------
+
+    def _caminho_estado(self) -> str:
+        return os.path.join(self.diretorio, "_estado.json")
+
+    def _ler_estado(self) -> dict:
+        try:
+            with open(self._caminho_estado(), encoding="utf-8") as f:
+                estado = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"offset": 0, "inode": None, "proximo": 0, "linhas": 0}
+        if "linhas" not in estado:
+            # Estado gravado antes da contagem de linhas: conta nos próprios segmentos
+            estado["linhas"] = self._contar_linhas()
+        return estado
+
+    def _contar_linhas(self) -> int:
+        total = 0
+        for caminho in self.segmentos():
+            with pa.memory_map(caminho) as fonte:
+                leitor = pa.ipc.open_file(fonte)
+                total += sum(leitor.get_batch(i).num_rows for i in range(leitor.num_record_batches))
+        return total
+
+    def _salvar_estado(self):
+        tmp = self._caminho_estado() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._estado, f)
+        os.replace(tmp, self._caminho_estado())
+
+    def segmentos(self) -> list:
+        return sorted(glob.glob(os.path.join(self.diretorio, "seg-*.arrow")))
+
+    def _limpar(self):
+        for caminho in self.segmentos():
+            os.remove(caminho)
+        self._estado = {"offset": 0, "inode": None, "proximo": 0, "linhas": 0}
+
+    @property
+    def offset(self) -> int:
+        """Até onde (cursor do repositório) os dados já estão refletidos nos segmentos."""
+        return self._estado["offset"]
+
+    @property
+    def linhas(self) -> int:
+        """Quantas linhas do início do log já estão nos segmentos."""
+        return self._estado["linhas"]
+
+    # ---------------------------------- escrita ---------------------------------
+
+    @staticmethod
+    def _tabela(comentarios: list) -> pa.Table:
+        colunas = {campo.name: [c.get(campo.name) for c in comentarios] for campo in SCHEMA}
+        arrays = []
+        for campo in SCHEMA:
+            if campo.name in COLUNAS_CATEGORICAS:
+                valores = pa.array([None if v is None else str(v) for v in colunas[campo.name]], pa.string())
+                arrays.append(pc.dictionary_encode(valores).cast(campo.type))
+            else:
+                arrays.append(pa.array(colunas[campo.name], campo.type))
+        return pa.Table.from_arrays(arrays, schema=SCHEMA)
+
+    def _gravar_segmento(self, tabela: pa.Table):
+        caminho = os.path.join(self.diretorio, f"seg-{self._estado['proximo']:06d}.arrow")
+        tmp = caminho + ".tmp"
+        feather.write_feather(tabela, tmp, compression="uncompressed")  # sem compressão para permitir memory-map
+        os.replace(tmp, caminho)
+        self._estado["proximo"] += 1
+
+    def append(self, comentarios: list):
+        """Grava comentários como um novo segmento."""
+        if comentarios:
+            with self._lock:
+                self._gravar_segmento(self._tabela(comentarios))
+                self._estado["linhas"] += len(comentarios)
+                self._salvar_estado()
+
+    def sincronizar(self, log_path: str, forcar: bool = False) -> int:
+        """Converte as linhas novas do log; retorna quantas foram gravadas."""
+        repositorio = get_repositorio(log_path)
+        with self._lock:
+            inode, fim = repositorio.estado()
+            if inode is None:
+                return 0
+            if self._estado["inode"] not in (None, inode) or fim < self._estado["offset"]:
+                self._limpar()
+            self._estado["inode"] = inode
+
+            # Estimativa barata antes de ler: no JSON Lines o cursor é em bytes
+            # (~64 bytes por comentário no mínimo), no SQLite é o round
+            pendentes = fim - self._estado["offset"]
+            minimo = self.min_linhas * (64 if isinstance(repositorio, JsonlRepository) else 1)
+            if pendentes == 0 or (pendentes < minimo and not forcar):
+                return 0
+            novos, offset = repositorio.ler_desde(self._estado["offset"])
+            if not novos or (len(novos) < self.min_linhas and not forcar):
+                return 0
+
+            self._gravar_segmento(self._tabela(novos))
+            self._estado["offset"] = offset
+            self._estado["linhas"] += len(novos)
+            if len(self.segmentos()) > self.max_segmentos:
+                self._compactar()
+            self._salvar_estado()
+            return len(novos)
+
+    def _compactar(self):
+        segmentos = self.segmentos()
+        if len(segmentos) <= 1:
+            return
+        tabela = pa.concat_tables([feather.read_table(s, memory_map=True) for s in segmentos]).unify_dictionaries()
+        self._gravar_segmento(tabela.combine_chunks())
+        for caminho in segmentos:
+            os.remove(caminho)
+
+    def compactar(self):
+        """Junta todos os segmentos em um só."""
+        with self._lock:
+            self._compactar()
+            self._salvar_estado()
+
+    # ---------------------------------- leitura ---------------------------------
+
+    def _dataset(self):
+        segmentos = self.segmentos()
+        if not segmentos:
+            return None
+        return ds.dataset(segmentos, format="ipc", schema=SCHEMA)
+
+    @staticmethod
+    def _expressao(filtros: dict):
+        expressao = None
+        for coluna, valor in (filtros or {}).items():
+            if valor in (None, ""):
+                continue
+            tipo = SCHEMA.field(coluna).type
+            if pa.types.is_dictionary(tipo):
+                termo = ds.field(coluna) == str(valor)
+            else:
+                try:
+                    termo = ds.field(coluna) == pa.scalar(valor).cast(tipo)
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    # Valor que nem converte para o tipo da coluna: nenhuma linha bate
+                    termo = ds.scalar(False)
+            expressao = termo if expressao is None else expressao & termo
+        return expressao
+
+    def ler(self, filtros: dict = None, colunas: list = None) -> pa.Table:
+        """Lê os segmentos (memory-map) aplicando {coluna: valor} como filtro de igualdade."""
+        dataset = self._dataset()
+        if dataset is None:
+            return SCHEMA.empty_table()
+        return dataset.to_table(columns=colunas, filter=self._expressao(filtros))
+
+    def ler_pandas(self, filtros: dict = None, colunas: list = None):
+        """Como ler(), mas devolve um DataFrame com as colunas de dicionário como `category`."""
+        return self.ler(filtros, colunas).to_pandas()
+
+    def opcoes(self, coluna: str) -> list:
+        """Valores distintos de uma coluna categórica, lidos só dos dicionários de cada segmento."""
+        valores = set()
+        for caminho in self.segmentos():
+            with pa.memory_map(caminho) as fonte:
+                leitor = pa.ipc.open_file(fonte)
+                for i in range(leitor.num_record_batches):
+                    coluna_lote = leitor.get_batch(i).column(coluna)
+                    valores.update(v for v in coluna_lote.dictionary.to_pylist() if v is not None)
+        return sorted(valores)
+
+    def apagar(self):
+        """Remove o diretório inteiro."""
+        with self._lock:
+            shutil.rmtree(self.diretorio, ignore_errors=True)
+            os.makedirs(self.diretorio, exist_ok=True)
+            self._estado = {"offset": 0, "inode": None, "proximo": 0, "linhas": 0}
@@ -0,0 +1,120 @@
+# Log append-only de comentários (JSON Lines)
+import os
+import json
+import threading
+
+
+class CommentLog:
+    """
+    Armazena comentários em um arquivo JSON Lines, um registro por linha.
+
+    Cada novo comentário é gravado com um único os.write em um descritor aberto
+    com O_APPEND, então o custo de escrita é O(1) e leitores nunca precisam
+    lidar com o arquivo sendo reescrito. O campo "round" vem de um contador em
+    memória, inicializado a partir das linhas já existentes no arquivo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = None
+        self._round = self._recover()
+
+    def _recover(self) -> int:
+        """Conta os registros válidos e descarta uma última linha incompleta (crash no meio da escrita)."""
+        if not os.path.exists(self.path):
+            return 0
+
+        with open(self.path, "rb") as f:
+            conteudo = f.read()
+
+        fim_valido = conteudo.rfind(b"\n") + 1
+        if fim_valido < len(conteudo):
+            print(f"[AVISO] Descartando registro incompleto no fim de {self.path}")
+            with open(self.path, "r+b") as f:
+                f.truncate(fim_valido)
+
+        return sum(1 for linha in conteudo[:fim_valido].splitlines() if linha.strip())
+
+    @property
+    def round(self) -> int:
+        """Número do último round gravado."""
+        return self._round
+
+    def append(self, entry: dict) -> dict:
+        """Grava um comentário no fim do log, atribuindo o próximo round."""
+        with self._lock:
+            if self._fd is None:
+                diretorio = os.path.dirname(self.path)
+                if diretorio:
+                    os.makedirs(diretorio, exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+            registro = dict(entry, round=self._round + 1)
+            linha = json.dumps(registro, ensure_ascii=False) + "\n"
+            os.write(self._fd, linha.encode("utf-8"))
+            self._round += 1
+
+        return registro
+
+    def close(self):
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def load_comments(path: str) -> list:
+    """
+    Lê todos os comentários de um arquivo.
+
+    Aceita tanto o formato JSON Lines quanto o formato antigo (lista JSON única),
+    ignorando linhas incompletas que um escritor ainda não terminou de gravar.
+    """
+    if not os.path.exists(path):
+        return []
+
+    with open(path, encoding="utf-8") as f:
+        conteudo = f.read()
+
+    if conteudo.lstrip().startswith("["):
+        return json.loads(conteudo)
+
+    # Só considera linhas terminadas em "\n"; o resto ainda está sendo escrito
+    conteudo = conteudo[:conteudo.rfind("\n") + 1]
+
+    comentarios = []
+    for linha in conteudo.splitlines():
+        if not linha.strip():
+            continue
+        try:
+            comentarios.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return comentarios
+
+
+def read_comments_since(path: str, offset: int = 0) -> tuple:
+    """
+    Lê apenas os comentários gravados a partir de `offset` (em bytes).
+
+    Retorna (comentarios, novo_offset). Linhas ainda incompletas ficam para a
+    próxima leitura, então o novo offset sempre aponta para o início de uma linha.
+    """
+    if not os.path.exists(path):
+        return [], 0
+
+    with open(path, "rb") as f:
+        f.seek(offset)
+        bloco = f.read()
+
+    fim_valido = bloco.rfind(b"\n") + 1
+    comentarios = []
+    for linha in bloco[:fim_valido].splitlines():
+        if not linha.strip():
+            continue
+        try:
+            comentarios.append(json.loads(linha))
+        except json.JSONDecodeError:
+            continue
+    return comentarios, offset + fim_valido
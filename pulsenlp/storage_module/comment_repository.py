@@ -0,0 +1,274 @@
+# Repositório de comentários: JSON Lines (padrão) ou SQLite em modo WAL
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+
+from pulsenlp.batching import MicroBatcher
+from pulsenlp.storage_module.comment_log import CommentLog, load_comments, read_comments_since
+
+# "jsonl" ou "sqlite"; o backend de um caminho é escolhido pela extensão
+BACKEND = os.getenv("PULSENLP_STORAGE", "jsonl")
+ARQUIVO_PADRAO = "data.sqlite" if BACKEND == "sqlite" else "data.jsonl"
+EXTENSOES_SQLITE = (".sqlite", ".sqlite3", ".db")
+
+COLUNAS = ("nome", "style", "tone", "texto", "rating", "topic", "subtopico")
+TAMANHO_ASSINATURA = 4096  # bytes do início do arquivo que entram na identidade do JSON Lines
+
+
+class JsonlRepository:
+    """
+    Comentários no log JSON Lines (CommentLog).
+
+    O cursor de leitura incremental é o offset em bytes já lido do arquivo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._log = None
+        self._lock = threading.Lock()
+
+    def _get_log(self) -> CommentLog:
+        # Só quem escreve abre o log (a abertura pode truncar uma linha incompleta)
+        with self._lock:
+            if self._log is None:
+                self._log = CommentLog(self.path)
+            return self._log
+
+    def append(self, entry: dict) -> dict:
+        """Grava um comentário e retorna o registro com o round atribuído."""
+        return self._get_log().append(entry)
+
+    def append_many(self, entries: list) -> list:
+        return [self.append(e) for e in entries]
+
+    def ler_todos(self) -> list:
+        return load_comments(self.path)
+
+    def ler_desde(self, cursor: int = 0) -> tuple:
+        """(comentarios, novo_cursor) com o que foi gravado depois de `cursor`."""
+        return read_comments_since(self.path, cursor)
+
+    def estado(self) -> tuple:
+        """
+        (identidade, cursor_final): a identidade muda se o arquivo for recriado.
+
+        O sistema pode reaproveitar o inode de um arquivo apagado, então a
+        identidade também inclui um hash da primeira linha (o primeiro comentário).
+        """
+        try:
+            with open(self.path, "rb") as f:
+                st = os.fstat(f.fileno())
+                inicio = f.read(TAMANHO_ASSINATURA)
+        except FileNotFoundError:
+            return None, 0
+        primeira_linha = inicio.split(b"\n", 1)[0]
+        return f"{st.st_ino}:{hashlib.blake2b(primeira_linha, digest_size=8).hexdigest()}", st.st_size
+
+    def formato_antigo(self) -> bool:
+        """True se o arquivo ainda está no formato antigo (lista JSON única)."""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, "rb") as f:
+            return f.read(64).lstrip().startswith(b"[")
+
+    def filtrar(self, nome: str = None, topic: str = None, desde_round: int = 0) -> list:
+        return [
+            c for c in self.ler_todos()
+            if c.get("round", 0) > desde_round
+            and (nome is None or c.get("nome") == nome)
+            and (topic is None or c.get("topic") == topic)
+        ]
+
+    def close(self):
+        """Fecha o arquivo; o repositório continua utilizável e reabre na próxima gravação."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class SqliteRepository:
+    """
+    Comentários em um banco SQLite em modo WAL.
+
+    O round é a chave primária da tabela, e há índices por agente e por tópico.
+    Cada banco guarda um id de geração aleatório (tabela meta), que entra na
+    identidade junto com o inode. Cada thread usa sua própria conexão. No WAL, leitores nunca bloqueiam o
+    escritor nem veem uma transação pela metade, inclusive em outros processos.
+
+    append() passa por um MicroBatcher sem espera: comentários que chegam
+    enquanto uma transação está gravando entram juntos na próxima, então um
+    escritor sozinho não paga latência extra. O próximo round é
+    calculado dentro de um BEGIN IMMEDIATE, então vários processos podem
+    escrever no mesmo banco sem repetir rounds. O cursor de leitura
+    incremental é o último round lido.
+    """
+
+    def __init__(self, path: str, max_lote: int = 64, max_espera: float = 0.0):
+        self.path = path
+        self.max_lote = max_lote
+        self.max_espera = max_espera
+        self._local = threading.local()
+        self._conexoes = []
+        self._batcher = None
+        self._lock = threading.Lock()
+
+    def _conexao(self) -> sqlite3.Connection:
+        con = getattr(self._local, "con", None)
+        inode = os.stat(self.path).st_ino if os.path.exists(self.path) else None
+        if con is not None and getattr(self._local, "inode", None) == inode:
+            return con
+        if con is not None:
+            # Banco apagado e recriado por outro processo: reabre
+            con.close()
+
+        diretorio = os.path.dirname(self.path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS comentarios ("
+            "round INTEGER PRIMARY KEY, nome TEXT, style TEXT, tone TEXT, texto TEXT, "
+            "rating REAL, topic TEXT, subtopico TEXT, extra TEXT)"
+        )
+        con.execute("CREATE INDEX IF NOT EXISTS idx_comentarios_nome ON comentarios (nome, round)")
+        con.execute("CREATE INDEX IF NOT EXISTS idx_comentarios_topic ON comentarios (topic, round)")
+        con.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+        con.execute("INSERT OR IGNORE INTO meta VALUES ('geracao', lower(hex(randomblob(8))))")
+        geracao = con.execute("SELECT valor FROM meta WHERE chave = 'geracao'").fetchone()[0]
+
+        self._local.con = con
+        self._local.inode = os.stat(self.path).st_ino
+        self._local.identidade = f"{self._local.inode}:{geracao}"
+        with self._lock:
+            self._conexoes.append(con)
+        return con
+
+    # ---------------------------------- escrita ---------------------------------
+
+    def _inserir(self, entries: list) -> list:
+        con = self._conexao()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            ultimo = con.execute("SELECT COALESCE(MAX(round), 0) FROM comentarios").fetchone()[0]
+            registros = [dict(e, round=ultimo + i + 1) for i, e in enumerate(entries)]
+            con.executemany(
+                "INSERT INTO comentarios (round, nome, style, tone, texto, rating, topic, subtopico, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [_linha(r) for r in registros],
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return registros
+
+    def append(self, entry: dict) -> dict:
+        """Grava um comentário (em lote com as outras threads) e retorna o registro com o round."""
+        with self._lock:
+            if self._batcher is None:
+                self._batcher = MicroBatcher(self._inserir, max_batch_size=self.max_lote, max_wait=self.max_espera)
+        return self._batcher.submit(entry).result()
+
+    def append_many(self, entries: list) -> list:
+        """Grava vários comentários em uma única transação."""
+        return self._inserir(list(entries)) if entries else []
+
+    # ---------------------------------- leitura ---------------------------------
+
+    def _consultar(self, onde: str = "", parametros: tuple = ()) -> list:
+        if not os.path.exists(self.path):
+            return []
+        sql = "SELECT round, nome, style, tone, texto, rating, topic, subtopico, extra FROM comentarios"
+        linhas = self._conexao().execute(f"{sql} {onde} ORDER BY round", parametros).fetchall()
+        return [_registro(linha) for linha in linhas]
+
+    def ler_todos(self) -> list:
+        return self._consultar()
+
+    def ler_desde(self, cursor: int = 0) -> tuple:
+        """(comentarios, novo_cursor) com os rounds maiores que `cursor`."""
+        novos = self._consultar("WHERE round > ?", (cursor,))
+        return novos, novos[-1]["round"] if novos else cursor
+
+    def estado(self) -> tuple:
+        """(identidade, cursor_final): a identidade muda se o banco for recriado."""
+        if not os.path.exists(self.path):
+            return None, 0
+        con = self._conexao()
+        ultimo = con.execute("SELECT COALESCE(MAX(round), 0) FROM comentarios").fetchone()[0]
+        return self._local.identidade, ultimo
+
+    def formato_antigo(self) -> bool:
+        return False
+
+    def filtrar(self, nome: str = None, topic: str = None, desde_round: int = 0) -> list:
+        """Comentários de um agente e/ou tópico (usa os índices), a partir de um round."""
+        condicoes, parametros = ["round > ?"], [desde_round]
+        if nome is not None:
+            condicoes.append("nome = ?")
+            parametros.append(nome)
+        if topic is not None:
+            condicoes.append("topic = ?")
+            parametros.append(topic)
+        return self._consultar("WHERE " + " AND ".join(condicoes), tuple(parametros))
+
+    def close(self):
+        """Fecha o batcher e as conexões; o repositório reabre tudo sob demanda."""
+        if self._batcher is not None:
+            self._batcher.close()
+            self._batcher = None
+        with self._lock:
+            for con in self._conexoes:
+                con.close()
+            self._conexoes = []
+        self._local = threading.local()
+
+
+def _linha(registro: dict) -> tuple:
+    extra = {k: v for k, v in registro.items() if k not in COLUNAS and k != "round"}
+    return (registro["round"],) + tuple(registro.get(c) for c in COLUNAS) + (json.dumps(extra, ensure_ascii=False) if extra else None,)
+
+
+def _registro(linha: tuple) -> dict:
+    round_, *valores, extra = linha
+    # Mesmo formato do JSON Lines: subtopico só aparece quando existe
+    registro = {c: v for c, v in zip(COLUNAS, valores) if c != "subtopico" or v is not None}
+    if extra:
+        registro.update(json.loads(extra))
+    registro["round"] = round_
+    return registro
+
+
+_repositorios = {}
+_repositorios_lock = threading.Lock()
+
+def get_repositorio(path: str):
+    """Repositório compartilhado do caminho; SQLite para .sqlite/.db, JSON Lines para o resto."""
+    with _repositorios_lock:
+        repo = _repositorios.get(path)
+        if repo is None:
+            repo = SqliteRepository(path) if path.endswith(EXTENSOES_SQLITE) else JsonlRepository(path)
+            _repositorios[path] = repo
+        return repo
+
+
+def remover(path: str):
+    """
+    Apaga os dados do caminho (incluindo -wal/-shm do SQLite).
+
+    O repositório compartilhado só é fechado, não descartado: quem já o
+    guardou (DatasetCache, CanalEventos) continua usando o mesmo objeto, que
+    reabre o arquivo novo sob demanda, em vez de um segundo escritor no mesmo caminho.
+    """
+    with _repositorios_lock:
+        repo = _repositorios.get(path)
+    if repo is not None:
+        repo.close()
+    for sufixo in ("", "-wal", "-shm"):
+        if os.path.exists(path + sufixo):
+            os.remove(path + sufixo)
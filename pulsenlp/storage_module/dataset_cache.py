@@ -0,0 +1,168 @@
+# Cache incremental do DataFrame de comentários, compartilhado pelos callbacks do Dash
+import os
+import threading
+import pandas as pd
+from pulsenlp.storage_module.comment_repository import get_repositorio
+from pulsenlp.storage_module.columnar_store import COLUNAS_CATEGORICAS, SCHEMA
+
+
+def _concatenar(atual: pd.DataFrame, novos: pd.DataFrame) -> pd.DataFrame:
+    """pd.concat que preserva as colunas categóricas de `atual` (ampliando as categorias)."""
+    if atual.empty:
+        return novos
+    for col in atual.columns:
+        if not isinstance(atual[col].dtype, pd.CategoricalDtype) or col not in novos:
+            continue
+        categorias = atual[col].cat.categories
+        extras = pd.Index(novos[col].dropna().unique()).difference(categorias)
+        tipo = pd.CategoricalDtype(categorias.append(extras))
+        if len(extras):
+            atual = atual.assign(**{col: atual[col].astype(tipo)})
+        novos = novos.assign(**{col: novos[col].astype(tipo)})
+    return pd.concat([atual, novos], ignore_index=True)
+
+
+def filtrar_df(df: pd.DataFrame, filtros: dict) -> pd.DataFrame:
+    """Aplica {coluna: valor} como igualdade; os valores dos Selects chegam como texto."""
+    for col, val in filtros.items():
+        if not val:
+            continue
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Categórica: compara os códigos inteiros, sem converter a coluna em texto
+            df = df[df[col] == val]
+        else:
+            df = df[df[col].astype(str) == val]
+    return df
+
+
+class DatasetCache:
+    """
+    Mantém um único DataFrame com todos os comentários e só lê as linhas novas.
+
+    A chave do cache é o cursor do repositório (offset em bytes no JSON Lines,
+    último round no SQLite): se não mudou, o mesmo DataFrame é devolvido sem
+    nenhum parse; se cresceu, apenas os comentários novos são lidos. Se os dados
+    forem truncados ou recriados (ex.: main.py apaga o log ao iniciar), o cache recomeça do zero.
+    Arquivos no formato JSON antigo são relidos por inteiro quando o mtime muda.
+
+    Com um ColumnarStore (`columnar`), a carga inicial vem dos segmentos Arrow
+    (memory-map, colunas categóricas) e só o final do log é lido como JSON; as
+    colunas categóricas continuam categóricas conforme chegam linhas novas.
+    filtrar() e opcoes() consultam os segmentos direto (filtro no Arrow,
+    dicionários) e só tratam no pandas o final do log ainda não convertido.
+
+    Os callbacks recebem o DataFrame compartilhado e não devem alterá-lo.
+    """
+
+    def __init__(self, path: str, placeholder: dict = None, columnar=None):
+        self.path = path
+        self.placeholder = placeholder
+        self.columnar = columnar
+        self.repositorio = get_repositorio(path)
+        self._lock = threading.Lock()
+        self._geracao = 0
+        self._resetar()
+
+    def _resetar(self):
+        # Nova geração: quem guardou posições no DataFrame anterior deve recomeçar
+        self._geracao += 1
+        self._offset = 0
+        self._inode = None
+        self._antigo = False
+        self._mtime = None
+        self._df = pd.DataFrame()
+
+    def _atualizar(self):
+        inode, fim = self.repositorio.estado()
+        if inode is None:
+            self._resetar()
+            return
+
+        if inode != self._inode or fim < self._offset:
+            self._resetar()
+            self._inode = inode
+            # O formato só muda com o arquivo recriado: verifica uma vez por identidade
+            self._antigo = self.repositorio.formato_antigo()
+
+        if self._antigo:
+            mtime = os.stat(self.path).st_mtime
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self._geracao += 1
+                self._df = pd.DataFrame(self.repositorio.ler_todos())
+                self._offset = fim
+            return
+
+        if fim == self._offset:
+            return
+
+        if self.columnar is not None:
+            if self._offset == 0:
+                # Carga inicial: histórico convertido de uma vez, depois só o final do log
+                self.columnar.sincronizar(self.path, forcar=True)
+                self._df = self.columnar.ler_pandas()
+                self._offset = self.columnar.offset
+            else:
+                # Barato enquanto houver menos de min_linhas pendentes
+                self.columnar.sincronizar(self.path)
+
+        novos, self._offset = self.repositorio.ler_desde(self._offset)
+        if novos:
+            self._df = _concatenar(self._df, pd.DataFrame(novos))
+
+    def get(self) -> pd.DataFrame:
+        """Retorna o DataFrame atualizado (ou o placeholder, se ainda não há comentários)."""
+        return self.get_versionado()[0]
+
+    def get_versionado(self) -> tuple:
+        """
+        (DataFrame, identidade). Enquanto a identidade não muda, o DataFrame só
+        ganha linhas no final, então posições já vistas continuam valendo. Ela
+        muda quando os dados são recriados e é None para o placeholder.
+        """
+        with self._lock:
+            self._atualizar()
+            if self._df.empty and self.placeholder is not None:
+                return pd.DataFrame(self.placeholder), None
+            return self._df, self._geracao
+
+    def _cobertas(self, df: pd.DataFrame, identidade) -> int:
+        # Quantas linhas iniciais de df estão nos segmentos Arrow (0: tudo pelo pandas)
+        if self.columnar is None or identidade is None or identidade != self._geracao:
+            return 0
+        linhas = self.columnar.linhas
+        return linhas if linhas <= len(df) else 0
+
+    def filtrar(self, df: pd.DataFrame, identidade, filtros: dict, colunas: list = None) -> pd.DataFrame:
+        """
+        Linhas de `df` (devolvido por get_versionado) que batem com {coluna: valor}.
+
+        Com ColumnarStore, o trecho já convertido é filtrado nos segmentos
+        (só as colunas pedidas, comparando os códigos do dicionário) e só o
+        final do log passa pelo filtro do pandas.
+        """
+        filtros = {col: val for col, val in filtros.items() if val}
+        with self._lock:
+            cobertas = 0
+            if filtros and all(col in SCHEMA.names for col in list(filtros) + list(colunas or [])):
+                cobertas = self._cobertas(df, identidade)
+            if not cobertas:
+                dff = filtrar_df(df, filtros)
+                return dff if colunas is None else dff[colunas]
+            historico = self.columnar.ler_pandas(filtros, colunas)
+            cauda = filtrar_df(df.iloc[cobertas:], filtros)
+        return _concatenar(historico, cauda if colunas is None else cauda[colunas])
+
+    def opcoes(self, coluna: str) -> list:
+        """Valores distintos de uma coluna, ordenados; nos segmentos, só os dicionários são lidos."""
+        df, identidade = self.get_versionado()
+        with self._lock:
+            cobertas = self._cobertas(df, identidade) if coluna in COLUNAS_CATEGORICAS else 0
+            valores = set(self.columnar.opcoes(coluna)) if cobertas else set()
+        valores.update(df[coluna].iloc[cobertas:].dropna().unique())
+        return sorted(valores)
+
+    @property
+    def total(self) -> int:
+        """Número de comentários já carregados."""
+        return len(self._df)
@@ -3,21 +3,89 @@ import matplotlib.pyplot as plt
 import io
 import base64
 import re
+import hashlib
+from collections import Counter
 import pandas as pd
 
-from pulsenlp.nlp_module.preprocessing import process
+from pulsenlp.nlp_module.preprocessing import process, process_batch
 
-def gerar_nuvem_palavras_base64(df: pd.DataFrame, coluna: str) -> str:
+# Presets de resolução/qualidade para a renderização sem matplotlib
+PRESETS_NUVEM = {
+    "baixa": {"width": 640, "height": 360, "quality": 70},
+    "media": {"width": 1280, "height": 720, "quality": 80},
+    "alta": {"width": 1920, "height": 1080, "quality": 90},
+}
+
+FORMATOS_IMAGEM = {"png": "PNG", "webp": "WEBP", "jpeg": "JPEG"}
+
+def _limpar(texto: str) -> str:
+    return re.sub(r'[^\w\s]', '', texto)
+
+def _filtrar(lemas: list) -> list:
+    return [l for l in lemas if l.lower() not in STOPWORDS]
+
+# Os lemas de cada comentário ficam no AnnotationCache de preprocessing (LRU
+# limitado + SQLite opcional), então não há um segundo cache aqui
+
+def lemas_do_texto(texto: str) -> list:
+    """Lemas de um comentário sem stopwords; chamadas seguintes usam o cache de anotações."""
+    return _filtrar(process(_limpar(texto)))
+
+def lemas_dos_textos(textos: list) -> list:
+    """Como lemas_do_texto, mas os textos que faltam no cache passam juntos por nlp.pipe."""
+    limpos = [_limpar(t) for t in textos]
+    unicos = list(dict.fromkeys(limpos))
+    lemas = dict(zip(unicos, process_batch(unicos))) if unicos else {}
+    return [_filtrar(lemas[l]) for l in limpos]
+
+
+class FrequenciasIncrementais:
+    """
+    Contagem acumulada de lemas para a nuvem de palavras.
+
+    A cada atualização só os comentários novos (após os `processados` já
+    vistos, o cursor nas linhas da série) são lematizados e somados ao
+    contador. `identidade` vem de quem fornece a série (ex.: DatasetCache) e
+    muda quando ela recomeça (dados recriados, placeholder substituído); aí,
+    ou se a série encolher, a contagem recomeça do zero.
+    """
+
+    def __init__(self):
+        self._resetar(None)
+
+    def _resetar(self, identidade):
+        self.contagem = Counter()
+        self.processados = 0
+        self._identidade = identidade
+
+    def atualizar(self, textos, identidade=None) -> Counter:
+        """`textos` é a série inteira (lista ou pd.Series); só o trecho após `processados` é lido."""
+        total = len(textos)
+        if identidade != self._identidade or total < self.processados:
+            self._resetar(identidade)
+
+        trecho = textos.iloc[self.processados:] if isinstance(textos, pd.Series) else textos[self.processados:]
+        novos = [t for t in trecho if isinstance(t, str)]
+        for lemas in lemas_dos_textos(novos):
+            self.contagem.update(lemas)
+        self.processados = total
+        return self.contagem
+
+
+def gerar_nuvem_palavras_base64(df: pd.DataFrame, coluna: str, frequencias: FrequenciasIncrementais = None, identidade=None) -> str:
     """
     Gera uma Word Cloud a partir da coluna do DataFrame e retorna
     uma imagem em base64 para ser usada no Dash.
 
     :param df: DataFrame contendo os dados
     :param coluna: nome da coluna com textos
+    :param frequencias: contador incremental reaproveitado entre chamadas (opcional)
+    :param identidade: identidade da série de dados (ver FrequenciasIncrementais)
     :return: string base64 da imagem PNG
     """
-    texto_completo = ' '.join(df[coluna].dropna())
-    texto_completo = re.sub(r'[^\w\s]', '', texto_completo)
+    if frequencias is None:
+        frequencias = FrequenciasIncrementais()
+    contagem = frequencias.atualizar(df[coluna], identidade)
 
     wordcloud = WordCloud(
         width=1920,
@@ -25,8 +93,7 @@ def gerar_nuvem_palavras_base64(df: pd.DataFrame, coluna: str) -> str:
         background_color='white',
         max_words=200,
         colormap='viridis',
-        stopwords=STOPWORDS
-    ).generate(" ".join(process(texto_completo)))
+    ).generate_from_frequencies(contagem)
 
     plt.figure(figsize=(16, 8))
     plt.imshow(wordcloud, interpolation='bilinear')
@@ -40,3 +107,57 @@ def gerar_nuvem_palavras_base64(df: pd.DataFrame, coluna: str) -> str:
 
     img_base64 = base64.b64encode(buf.read()).decode('utf-8')
     return f"data:image/png;base64,{img_base64}"
+
+
+class RenderizadorNuvem:
+    """
+    Renderiza a nuvem direto para PNG/WebP/JPEG com WordCloud.to_image, sem matplotlib.
+
+    renderizar() devolve também o hash da tabela de frequências. A última
+    imagem fica guardada: frequências iguais não são renderizadas de novo.
+    Quem decide se reenvia a imagem é quem chama, comparando o hash com o
+    que cada cliente já tem (no dashboard, um dcc.Store por aba).
+    """
+
+    def __init__(self, preset: str = "media", formato: str = "webp", max_words: int = 200):
+        if preset not in PRESETS_NUVEM:
+            raise ValueError(f"Preset desconhecido: {preset} (use {', '.join(PRESETS_NUVEM)})")
+        if formato not in FORMATOS_IMAGEM:
+            raise ValueError(f"Formato desconhecido: {formato} (use {', '.join(FORMATOS_IMAGEM)})")
+        self.preset = PRESETS_NUVEM[preset]
+        self.formato = formato
+        self.max_words = max_words
+        # (hash, data URI) numa tupla só: callbacks em threads diferentes nunca veem um sem o outro
+        self._ultima = (None, None)
+
+    def _hash(self, contagem: Counter) -> str:
+        # Só as palavras que entram na nuvem influenciam a imagem
+        mais_comuns = sorted(contagem.most_common(self.max_words))
+        return hashlib.sha1(repr(mais_comuns).encode("utf-8")).hexdigest()
+
+    def renderizar(self, contagem: Counter) -> tuple:
+        """Retorna (hash das frequências, data URI da imagem), reaproveitando a última imagem se o hash não mudou."""
+        chave = self._hash(contagem)
+        ultima = self._ultima
+        if chave == ultima[0]:
+            return ultima
+
+        wordcloud = WordCloud(
+            width=self.preset["width"],
+            height=self.preset["height"],
+            background_color='white',
+            max_words=self.max_words,
+            colormap='viridis',
+            random_state=42,  # mesma tabela de frequências -> mesma imagem
+        ).generate_from_frequencies(contagem)
+
+        buf = io.BytesIO()
+        imagem = wordcloud.to_image()
+        if self.formato == "png":
+            imagem.save(buf, format="PNG", optimize=True)
+        else:
+            imagem.save(buf, format=FORMATOS_IMAGEM[self.formato], quality=self.preset["quality"])
+
+        img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
+        self._ultima = (chave, f"data:image/{self.formato};base64,{img_base64}")
+        return self._ultima
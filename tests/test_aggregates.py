@@ -0,0 +1,98 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from pulsenlp.storage_module.aggregates import AggregateStore, RunningStats
+
+
+def _stats(valores):
+    stats = RunningStats()
+    for v in valores:
+        stats.update(v)
+    return stats
+
+
+def _amostras(n_casos=50, seed=3):
+    rng = random.Random(seed)
+    for _ in range(n_casos):
+        n = rng.randint(0, 200)
+        escala = rng.choice([1e-3, 1.0, 1e4])
+        desvio = rng.choice([0.0, 1.0, 1e6])
+        yield [desvio + escala * rng.gauss(0, 1) for _ in range(n)], rng
+
+
+def _confere(stats, valores):
+    assert stats.count == len(valores)
+    if not valores:
+        assert stats.mean == 0.0 and stats.variance == 0.0
+        return
+    assert stats.mean == pytest.approx(np.mean(valores), rel=1e-9, abs=1e-9)
+    esperado = np.var(valores, ddof=1) if len(valores) > 1 else 0.0
+    assert stats.variance == pytest.approx(esperado, rel=1e-6, abs=1e-9)
+    assert stats.min == min(valores) and stats.max == max(valores)
+
+
+def test_welford_confere_com_numpy():
+    for valores, _ in _amostras():
+        _confere(_stats(valores), valores)
+
+
+def test_merge_de_chan_confere_com_numpy_em_qualquer_divisao():
+    for valores, rng in _amostras(seed=4):
+        corte = rng.randint(0, len(valores))
+        junto = _stats(valores[:corte]).merge(_stats(valores[corte:]))
+        _confere(junto, valores)
+
+
+def test_merge_de_varias_partes_e_associativo():
+    rng = random.Random(5)
+    valores = [rng.uniform(-1, 1) for _ in range(500)]
+    cortes = sorted(rng.sample(range(1, 500), 6))
+    partes = [valores[a:b] for a, b in zip([0] + cortes, cortes + [500])]
+
+    esquerda = RunningStats()
+    for parte in partes:
+        esquerda = esquerda.merge(_stats(parte))
+    direita = RunningStats()
+    for parte in reversed(partes):
+        direita = _stats(parte).merge(direita)
+
+    _confere(esquerda, valores)
+    _confere(direita, valores)
+
+
+def test_merge_com_lado_vazio_mantem_a_ema():
+    cheio = _stats([0.1, 0.5, 0.9])
+    assert cheio.merge(RunningStats()).ema == cheio.ema
+    assert RunningStats().merge(cheio).ema == cheio.ema
+    assert cheio.merge(cheio).ema is None
+
+
+def test_visao_filtrada_confere_com_groupby():
+    rng = random.Random(6)
+    comentarios = [
+        {
+            "nome": rng.choice("ABCD"),
+            "topic": rng.choice(["esporte", "política"]),
+            "style": rng.choice(["Formal", "Informal"]),
+            "tone": rng.choice(["Neutro", "Agressivo"]),
+            "rating": rng.uniform(-1, 1),
+        }
+        for _ in range(400)
+    ]
+    store = AggregateStore()
+    store.update_many(comentarios)
+    df = pd.DataFrame(comentarios)
+
+    for filtros in ({}, {"topic": "esporte"}, {"topic": "política", "tone": "Neutro"}):
+        dff = df
+        for col, valor in filtros.items():
+            dff = dff[dff[col] == valor]
+        esperado = dff.groupby("nome")["rating"].agg(["mean", "var"])
+        visao = store.view("nome", filtros)
+        assert set(visao) == set(esperado.index)
+        for nome, stats in visao.items():
+            assert stats.mean == pytest.approx(esperado.loc[nome, "mean"])
+            assert stats.variance == pytest.approx(esperado.loc[nome, "var"])
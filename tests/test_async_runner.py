@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+# async_runner importa o gerador de comentários (agno, dotenv)
+pytest.importorskip("dotenv")
+pytest.importorskip("agno")
+
+from pulsenlp.simulation_module import async_runner
+from pulsenlp.storage_module.comment_repository import remover
+
+
+@pytest.mark.parametrize("conteudo, esperado", [
+    ({"topico": "eleições", "num_users": "4"}, ("eleições", 4)),
+    ({"topico": "eleições"}, ("eleições", 1)),
+    ({"topico": "eleições", "num_users": "muitos"}, None),
+    ({"topico": "eleições", "num_users": None}, None),
+    ({"topico": "  "}, None),
+])
+def test_ler_topico_config(tmp_path, monkeypatch, conteudo, esperado):
+    caminho = tmp_path / "topico.json"
+    caminho.write_text(json.dumps(conteudo), encoding="utf-8")
+    monkeypatch.setattr(async_runner, "TOPICO_CONFIG_PATH", str(caminho))
+    assert async_runner._ler_topico_config() == esperado
+
+
+def test_ler_topico_config_com_json_pela_metade(tmp_path, monkeypatch):
+    caminho = tmp_path / "topico.json"
+    caminho.write_text('{"topico": "elei', encoding="utf-8")
+    monkeypatch.setattr(async_runner, "TOPICO_CONFIG_PATH", str(caminho))
+    assert async_runner._ler_topico_config() is None
+
+
+def test_append_comment_informa_se_gravou(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    try:
+        assert async_runner.append_comment_to_json("Ana", "Formal", "Neutro", "oi", "esporte", rating=0.1, path=path)
+    finally:
+        remover(path)
+    # Diretório no lugar do arquivo: a gravação falha sem derrubar o agente
+    (tmp_path / "bloqueado.jsonl").mkdir()
+    assert not async_runner.append_comment_to_json(
+        "Ana", "Formal", "Neutro", "oi", "esporte", rating=0.1, path=str(tmp_path / "bloqueado.jsonl"))
+
+
+def test_verificar_nao_derruba_a_thread_do_watchdog(tmp_path, monkeypatch, capsys):
+    class CanalFechado:
+        def enviar(self, comando, esperar=True):
+            raise RuntimeError("Event loop is closed")
+
+    caminho = tmp_path / "topico.json"
+    caminho.write_text(json.dumps({"topico": "eleições", "num_users": 2}), encoding="utf-8")
+    monkeypatch.setattr(async_runner, "TOPICO_CONFIG_PATH", str(caminho))
+    async_runner.TopicoFileHandler(CanalFechado()).verificar()
+    assert "[ERRO]" in capsys.readouterr().out
+
+
+def test_erro_qualquer_do_agente_nao_encerra_o_usuario(capsys):
+    chamadas = []
+
+    class AgenteInstavel:
+        user_profile = SimpleNamespace(name="Ana", style="Formal", tone="Neutro")
+
+        async def agenerate_thought(self, topico, vaga=None):
+            chamadas.append(topico)
+            if len(chamadas) == 1:
+                raise ValueError("resposta inesperada do provedor")
+            await asyncio.sleep(3600)
+
+    async def cenario():
+        tarefa = asyncio.create_task(async_runner.simulate_user(AgenteInstavel(), "futebol", delay_range=(0, 0)))
+        while len(chamadas) < 2:
+            await asyncio.sleep(0.01)
+        tarefa.cancel()
+        await asyncio.gather(tarefa, return_exceptions=True)
+
+    asyncio.run(asyncio.wait_for(cenario(), 2))
+    assert "[ERRO] Ana: resposta inesperada do provedor" in capsys.readouterr().out
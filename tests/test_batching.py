@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+from pulsenlp.batching import MicroBatcher
+
+
+def test_resultados_na_ordem_da_entrada():
+    batcher = MicroBatcher(lambda itens: [i * 2 for i in itens], max_batch_size=4, max_wait=0)
+    futuros = [batcher.submit(i) for i in range(10)]
+    assert [f.result(timeout=5) for f in futuros] == [i * 2 for i in range(10)]
+    batcher.close()
+
+
+def test_lotes_respeitam_o_tamanho_maximo():
+    tamanhos = []
+    liberar = threading.Event()
+
+    def batch_fn(itens):
+        liberar.wait(5)
+        tamanhos.append(len(itens))
+        return itens
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait=0)
+    futuros = [batcher.submit(i) for i in range(7)]
+    liberar.set()
+    assert [f.result(timeout=5) for f in futuros] == list(range(7))
+    assert max(tamanhos) <= 3
+    assert sum(tamanhos) == 7
+    batcher.close()
+
+
+def test_menos_resultados_que_itens_falha_todos_os_futuros():
+    batcher = MicroBatcher(lambda itens: itens[:-1], max_batch_size=8, max_wait=0.05)
+    futuros = [batcher.submit(i) for i in range(3)]
+    for futuro in futuros:
+        with pytest.raises(ValueError):
+            futuro.result(timeout=5)
+    batcher.close()
+
+
+def test_excecao_em_batch_fn_chega_a_todos():
+    def batch_fn(itens):
+        raise RuntimeError("modelo indisponível")
+
+    batcher = MicroBatcher(batch_fn, max_wait=0)
+    futuro = batcher.submit("x")
+    with pytest.raises(RuntimeError, match="modelo indisponível"):
+        futuro.result(timeout=5)
+    batcher.close()
+
+
+def test_submit_depois_de_close():
+    batcher = MicroBatcher(lambda itens: itens)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
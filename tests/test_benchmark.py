@@ -0,0 +1,18 @@
+import importlib
+
+
+def _benchmark(monkeypatch):
+    # O módulo fixa variáveis PULSENLP_ no import; aqui elas voltam ao fim do teste
+    for nome in ("PULSENLP_NLP_CACHE", "PULSENLP_SENTIMENT_CACHE_ENTRIES", "PULSENLP_SENTIMENT_SERVER"):
+        monkeypatch.setenv(nome, "")
+    return importlib.import_module("pulsenlp.benchmark")
+
+
+def test_metricas_ignora_callbacks_com_erro(monkeypatch):
+    benchmark = _benchmark(monkeypatch)
+    dados = {"dash": {"callbacks": {
+        "ok": {"erros": 0, "inicial_s": 0.01, "incremental": {"media_ms": 1.5}},
+        "quebrado": {"erros": 3, "status": [500]},
+    }}}
+    metricas = benchmark._metricas(dados)
+    assert metricas == {"dash/callbacks/ok/inicial_s": 0.01, "dash/callbacks/ok/incremental/media_ms": 1.5}
@@ -0,0 +1,38 @@
+from pulsenlp.nlp_module.cache import AnnotationCache, normalizar_texto
+
+
+def test_chave_usa_o_texto_exato():
+    cache = AnnotationCache("modelo", path="")
+    cache.set_many("sentences", ["a\n\nb"], [["a", "b"]])
+    assert cache.get_many("sentences", ["a\n\nb", "a b", "a  b"]) == {0: ["a", "b"]}
+
+
+def test_modelo_e_tipo_separam_entradas():
+    cache = AnnotationCache("modelo-1", path="")
+    cache.set_many("lemmas", ["texto"], [["texto"]])
+    assert cache.get_many("pos", ["texto"]) == {}
+    assert AnnotationCache("modelo-2", path="").get_many("lemmas", ["texto"]) == {}
+
+
+def test_lru_limitado_por_entradas():
+    cache = AnnotationCache("modelo", path="", max_entradas=2)
+    cache.set_many("lemmas", ["a", "b"], [["a"], ["b"]])
+    cache.get_many("lemmas", ["a"])  # "a" passa a ser o mais recente
+    cache.set_many("lemmas", ["c"], [["c"]])
+    assert set(cache.get_many("lemmas", ["a", "b", "c"])) == {0, 2}
+
+
+def test_sqlite_sobrevive_a_uma_nova_instancia(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = AnnotationCache("modelo", path=path)
+    cache.set_many("lemmas", ["um texto"], [["um", "texto"]])
+    cache.close()
+
+    nova = AnnotationCache("modelo", path=path)
+    assert nova.get_many("lemmas", ["outro", "um texto"]) == {1: ["um", "texto"]}
+    nova.close()
+
+
+def test_normalizar_texto():
+    assert normalizar_texto("  Olá\n\tmundo ") == "Olá mundo"
+    assert normalizar_texto("é") == "é"
@@ -0,0 +1,72 @@
+import json
+import random
+
+import pandas as pd
+
+from pulsenlp.storage_module.columnar_store import ColumnarStore
+from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+from pulsenlp.storage_module.dataset_cache import DatasetCache, filtrar_df
+
+
+def _comentarios(n, seed):
+    rng = random.Random(seed)
+    return [
+        {"nome": rng.choice("ABC"), "style": "Formal", "tone": rng.choice(["Neutro", "Agressivo"]),
+         "texto": f"t{i}", "rating": rng.uniform(-1, 1), "topic": rng.choice(["esporte", "política"])}
+        for i in range(n)
+    ]
+
+
+def test_filtro_nos_segmentos_confere_com_o_pandas(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    store = ColumnarStore(str(tmp_path / "arrow"), min_linhas=10)
+    cache = DatasetCache(path, columnar=store)
+    try:
+        repo.append_many(_comentarios(120, seed=1))
+        cache.get()
+        # Final do log ainda fora dos segmentos (menos que min_linhas)
+        repo.append_many(_comentarios(5, seed=2))
+        df, identidade = cache.get_versionado()
+        assert 0 < store.linhas < len(df)
+
+        for filtros in ({"nome": "A"}, {"nome": "B", "tone": "Neutro"}, {"round": "123"}, {"round": "x"}, {"nome": None}):
+            esperado = filtrar_df(df, filtros)[["round", "rating"]].reset_index(drop=True)
+            obtido = cache.filtrar(df, identidade, filtros, ["round", "rating"]).reset_index(drop=True)
+            pd.testing.assert_frame_equal(obtido, esperado, check_dtype=False)
+
+        assert cache.opcoes("nome") == ["A", "B", "C"]
+        assert cache.opcoes("round")[-1] == 125
+    finally:
+        remover(path)
+
+
+def test_conta_as_linhas_de_um_estado_antigo(tmp_path):
+    store = ColumnarStore(str(tmp_path / "arrow"))
+    store.append(_comentarios(7, seed=3))
+    store.append(_comentarios(5, seed=4))
+    assert store.linhas == 12
+
+    caminho = store._caminho_estado()
+    with open(caminho, encoding="utf-8") as f:
+        estado = json.load(f)
+    del estado["linhas"]
+    with open(caminho, "w", encoding="utf-8") as f:
+        json.dump(estado, f)
+    assert ColumnarStore(str(tmp_path / "arrow")).linhas == 12
+
+
+def test_log_recriado_descarta_os_segmentos(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    store = ColumnarStore(str(tmp_path / "arrow"), min_linhas=1)
+    try:
+        repo.append_many(_comentarios(20, seed=5))
+        store.sincronizar(path)
+        remover(path)
+        repo.append_many(_comentarios(3, seed=6))
+        store.sincronizar(path)
+        assert store.linhas == 3
+        assert list(store.ler_pandas()["texto"]) == ["t0", "t1", "t2"]
+    finally:
+        remover(path)
@@ -0,0 +1,57 @@
+import json
+
+from pulsenlp.storage_module.comment_log import CommentLog, load_comments, read_comments_since
+
+
+def test_recupera_o_round_e_descarta_a_linha_incompleta(tmp_path, capsys):
+    path = str(tmp_path / "data.jsonl")
+    log = CommentLog(path)
+    for texto in ("a", "b", "c"):
+        log.append({"texto": texto})
+    log.close()
+    with open(path, "ab") as f:
+        f.write(b'{"texto": "d", "rou')
+
+    log = CommentLog(path)
+    assert log.round == 3
+    assert "[AVISO]" in capsys.readouterr().out
+    assert log.append({"texto": "e"})["round"] == 4
+    log.close()
+
+    assert [c["texto"] for c in load_comments(path)] == ["a", "b", "c", "e"]
+    assert [c["round"] for c in load_comments(path)] == [1, 2, 3, 4]
+
+
+def test_arquivo_novo_comeca_do_round_zero(tmp_path):
+    log = CommentLog(str(tmp_path / "sub" / "data.jsonl"))
+    assert log.round == 0
+    assert log.append({"texto": "a"})["round"] == 1
+    log.close()
+
+
+def test_leitura_incremental_nao_consome_linha_pela_metade(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    log = CommentLog(path)
+    log.append({"texto": "a"})
+
+    novos, offset = read_comments_since(path, 0)
+    assert [c["texto"] for c in novos] == ["a"]
+
+    parcial = json.dumps({"texto": "b", "round": 2})
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(parcial[:5])
+    assert read_comments_since(path, offset) == ([], offset)
+    assert [c["texto"] for c in load_comments(path)] == ["a"]
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(parcial[5:] + "\n")
+    novos, fim = read_comments_since(path, offset)
+    assert [c["texto"] for c in novos] == ["b"]
+    assert read_comments_since(path, fim) == ([], fim)
+    log.close()
+
+
+def test_le_o_formato_antigo(tmp_path):
+    path = tmp_path / "data.json"
+    path.write_text(json.dumps([{"texto": "a", "round": 1}]), encoding="utf-8")
+    assert load_comments(str(path)) == [{"texto": "a", "round": 1}]
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from pulsenlp.storage_module.comment_repository import JsonlRepository, SqliteRepository, get_repositorio, remover
+
+
+def _comentario(texto, nome="Ana", topic="esporte"):
+    return {"nome": nome, "style": "Formal", "tone": "Neutro", "texto": texto, "rating": 0.5, "topic": topic}
+
+
+@pytest.fixture(params=["jsonl", "sqlite"])
+def path(request, tmp_path):
+    caminho = str(tmp_path / f"data.{request.param}")
+    yield caminho
+    remover(caminho)
+
+
+def test_backend_pela_extensao(path):
+    esperado = SqliteRepository if path.endswith(".sqlite") else JsonlRepository
+    assert isinstance(get_repositorio(path), esperado)
+    assert get_repositorio(path) is get_repositorio(path)
+
+
+def test_rounds_sequenciais_e_leitura_incremental(path):
+    repo = get_repositorio(path)
+    assert repo.estado() == (None, 0)
+    repo.append(_comentario("a"))
+    _, cursor = repo.estado()
+    repo.append_many([_comentario("b"), _comentario("c")])
+
+    assert [c["round"] for c in repo.ler_todos()] == [1, 2, 3]
+    novos, fim = repo.ler_desde(cursor)
+    assert [c["texto"] for c in novos] == ["b", "c"]
+    assert fim == repo.estado()[1]
+    assert repo.ler_desde(fim) == ([], fim)
+
+
+def test_gravacoes_concorrentes_nao_repetem_rounds(path):
+    repo = get_repositorio(path)
+    threads = [threading.Thread(target=lambda i=i: repo.append(_comentario(str(i)))) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(c["round"] for c in repo.ler_todos()) == list(range(1, 21))
+
+
+def test_filtrar_por_agente_e_topico(path):
+    repo = get_repositorio(path)
+    repo.append_many([_comentario("a", "Ana", "esporte"), _comentario("b", "Bia", "esporte"), _comentario("c", "Ana", "economia")])
+    assert [c["texto"] for c in repo.filtrar(nome="Ana")] == ["a", "c"]
+    assert [c["texto"] for c in repo.filtrar(topic="esporte", desde_round=1)] == ["b"]
+
+
+def test_recriado_muda_a_identidade_mesmo_crescendo(path):
+    repo = get_repositorio(path)
+    repo.append(_comentario("antigo"))
+    identidade, _ = repo.estado()
+
+    remover(path)
+    # Mesmo objeto compartilhado, reaberto sob demanda
+    assert get_repositorio(path) is repo
+    repo.append_many([_comentario("novo"), _comentario("maior que o antigo " * 20)])
+    nova, _ = repo.estado()
+    assert nova != identidade
+    assert [c["round"] for c in repo.ler_todos()] == [1, 2]
+
+
+def test_campos_extras_preservados(path):
+    repo = get_repositorio(path)
+    repo.append(dict(_comentario("a"), subtopico="final", origem="teste"))
+    registro = repo.ler_todos()[0]
+    assert registro["subtopico"] == "final"
+    assert registro["origem"] == "teste"
@@ -0,0 +1,56 @@
+import asyncio
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pulsenlp.simulation_module.control import ControlChannel, iniciar_servidor_http
+
+
+def test_so_um_consumidor_reserva_o_canal():
+    canal = ControlChannel()
+    assert canal.reservar()
+    assert not canal.reservar()
+    canal.liberar()
+    assert canal.reservar()
+
+
+def test_http_responde_504_quando_a_simulacao_nao_responde():
+    canal = ControlChannel()  # nenhum loop consumindo: o comando fica pendente
+    servidor = iniciar_servidor_http(canal, porta=0, timeout=0.2)
+    try:
+        porta = servidor.server_address[1]
+        with pytest.raises(urllib.error.HTTPError) as erro:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/sessoes", timeout=5)
+        assert erro.value.code == 504
+        assert json.loads(erro.value.read())["ok"] is False
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+def test_http_entrega_o_resultado_do_comando():
+    class Scheduler:
+        sessoes = {}
+
+        def metricas(self):
+            return {"padrao": {"comentarios": 0}}
+
+    canal = ControlChannel()
+    loop = asyncio.new_event_loop()
+    tarefa = loop.create_task(canal.processar(Scheduler()))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    servidor = iniciar_servidor_http(canal, porta=0, timeout=5)
+    try:
+        porta = servidor.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{porta}/sessoes", timeout=5) as resposta:
+            assert json.loads(resposta.read()) == {"ok": True, "sessoes": {"padrao": {"comentarios": 0}}}
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+        loop.call_soon_threadsafe(tarefa.cancel)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
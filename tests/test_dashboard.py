@@ -0,0 +1,195 @@
+import pytest
+
+import pulsenlp.wordcloud_gen as wordcloud_gen
+from pulsenlp.storage_module.dataset_cache import DatasetCache
+from pulsenlp.dashboard import criar_dashboard
+from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+
+LINHA = "..grafico-linha.figure...grafico-linha.extendData...linha-ultimo-round.data...linha-viewport.data.."
+CARDS = "..imagem-wordcloud.src...wordcloud-hash.data...nome-comentario.children...texto-comentario.children.."
+
+
+def _comentarios(rounds, rating=0.5):
+    return [
+        {"nome": "Ana", "style": "Formal", "tone": "Neutro", "texto": f"comentário {r}", "rating": rating, "topic": "esporte", "round": r}
+        for r in rounds
+    ]
+
+
+class _Navegador:
+    # Guarda os stores devolvidos e os reenvia, como o front-end faz
+    def __init__(self, app):
+        self.cliente = app.server.test_client()
+        self.app = app
+        self.valores = {}
+
+    def disparar(self, seq, resync=False, callback=LINHA):
+        spec = self.app.callback_map[callback]
+        self.valores[("gatilho-update", "data")] = {"seq": seq, "resync": resync}
+        valor = lambda i: {"id": i["id"], "property": i["property"], "value": self.valores.get((i["id"], i["property"]))}
+        saidas = [saida.rsplit(".", 1) for saida in callback.strip(".").split("...")]
+        corpo = {
+            "output": callback,
+            "outputs": [{"id": i, "property": p} for i, p in saidas],
+            "inputs": [valor(i) for i in spec["inputs"]],
+            "state": [valor(s) for s in spec["state"]],
+            "changedPropIds": ["gatilho-update.data"],
+        }
+        resposta = self.cliente.post("/_dash-update-component", json=corpo)
+        if resposta.status_code == 204:
+            return {}
+        assert resposta.status_code == 200
+        saida = resposta.get_json()["response"]
+        for id_, props in saida.items():
+            for prop, v in props.items():
+                self.valores[(id_, prop)] = v
+        return saida
+
+
+def _app(path, **kwargs):
+    opcoes = dict(
+        col_linha_x="round",
+        col_linha_y="rating",
+        col_barra_x="rating",
+        col_barra_y="nome",
+        colunas_filtros_linha=["round"],
+        colunas_filtro_barra=["nome"],
+        col_wordcloud="texto",
+    )
+    opcoes.update(kwargs)
+    return criar_dashboard(path, **opcoes)
+
+
+def test_primeira_atualizacao_real_substitui_o_placeholder(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        navegador = _Navegador(_app(path))
+        saida = navegador.disparar(0)
+        assert saida["linha-ultimo-round"]["data"]["identidade"] is None
+
+        repo.append_many(_comentarios([1, 2, 3]))
+        saida = navegador.disparar(1)
+        assert "figure" in saida["grafico-linha"]
+        assert "extendData" not in saida["grafico-linha"]
+
+        repo.append_many(_comentarios([4]))
+        saida = navegador.disparar(2)
+        assert "figure" not in saida["grafico-linha"]
+        dados, traces, _ = saida["grafico-linha"]["extendData"]
+        assert dados["x"] == [[4]]
+    finally:
+        remover(path)
+
+
+def test_log_recriado_redesenha_o_grafico(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        repo.append_many(_comentarios(range(5)))
+        navegador = _Navegador(_app(path))
+        navegador.disparar(1)
+
+        # O log novo recomeça os rounds: sem a identidade, round 2 <= 5 congelava o gráfico
+        remover(path)
+        repo.append_many(_comentarios(range(2), rating=0.9))
+        saida = navegador.disparar(2)
+        figura = saida["grafico-linha"]["figure"]
+        assert list(figura["data"][0]["y"]) == [0.9, 0.9]
+        assert saida["linha-ultimo-round"]["data"]["round"] == 2
+    finally:
+        remover(path)
+
+
+def test_media_movel_anexada_confere_com_a_figura_redesenhada(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        repo.append_many([dict(c, rating=r) for c, r in zip(_comentarios(range(20)), [0.1 * (i % 7) for i in range(20)])])
+        navegador = _Navegador(_app(path, janela_linha=5, janela_media_linha=4))
+        navegador.disparar(1)
+
+        repo.append_many(_comentarios(range(3), rating=0.8))
+        dados, traces, _ = navegador.disparar(2)["grafico-linha"]["extendData"]
+        assert traces == [0, 1]
+
+        # Redesenho completo com os mesmos dados: a média dos últimos pontos é a mesma
+        figura = navegador.disparar(3, resync=True)["grafico-linha"]["figure"]
+        assert list(figura["data"][1]["y"])[-3:] == pytest.approx(dados["y"][1])
+    finally:
+        remover(path)
+
+
+def test_pontos_anexados_tem_limite_sem_janela_linha(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        repo.append_many(_comentarios(range(10)))
+        navegador = _Navegador(_app(path, max_pontos_linha=4))
+        navegador.disparar(1)
+
+        repo.append_many(_comentarios(range(3)))
+        saida = navegador.disparar(2)
+        _, _, max_pontos = saida["grafico-linha"]["extendData"]
+        assert max_pontos is not None
+        assert saida["linha-ultimo-round"]["data"]["anexados"] == 3
+
+        # Mais 2 passariam de max_pontos_linha pontos crus: a figura é refeita e reduzida
+        repo.append_many(_comentarios(range(2)))
+        saida = navegador.disparar(3)
+        assert "extendData" not in saida["grafico-linha"]
+        assert len(saida["grafico-linha"]["figure"]["data"][0]["x"]) <= 4
+        assert saida["linha-ultimo-round"]["data"]["anexados"] == 0
+    finally:
+        remover(path)
+
+
+def test_media_anexada_le_so_o_fim_da_serie_filtrada(tmp_path, monkeypatch):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        # Poucas linhas da Ana no meio de muitas da Bia: a busca pela cauda filtrada precisa recuar
+        nomes = ["Ana" if i % 9 == 0 else "Bia" for i in range(60)]
+        repo.append_many([dict(c, nome=n, rating=0.01 * i) for i, (c, n) in enumerate(zip(_comentarios(range(60)), nomes))])
+        navegador = _Navegador(_app(path, colunas_filtros_linha=["nome"], janela_media_linha=4))
+        navegador.valores[("filtro-linha-0", "value")] = "Ana"
+        navegador.disparar(1)
+
+        repo.append_many([dict(c, nome="Ana", rating=0.9) for c in _comentarios(range(2))])
+
+        def sem_serie_inteira(*args, **kwargs):
+            raise AssertionError("o tick incremental não deve filtrar a série inteira")
+
+        with monkeypatch.context() as m:
+            m.setattr(DatasetCache, "filtrar", sem_serie_inteira)
+            dados, traces, _ = navegador.disparar(2)["grafico-linha"]["extendData"]
+
+        figura = navegador.disparar(3, resync=True)["grafico-linha"]["figure"]
+        assert list(figura["data"][1]["y"])[-2:] == pytest.approx(dados["y"][1])
+    finally:
+        remover(path)
+
+
+def test_cada_aba_recebe_a_nuvem_que_ainda_nao_tem(tmp_path, monkeypatch):
+    # Sem o modelo do spaCy: cada palavra é o próprio lema
+    monkeypatch.setattr(wordcloud_gen, "process_batch", lambda textos: [t.lower().split() for t in textos])
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    try:
+        repo.append_many(_comentarios([1, 2]))
+        app = _app(path, wordcloud_preset="baixa", wordcloud_formato="png")
+        aba_a, aba_b = _Navegador(app), _Navegador(app)
+        primeira = aba_a.disparar(1, callback=CARDS)["imagem-wordcloud"]["src"]
+        assert aba_b.disparar(1, callback=CARDS)["imagem-wordcloud"]["src"] == primeira
+
+        # Nada mudou: a aba que já tem a imagem não a recebe de novo
+        assert "imagem-wordcloud" not in aba_a.disparar(2, callback=CARDS)
+
+        # A aba A renderiza a nuvem nova; a B, no tick seguinte, ainda precisa recebê-la
+        repo.append_many([dict(c, texto="final emocionante") for c in _comentarios([3])])
+        nova = aba_a.disparar(3, callback=CARDS)["imagem-wordcloud"]["src"]
+        assert nova != primeira
+        assert aba_b.disparar(3, callback=CARDS)["imagem-wordcloud"]["src"] == nova
+        assert aba_b.valores[("wordcloud-hash", "data")] == aba_a.valores[("wordcloud-hash", "data")]
+    finally:
+        remover(path)
@@ -0,0 +1,40 @@
+from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+from pulsenlp.storage_module.dataset_cache import DatasetCache
+
+
+def _comentario(texto):
+    return {"nome": "Ana", "style": "Formal", "tone": "Neutro", "texto": texto, "rating": 0.5, "topic": "esporte"}
+
+
+def test_le_so_o_final_e_mantem_a_identidade(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    cache = DatasetCache(path, placeholder={"texto": ["arroba"]})
+    try:
+        df, identidade = cache.get_versionado()
+        assert identidade is None and list(df["texto"]) == ["arroba"]
+
+        repo.append(_comentario("a"))
+        df, identidade = cache.get_versionado()
+        assert list(df["texto"]) == ["a"]
+
+        repo.append(_comentario("b"))
+        df, mesma = cache.get_versionado()
+        assert list(df["texto"]) == ["a", "b"]
+        assert mesma == identidade
+    finally:
+        remover(path)
+
+
+def test_dados_recriados_mudam_a_identidade(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    cache = DatasetCache(path)
+    get_repositorio(path).append_many([_comentario("a"), _comentario("b")])
+    _, antes = cache.get_versionado()
+
+    remover(path)
+    get_repositorio(path).append_many([_comentario("x"), _comentario("y"), _comentario("z")])
+    df, depois = cache.get_versionado()
+    assert list(df["texto"]) == ["x", "y", "z"]
+    assert depois != antes
+    remover(path)
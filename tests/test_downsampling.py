@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from pulsenlp.downsampling import lttb, media_movel, minmax, reduzir
+
+
+def _serie(n=5000, seed=1):
+    rng = np.random.default_rng(seed)
+    x = np.arange(n)
+    y = np.cumsum(rng.normal(size=n))
+    return x, y
+
+
+@pytest.mark.parametrize("metodo", [lttb, minmax])
+@pytest.mark.parametrize("max_pontos", [4, 100, 1000])
+def test_mantem_as_pontas_e_o_numero_de_pontos(metodo, max_pontos):
+    x, y = _serie()
+    xr, yr = metodo(x, y, max_pontos)
+    assert len(xr) == max_pontos
+    assert (xr[0], yr[0]) == (x[0], y[0])
+    assert (xr[-1], yr[-1]) == (x[-1], y[-1])
+    assert np.all(np.diff(xr) > 0)
+
+
+def test_minmax_preserva_os_extremos():
+    x, y = _serie(seed=2)
+    _, yr = minmax(x, y, 100)
+    assert yr.min() == y.min()
+    assert yr.max() == y.max()
+
+
+@pytest.mark.parametrize("metodo", [lttb, minmax])
+def test_pico_isolado_sobrevive(metodo):
+    x = np.arange(10_000)
+    y = np.sin(x / 500.0)
+    y[4321] = 50.0
+    y[7777] = -50.0
+    xr, yr = metodo(x, y, 200)
+    assert 4321 in xr and 7777 in xr
+    assert yr.max() == 50.0 and yr.min() == -50.0
+
+
+@pytest.mark.parametrize("metodo", [lttb, minmax])
+def test_serie_curta_nao_muda(metodo):
+    x, y = _serie(50)
+    xr, yr = metodo(x, y, 100)
+    assert xr is x and yr is y
+
+
+def test_reduzir_recorta_o_viewport():
+    x, y = _serie(1000)
+    xr, _ = reduzir(x, y, 50, x0=200, x1=400, metodo="minmax")
+    assert len(xr) <= 50
+    assert xr[0] >= 199 and xr[-1] <= 401
+
+
+def test_media_movel_confere_com_a_janela_explicita():
+    _, y = _serie(300)
+    media = media_movel(y, 7)
+    esperado = [y[max(i - 6, 0):i + 1].mean() for i in range(len(y))]
+    np.testing.assert_allclose(media, esperado)
@@ -0,0 +1,51 @@
+from pulsenlp.eventos import CanalEventos
+from pulsenlp.storage_module.comment_repository import get_repositorio, remover
+
+
+def _comentario(texto):
+    return {"nome": "Ana", "style": "Formal", "tone": "Neutro", "texto": texto, "rating": 0.5, "topic": "esporte"}
+
+
+def test_eventos_so_com_os_comentarios_novos(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    repo.append(_comentario("antigo"))
+    canal = CanalEventos(path)
+
+    repo.append(_comentario("novo"))
+    canal.notificar()
+    canal.notificar()  # nada novo: nenhum evento
+    eventos = canal.esperar(0, timeout=0)
+    assert [(seq, [c["texto"] for c in lote], resync) for seq, lote, resync in eventos] == [(1, ["novo"], False)]
+    remover(path)
+
+
+def test_log_recriado_e_maior_gera_resync(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    repo.append(_comentario("a"))
+    canal = CanalEventos(path)
+
+    remover(path)
+    repo.append_many([_comentario("x" * 50), _comentario("y" * 50)])
+    canal.notificar()
+    seq, lote, resync = canal.esperar(0, timeout=0)[-1]
+    assert resync
+    assert [c["texto"] for c in lote] == ["x" * 50, "y" * 50]
+    assert canal.ultimo["texto"] == "y" * 50
+    remover(path)
+
+
+def test_cliente_fora_do_historico_recebe_resync(tmp_path):
+    path = str(tmp_path / "data.jsonl")
+    repo = get_repositorio(path)
+    canal = CanalEventos(path, historico=2)
+    for i in range(4):
+        repo.append(_comentario(str(i)))
+        canal.notificar()
+
+    assert canal.esperar(0, timeout=0) == [(4, [], True)]
+    assert [seq for seq, _, _ in canal.esperar(2, timeout=0)] == [3, 4]
+    # Last-Event-ID de uma execução anterior do servidor
+    assert canal.esperar(99, timeout=0) == [(4, [], True)]
+    remover(path)
@@ -0,0 +1,45 @@
+import pytest
+
+from pulsenlp.simulation_module.model_scheduler import ModelScheduler, NenhumModeloDisponivel
+
+
+def test_sem_medicoes_usa_o_preferido():
+    scheduler = ModelScheduler(["a", "b", "c"])
+    assert scheduler.escolher("b") == "b"
+    assert scheduler.escolher() == "a"
+
+
+def test_escolhe_o_mais_rapido_e_evita_o_que_falhou():
+    scheduler = ModelScheduler(["a", "b"])
+    scheduler.registrar_sucesso("a", 2.0)
+    scheduler.registrar_sucesso("b", 0.5)
+    assert scheduler.escolher("a") == "b"
+    assert scheduler.escolher("a", evitar={"b"}) == "a"
+
+
+def test_circuito_abre_apos_falhas_seguidas():
+    scheduler = ModelScheduler(["a", "b"], falhas_para_abrir=2, cooldown=60)
+    scheduler.registrar_falha("a")
+    assert scheduler.escolher("a") == "a"
+    scheduler.registrar_falha("a")
+    assert scheduler.escolher("a") == "b"
+    assert scheduler.snapshot()["a"]["aberto"]
+
+
+def test_todos_os_circuitos_abertos_falha_rapido():
+    scheduler = ModelScheduler(["a", "b"], falhas_para_abrir=1, cooldown=60)
+    scheduler.registrar_falha("a")
+    scheduler.registrar_falha("b")
+    with pytest.raises(NenhumModeloDisponivel):
+        scheduler.escolher("a")
+
+
+def test_circuito_fecha_depois_do_cooldown():
+    scheduler = ModelScheduler(["a"], falhas_para_abrir=1, cooldown=0)
+    scheduler.registrar_falha("a")
+    assert scheduler.escolher() == "a"
+
+
+def test_backoff_respeita_o_teto():
+    for tentativa in range(10):
+        assert 0 <= ModelScheduler.backoff(tentativa, base=0.5, teto=4.0) <= 4.0
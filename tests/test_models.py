@@ -0,0 +1,81 @@
+import threading
+import time
+
+from pulsenlp.nlp_module.models import ModelRegistry
+
+
+class _Carregador:
+    # Loader falso que conta as chamadas e demora o bastante para as threads se cruzarem
+    def __init__(self, valor, demora=0.05):
+        self.valor = valor
+        self.demora = demora
+        self.chamadas = 0
+
+    def __call__(self):
+        self.chamadas += 1
+        time.sleep(self.demora)
+        return self.valor
+
+
+def test_carrega_uma_vez_com_varias_threads():
+    registro = ModelRegistry()
+    carregador = _Carregador(object())
+    registro.register("spacy", carregador)
+
+    largada = threading.Barrier(16)
+    resultados = []
+
+    def pedir():
+        largada.wait()
+        resultados.append(registro.get("spacy"))
+
+    threads = [threading.Thread(target=pedir) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert carregador.chamadas == 1
+    assert len(resultados) == 16
+    assert all(r is carregador.valor for r in resultados)
+    assert "spacy" in registro.tempos_carga
+
+
+def test_nada_e_carregado_antes_do_primeiro_pedido():
+    registro = ModelRegistry()
+    carregador = _Carregador("modelo", demora=0)
+    registro.register("sentiment", carregador)
+    assert not registro.is_loaded("sentiment")
+    assert carregador.chamadas == 0
+
+
+def test_warm_up_carrega_os_registrados():
+    registro = ModelRegistry()
+    carregadores = {nome: _Carregador(nome, demora=0.01) for nome in ("spacy", "sentiment")}
+    for nome, carregador in carregadores.items():
+        registro.register(nome, carregador)
+
+    thread = registro.warm_up()
+    thread.join(timeout=5)
+    assert all(registro.is_loaded(nome) for nome in carregadores)
+    # Depois do warm-up, get() não carrega de novo
+    assert registro.get("spacy") == "spacy"
+    assert [c.chamadas for c in carregadores.values()] == [1, 1]
+
+
+def test_warm_up_sincrono_so_dos_pedidos_e_sobrevive_a_falhas(capsys):
+    registro = ModelRegistry()
+    carregador = _Carregador("spacy", demora=0)
+
+    def quebrado():
+        raise OSError("modelo não instalado")
+
+    registro.register("spacy", carregador)
+    registro.register("sentiment", quebrado)
+    registro.register("topicos", _Carregador("lda", demora=0))
+
+    assert registro.warm_up(["sentiment", "spacy"], background=False) is None
+    assert registro.is_loaded("spacy")
+    assert not registro.is_loaded("sentiment")
+    assert not registro.is_loaded("topicos")
+    assert "[ERRO] Falha ao pré-carregar modelo 'sentiment'" in capsys.readouterr().out
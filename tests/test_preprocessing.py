@@ -0,0 +1,103 @@
+import pytest
+import spacy
+from spacy.language import Language
+
+from pulsenlp.nlp_module import preprocessing
+from pulsenlp.nlp_module.cache import AnnotationCache
+
+TEXTOS = [
+    "O Flamengo venceu em Brasília. A torcida comemorou!",
+    "Choveu muito no Recife hoje.",
+    "O Flamengo venceu em Brasília. A torcida comemorou!",
+    "Lula falou com o Flamengo.",
+]
+
+
+@Language.component("classes_de_teste")
+def _classes_de_teste(doc):
+    # Classe gramatical só pela inicial maiúscula
+    for token in doc:
+        token.pos_ = token.tag_ = "PROPN" if token.is_title else "NOUN"
+    return doc
+
+
+@Language.component("lemas_de_teste")
+def _lemas_de_teste(doc):
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+
+class _NlpFalso:
+    # Pipeline spaCy em branco (sem baixar modelo) que registra cada chamada a pipe()
+    def __init__(self):
+        self.nlp = spacy.blank("pt")
+        self.nlp.add_pipe("sentencizer")
+        self.nlp.add_pipe("classes_de_teste", name="tagger")
+        self.nlp.add_pipe("lemas_de_teste", name="lemmatizer")
+        ruler = self.nlp.add_pipe("entity_ruler", name="ner")
+        ruler.add_patterns([{"label": "ORG", "pattern": "Flamengo"}, {"label": "LOC", "pattern": "Recife"}, {"label": "PER", "pattern": "Lula"}])
+        self.pipe_names = self.nlp.pipe_names
+        self.lotes = []
+
+    def pipe(self, textos, **kwargs):
+        textos = list(textos)
+        self.lotes.append((textos, kwargs.get("disable", [])))
+        return self.nlp.pipe(textos, **kwargs)
+
+    def __call__(self, texto):
+        return self.nlp(texto)
+
+
+@pytest.fixture
+def nlp(monkeypatch):
+    falso = _NlpFalso()
+    monkeypatch.setattr(preprocessing, "get_nlp", lambda: falso)
+    monkeypatch.setattr(preprocessing, "_cache", AnnotationCache("teste", path=""))
+    # noun_chunks precisa do parser de um modelo treinado: aqui, as palavras com inicial maiúscula
+    monkeypatch.setattr(preprocessing, "_chunks", lambda doc: [t.text for t in doc if t.is_title])
+    return falso
+
+
+def _sem_cache(monkeypatch):
+    monkeypatch.setattr(preprocessing, "_cache", AnnotationCache("teste", path=""))
+
+
+LOTE_E_UNITARIA = [
+    (preprocessing.process_batch, preprocessing.process),
+    (preprocessing.pos_tagging_batch, preprocessing.pos_tagging),
+    (preprocessing.noun_chunks_batch, preprocessing.noun_chunks),
+    (preprocessing.named_entities_batch, preprocessing.named_entities),
+    (preprocessing.sentence_segmentation_batch, preprocessing.sentence_segmentation),
+    (preprocessing.analyze_batch, preprocessing.analyze),
+]
+
+
+@pytest.mark.parametrize("em_lote, unitaria", LOTE_E_UNITARIA)
+def test_lote_igual_a_um_por_vez_e_na_mesma_ordem(nlp, monkeypatch, em_lote, unitaria):
+    resultados = em_lote(TEXTOS, batch_size=2)
+    _sem_cache(monkeypatch)
+    assert resultados == [unitaria(t) for t in TEXTOS]
+    assert resultados[0] == resultados[2]
+
+
+def test_um_pipe_so_com_os_textos_que_faltam_no_cache(nlp):
+    preprocessing.process_batch(TEXTOS[1:2])
+    nlp.lotes.clear()
+    entidades = preprocessing.named_entities_batch(TEXTOS)
+    lemas = preprocessing.process_batch(TEXTOS)
+
+    # Entidades: cache vazio para esse tipo, um lote só; lemas: só os textos ainda não vistos
+    assert len(nlp.lotes) == 2
+    assert nlp.lotes[0][0] == TEXTOS
+    assert nlp.lotes[1][0] == [preprocessing._normalizar(t) for t in (TEXTOS[0], TEXTOS[2], TEXTOS[3])]
+    assert entidades[0] == entidades[2] == [("Flamengo", "ORG", spacy.explain("ORG"))]
+    assert entidades[3][0][:2] == ("Lula", "PER")
+    assert lemas[1] == preprocessing.process(TEXTOS[1])
+
+
+def test_componentes_desnecessarios_desligados(nlp):
+    preprocessing.process_batch(["texto qualquer"])
+    preprocessing.named_entities_batch(["texto qualquer"])
+    assert nlp.lotes[0][1] == ["ner"]
+    assert nlp.lotes[1][1] == ["lemmatizer"]
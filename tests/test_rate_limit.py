@@ -0,0 +1,67 @@
+import asyncio
+import time
+
+from pulsenlp.simulation_module.rate_limit import RateLimiter
+
+
+def test_rajada_passa_direto_e_o_resto_espera_a_taxa():
+    async def cenario():
+        limitador = RateLimiter(rate=20, burst=2)
+        inicio = time.monotonic()
+        await limitador.acquire()
+        await limitador.acquire()
+        rajada = time.monotonic() - inicio
+        await asyncio.gather(*(limitador.acquire() for _ in range(2)))
+        return rajada, time.monotonic() - inicio
+
+    rajada, total = asyncio.run(cenario())
+    assert rajada < 0.05
+    # Dois tokens além da rajada a 20/s: ~0.1 s
+    assert 0.08 <= total < 0.5
+
+
+def test_espera_nao_bloqueia_novas_reservas():
+    async def cenario():
+        limitador = RateLimiter(rate=10, burst=1)
+        await limitador.acquire()
+        inicio = time.monotonic()
+        fim = {}
+
+        async def pedido(i):
+            await limitador.acquire()
+            fim[i] = time.monotonic() - inicio
+
+        await asyncio.gather(*(pedido(i) for i in range(3)))
+        return fim
+
+    fim = asyncio.run(cenario())
+    # Cada reserva espera só a sua vez: 0.1, 0.2 e 0.3 s, em ordem de chegada
+    assert fim[0] < fim[1] < fim[2]
+    assert fim[2] < 0.5
+
+
+def test_cancelamento_devolve_a_reserva():
+    async def cenario():
+        limitador = RateLimiter(rate=5, burst=1)
+        await limitador.acquire()
+        esperando = asyncio.create_task(limitador.acquire())
+        await asyncio.sleep(0.01)
+        esperando.cancel()
+        await asyncio.gather(esperando, return_exceptions=True)
+        inicio = time.monotonic()
+        await limitador.acquire()
+        return time.monotonic() - inicio
+
+    # Sem a devolução, o próximo pedido esperaria também o token do cancelado (~0.4 s)
+    assert asyncio.run(cenario()) < 0.3
+
+
+def test_mesmo_limitador_em_event_loops_diferentes():
+    # Os limitadores são globais por modelo; nada neles pode ficar preso ao primeiro loop
+    limitador = RateLimiter(rate=50, burst=1)
+
+    async def disputar():
+        await asyncio.gather(*(limitador.acquire() for _ in range(3)))
+
+    asyncio.run(disputar())
+    asyncio.run(disputar())
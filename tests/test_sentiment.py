@@ -0,0 +1,77 @@
+import pytest
+
+from pulsenlp.nlp_module import sentiment, sentiment_cache
+from pulsenlp.nlp_module.sentiment import _dividir_sentencas, _pontuar_em_trechos, dividir_em_trechos
+
+
+def _palavras(n, prefixo="p"):
+    return " ".join(f"{prefixo}{i}" for i in range(n))
+
+
+def test_junta_sentencas_ate_o_limite_de_palavras():
+    sentencas = [_palavras(4, "a"), _palavras(3, "b"), _palavras(5, "c")]
+    assert dividir_em_trechos(sentencas, max_palavras=8) == [
+        _palavras(4, "a") + " " + _palavras(3, "b"),
+        _palavras(5, "c"),
+    ]
+
+
+def test_sentenca_maior_que_o_limite_vira_janelas():
+    trechos = dividir_em_trechos([_palavras(2, "a"), _palavras(11, "b")], max_palavras=4)
+    assert [len(t.split()) for t in trechos] == [2, 4, 4, 3]
+    assert " ".join(trechos).split() == (_palavras(2, "a") + " " + _palavras(11, "b")).split()
+
+
+def test_nenhuma_palavra_se_perde():
+    sentencas = [_palavras(n, f"s{n}x") for n in (1, 7, 30, 2, 9)]
+    for limite in (1, 3, 10, 60):
+        trechos = dividir_em_trechos(sentencas, max_palavras=limite)
+        assert all(len(t.split()) <= limite for t in trechos)
+        assert " ".join(trechos).split() == " ".join(sentencas).split()
+
+
+def test_divisor_por_regra(monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_SPLITTER", "regra")
+    texto = "Adorei o jogo! Mas o juiz errou... Será?\nNova linha.  Fim"
+    assert _dividir_sentencas([texto]) == [["Adorei o jogo!", "Mas o juiz errou...", "Será?", "Nova linha.", "Fim"]]
+    # Abreviações e números não quebram sem espaço depois do ponto
+    assert _dividir_sentencas(["O preço é 3.50 reais"]) == [["O preço é 3.50 reais"]]
+
+
+def test_media_dos_trechos_ponderada_pelas_palavras(monkeypatch):
+    chamadas = []
+
+    def pontuar(trechos, batch_size):
+        chamadas.append(list(trechos))
+        return [1.0 if "bom" in t else -1.0 for t in trechos]
+
+    monkeypatch.setattr(sentiment, "SENTIMENT_CHUNK_WORDS", 5)
+    monkeypatch.setattr(sentiment, "SENTIMENT_SPLITTER", "regra")
+    monkeypatch.setattr(sentiment, "_pontuar", pontuar)
+
+    longo = "foi bom demais mesmo. o final foi ruim e chato de ver"  # 4 + 8 palavras -> trechos de 4, 5 e 3
+    curto = "bom jogo"
+    scores = _pontuar_em_trechos([longo, curto], batch_size=32)
+
+    # Uma única chamada em lote com todos os trechos
+    assert chamadas == [["foi bom demais mesmo.", "o final foi ruim e", "chato de ver", "bom jogo"]]
+    assert scores == pytest.approx([(4 * 1.0 + 5 * -1.0 + 3 * -1.0) / 12, 1.0])
+
+
+def test_textos_curtos_nao_passam_pela_divisao(monkeypatch):
+    monkeypatch.setattr(sentiment, "SENTIMENT_CHUNK_WORDS", 60)
+    monkeypatch.setattr(sentiment, "_pontuar", lambda trechos, batch_size: [0.5] * len(trechos))
+    monkeypatch.setattr(sentiment, "_dividir_sentencas", lambda textos: pytest.fail("não deveria dividir"))
+    assert _pontuar_em_trechos(["curto", "outro curto"], batch_size=32) == [0.5, 0.5]
+
+
+def test_configuracao_dos_trechos_entra_na_chave_do_cache(monkeypatch):
+    ids = []
+    monkeypatch.setattr(sentiment_cache, "SENTIMENT_CACHE_ENTRADAS", 10)
+    monkeypatch.setattr(sentiment_cache, "SentimentCache", lambda model_id: ids.append(model_id) or model_id)
+    for palavras, divisor in ((60, "regra"), (30, "regra"), (60, "spacy")):
+        monkeypatch.setattr(sentiment_cache, "_cache", None)
+        monkeypatch.setattr(sentiment, "SENTIMENT_CHUNK_WORDS", palavras)
+        monkeypatch.setattr(sentiment, "SENTIMENT_SPLITTER", divisor)
+        sentiment_cache.get_sentiment_cache()
+    assert len(set(ids)) == 3
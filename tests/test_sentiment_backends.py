@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+# predict() usa o pré-processamento e o AnalyzerOutput do pysentimiento; a pasta exportada, o tokenizer do transformers
+pytest.importorskip("pysentimiento")
+transformers = pytest.importorskip("transformers")
+
+from pulsenlp.nlp_module.sentiment_backends import METADADOS_ONNX, ClassificadorCPU, _AnalisadorExportado, _salvar_metadados
+
+ID2LABEL = {0: "NEG", 1: "NEU", 2: "POS"}
+
+
+def _tokenizer():
+    # Tokenizer mínimo (vocabulário por palavra), salvo e relido sem baixar nada
+    from tokenizers import Tokenizer, models, pre_tokenizers
+
+    palavras = ["[PAD]", "[UNK]", "adorei", "odiei", "o", "jogo", "filme"]
+    base = Tokenizer(models.WordLevel({p: i for i, p in enumerate(palavras)}, unk_token="[UNK]"))
+    base.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = transformers.PreTrainedTokenizerFast(tokenizer_object=base, unk_token="[UNK]", pad_token="[PAD]")
+    tokenizer.model_max_length = 16
+    return tokenizer
+
+
+class _Analisador:
+    def __init__(self):
+        self.tokenizer = _tokenizer()
+        self.preprocessing_args = {}
+        self.id2label = dict(ID2LABEL)
+
+
+def _executar_por_palavra(lotes):
+    # Logits falsos: "adorei" puxa para POS, "odiei" para NEG, o resto fica neutro
+    def executar(codificado):
+        lotes.append(codificado["input_ids"].shape)
+        logits = []
+        for ids in codificado["input_ids"]:
+            if 2 in ids:
+                logits.append([0.0, 1.0, 3.0])
+            elif 3 in ids:
+                logits.append([3.0, 1.0, 0.0])
+            else:
+                logits.append([0.0, 2.0, 0.0])
+        return np.array(logits, dtype=np.float32)
+    return executar
+
+
+def test_softmax_e_rotulos():
+    lotes = []
+    classificador = ClassificadorCPU(_Analisador(), _executar_por_palavra(lotes), "int8")
+    resultado = classificador.predict("adorei o jogo")
+
+    esperado = np.exp([0.0, 1.0, 3.0]) / np.exp([0.0, 1.0, 3.0]).sum()
+    assert resultado.probas == pytest.approx(dict(zip(ID2LABEL.values(), esperado)))
+    assert sum(resultado.probas.values()) == pytest.approx(1.0)
+    assert resultado.output == "POS"
+
+
+def test_texto_unico_e_lista():
+    lotes = []
+    classificador = ClassificadorCPU(_Analisador(), _executar_por_palavra(lotes), "int8")
+
+    unico = classificador.predict("odiei o filme")
+    assert not isinstance(unico, list)
+    assert unico.output == "NEG"
+
+    varios = classificador.predict(["adorei o jogo", "o filme", "odiei"])
+    assert [r.output for r in varios] == ["POS", "NEU", "NEG"]
+    # A lista inteira passa por uma única execução do modelo, com padding
+    assert lotes[-1][0] == 3
+    assert classificador.predict([]) == []
+
+
+def test_metadados_exportados_sao_relidos(tmp_path):
+    analisador = _Analisador()
+    analisador.preprocessing_args = {"user_token": "@usuario"}
+    _salvar_metadados(analisador, str(tmp_path))
+    assert (tmp_path / METADADOS_ONNX).exists()
+
+    relido = _AnalisadorExportado(str(tmp_path))
+    # O JSON guarda as chaves como texto: os rótulos voltam indexados por int
+    assert relido.id2label == ID2LABEL
+    assert relido.preprocessing_args == {"user_token": "@usuario"}
+    assert relido.tokenizer.model_max_length == 16
+
+    lotes = []
+    classificador = ClassificadorCPU(relido, _executar_por_palavra(lotes), "onnx")
+    assert [r.output for r in classificador.predict(["adorei o filme", "odiei o jogo"])] == ["POS", "NEG"]
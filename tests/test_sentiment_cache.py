@@ -0,0 +1,97 @@
+import os
+import random
+
+import pytest
+
+from pulsenlp.nlp_module.sentiment_cache import DISTANCIA_MAX, SentimentCache, SimHashIndex, _tokens, diferenca_neutra, simhash
+
+
+def _distancia(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _vizinha(rng, assinatura, bits):
+    for i in rng.sample(range(64), bits):
+        assinatura ^= 1 << i
+    return assinatura
+
+
+@pytest.mark.parametrize("distancia_max", [0, 1, 3, 6])
+def test_simhash_index_confere_com_busca_exaustiva(distancia_max):
+    rng = random.Random(distancia_max)
+    indice = SimHashIndex(distancia_max=distancia_max, max_entradas=10_000)
+    guardadas = {}
+    for i in range(300):
+        assinatura = rng.getrandbits(64)
+        indice.adicionar(assinatura, i)
+        guardadas[assinatura] = i
+
+    for base in rng.sample(list(guardadas), 100):
+        consulta = _vizinha(rng, base, rng.randint(0, distancia_max + 2))
+        melhor = min(guardadas, key=lambda a: _distancia(a, consulta))
+        if _distancia(melhor, consulta) <= distancia_max:
+            assert indice.buscar(consulta) == guardadas[melhor]
+        else:
+            assert indice.buscar(consulta) is None
+
+
+def test_simhash_index_descarta_as_mais_antigas():
+    rng = random.Random(7)
+    a, b, c, d = (rng.getrandbits(64) for _ in range(4))
+    indice = SimHashIndex(distancia_max=2, max_entradas=3)
+    for assinatura in (a, b, c):
+        indice.adicionar(assinatura, assinatura)
+    indice.adicionar(a, "renovada")
+    indice.adicionar(d, d)
+
+    assert indice.buscar(b) is None
+    assert indice.buscar(a) == "renovada"
+    assert indice.buscar(d) == d
+    assert len(indice._valores) == 3
+    assert sum(len(s) for balde in indice._baldes for s in balde.values()) == 3 * indice.n_faixas
+
+
+PARES_OPOSTOS = [
+    ("eu recomendo esse produto para todos", "eu não recomendo esse produto para todos"),
+    ("o time jogou muito bem hoje à noite", "o time jogou muito mal hoje à noite"),
+    ("nunca gostei desse restaurante do centro", "sempre gostei desse restaurante do centro"),
+    ("adorei o novo aplicativo do banco 😍", "adorei o novo aplicativo do banco 😡"),
+    ("a entrega foi rápida como prometido", "a entrega foi rápida como prometido?"),
+]
+
+
+def _cache(tmp_path, distancia_max):
+    return SentimentCache("modelo-teste", path=str(tmp_path / "cache.db"), max_entradas=100, distancia_max=distancia_max)
+
+
+def test_reuso_aproximado_vem_desligado(tmp_path):
+    if os.getenv("PULSENLP_SENTIMENT_NEAR_DUP"):
+        pytest.skip("PULSENLP_SENTIMENT_NEAR_DUP definido no ambiente")
+    assert DISTANCIA_MAX == 0
+    cache = SentimentCache("modelo-teste", path=str(tmp_path / "cache.db"), max_entradas=100)
+    cache.guardar_muitos(["Eu recomendo esse produto para todos."], [0.9])
+    assert cache.buscar_muitos(["eu recomendo esse produto, para todos"]) == {}
+
+
+@pytest.mark.parametrize("original, oposto", PARES_OPOSTOS)
+def test_negacao_e_polaridade_nunca_reaproveitam_o_score(tmp_path, original, oposto):
+    distancia = bin(simhash(_tokens(original)) ^ simhash(_tokens(oposto))).count("1")
+    # Limite folgado o bastante para o par ser candidato: quem barra é a diferença por tokens
+    cache = _cache(tmp_path, distancia_max=max(distancia, 1))
+    cache.guardar_muitos([original], [0.9])
+    assert cache.buscar_muitos([oposto]) == {}
+    assert cache.aproximados == 0
+
+
+def test_diferenca_so_de_pontuacao_e_caixa_reaproveita(tmp_path):
+    cache = _cache(tmp_path, distancia_max=3)
+    cache.guardar_muitos(["Eu recomendo esse produto para todos."], [0.9])
+    assert cache.buscar_muitos(["eu recomendo esse produto, para   todos"]) == {0: 0.9}
+    assert cache.aproximados == 1
+
+
+def test_diferenca_neutra():
+    assert diferenca_neutra(["o", "ônibus", "atrasou", "hoje"], ["o", "ônibus", "atrasou", "ontem"])
+    assert diferenca_neutra(["bom", "dia", ","], ["bom", "dia", "."])
+    assert not diferenca_neutra(["eu", "recomendo"], ["eu", "não", "recomendo"])
+    assert not diferenca_neutra(["foi", "bom"], ["foi", "bom", "!"])
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+from pulsenlp.nlp_module import sentiment, sentiment_executor
+from pulsenlp.nlp_module.sentiment_executor import SentimentExecutor
+
+
+def test_modo_desconhecido():
+    with pytest.raises(ValueError):
+        SentimentExecutor(mode="gpu")
+
+
+def test_modo_thread_pontua_fora_do_event_loop(monkeypatch):
+    threads = []
+
+    def pontuar(texto):
+        threads.append(threading.current_thread())
+        return len(texto) / 10
+
+    monkeypatch.setattr(sentiment_executor, "_pontuar_no_worker", pontuar)
+    executor = SentimentExecutor(mode="thread", max_workers=2)
+
+    async def cenario():
+        return threading.current_thread(), await asyncio.gather(executor.ascore("bom"), executor.ascore("ótimo"))
+
+    try:
+        thread_do_loop, scores = asyncio.run(cenario())
+    finally:
+        executor.shutdown()
+    assert scores == [0.3, 0.5]
+    assert threads and all(t is not thread_do_loop for t in threads)
+
+
+def test_modo_thread_repassa_a_excecao(monkeypatch):
+    def pontuar(texto):
+        raise RuntimeError("modelo indisponível")
+
+    monkeypatch.setattr(sentiment_executor, "_pontuar_no_worker", pontuar)
+    executor = SentimentExecutor(mode="thread")
+    try:
+        with pytest.raises(RuntimeError, match="modelo indisponível"):
+            asyncio.run(executor.ascore("bom"))
+    finally:
+        executor.shutdown()
+
+
+class _BatcherFalso:
+    # Resolve cada Future numa thread separada, como a thread de inferência do MicroBatcher
+    def __init__(self, pontuar):
+        self.pontuar = pontuar
+
+    def submit(self, texto):
+        futuro = Future()
+
+        def resolver():
+            try:
+                futuro.set_result(self.pontuar(texto))
+            except Exception as e:
+                futuro.set_exception(e)
+
+        threading.Thread(target=resolver).start()
+        return futuro
+
+
+def test_modo_batch_aguarda_o_future_do_batcher(monkeypatch):
+    monkeypatch.setattr(sentiment, "get_sentiment_batcher", lambda: _BatcherFalso(lambda texto: 0.25))
+    executor = SentimentExecutor(mode="batch")
+    assert asyncio.run(executor.ascore("bom")) == 0.25
+
+
+def test_modo_batch_repassa_a_excecao(monkeypatch):
+    def pontuar(texto):
+        raise ValueError("lote inválido")
+
+    monkeypatch.setattr(sentiment, "get_sentiment_batcher", lambda: _BatcherFalso(pontuar))
+    executor = SentimentExecutor(mode="batch")
+    with pytest.raises(ValueError, match="lote inválido"):
+        asyncio.run(executor.ascore("bom"))
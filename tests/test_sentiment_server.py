@@ -0,0 +1,62 @@
+import os
+import stat
+from concurrent.futures import Future
+
+import pytest
+
+from pulsenlp.nlp_module import sentiment, sentiment_server
+from pulsenlp.nlp_module.sentiment_server import ErroServidorSentimento, SentimentClient, iniciar_servidor, parar_servidor
+
+
+class _Batcher:
+    def __init__(self, falhar=False):
+        self.falhar = falhar
+
+    def submit(self, texto):
+        futuro = Future()
+        if self.falhar:
+            futuro.set_exception(RuntimeError("modelo indisponível"))
+        else:
+            futuro.set_result(len(texto) / 10)
+        return futuro
+
+
+@pytest.fixture
+def servidor(tmp_path, monkeypatch):
+    caminho = str(tmp_path / "sock" / "sentiment.sock")
+    batcher = _Batcher()
+    monkeypatch.setattr(sentiment, "get_sentiment_batcher", lambda: batcher)
+    assert iniciar_servidor(caminho) is not None
+    yield caminho, batcher
+    parar_servidor()
+
+
+def test_socket_nasce_so_para_o_dono(servidor):
+    caminho, _ = servidor
+    assert stat.S_IMODE(os.stat(caminho).st_mode) == 0o600
+    assert SentimentClient(caminho).score_many(["abc", "abcdefghij"]) == [0.3, 1.0]
+
+
+def test_erro_do_servidor_vira_oserror_e_cai_no_modelo_local(servidor, monkeypatch):
+    caminho, batcher = servidor
+    batcher.falhar = True
+    cliente = SentimentClient(caminho)
+    with pytest.raises(ErroServidorSentimento):
+        cliente.score_many(["abc"])
+
+    monkeypatch.setattr(sentiment_server, "get_sentiment_client", lambda: cliente)
+    monkeypatch.setattr(sentiment_server, "_indisponivel_ate", 0.0)
+    assert sentiment._analisar_remoto(["abc"]) is None
+
+
+def test_caminho_inutilizavel_nao_derruba_a_inicializacao(tmp_path, monkeypatch, capsys):
+    caminho = str(tmp_path / "sentiment.sock")
+    open(caminho, "w").close()
+
+    def sem_permissao(_):
+        raise PermissionError(1, "Operation not permitted")
+
+    monkeypatch.setattr(sentiment_server.os, "unlink", sem_permissao)
+    assert iniciar_servidor(caminho) is None
+    assert not sentiment_server.servidor_local_ativo()
+    assert "[AVISO]" in capsys.readouterr().out
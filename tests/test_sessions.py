@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+# sessions importa o gerador de comentários (agno, dotenv)
+pytest.importorskip("dotenv")
+pytest.importorskip("agno")
+
+from pulsenlp.simulation_module.sessions import FairShare
+
+
+async def _disputar(divisor, pedidos_por_sessao, rodadas):
+    concedidas = []
+
+    async def agente(sessao):
+        for _ in range(rodadas):
+            async with divisor.vaga(sessao):
+                concedidas.append(sessao)
+                await asyncio.sleep(0)
+
+    await asyncio.gather(*(agente(s) for s, n in pedidos_por_sessao.items() for _ in range(n)))
+    return concedidas
+
+
+def test_sem_fila_passa_direto():
+    async def cenario():
+        divisor = FairShare(2)
+        await divisor.acquire("a")
+        await divisor.acquire("b")
+        assert divisor._em_uso == 2
+        divisor.release()
+        divisor.release()
+        assert divisor._em_uso == 0
+
+    asyncio.run(cenario())
+
+
+def test_divide_pelo_peso_e_nao_pelo_numero_de_agentes():
+    divisor = FairShare(1)
+    divisor.definir_peso("grande", 1)
+    divisor.definir_peso("pequena", 1)
+    # 10 agentes contra 2, mesmo peso: as vagas disputadas se alternam
+    concedidas = asyncio.run(_disputar(divisor, {"grande": 10, "pequena": 2}, rodadas=5))
+    primeiras = concedidas[:20]
+    assert abs(primeiras.count("grande") - primeiras.count("pequena")) <= 2
+    assert divisor._em_uso == 0
+
+
+def test_cancelamento_na_fila_nao_vaza_vaga():
+    async def cenario():
+        divisor = FairShare(1)
+        await divisor.acquire("a")
+        esperando = asyncio.create_task(divisor.acquire("b"))
+        await asyncio.sleep(0)
+        esperando.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await esperando
+        divisor.release()
+        assert divisor._em_uso == 0
+        await asyncio.wait_for(divisor.acquire("c"), 1)
+        assert divisor._em_uso == 1
+
+    asyncio.run(cenario())
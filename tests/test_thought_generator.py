@@ -0,0 +1,146 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+# O gerador de comentários depende do agno e do dotenv
+pytest.importorskip("dotenv")
+pytest.importorskip("agno")
+
+from pulsenlp.simulation_module import rate_limit, thought_generator
+from pulsenlp.simulation_module.model_scheduler import ModelScheduler, NenhumModeloDisponivel
+from pulsenlp.simulation_module.thought_generator import UserAgent
+from pulsenlp.simulation_module.user_profiles import UserProfile
+
+
+@pytest.fixture
+def limites(monkeypatch):
+    # Semáforo, limitadores e scheduler novos a cada teste (e a cada event loop)
+    monkeypatch.setattr(rate_limit, "_semaforo", None)
+    monkeypatch.setattr(rate_limit, "_limitadores", {})
+    monkeypatch.setattr(rate_limit, "LLM_REQUESTS_PER_MINUTE", 60_000)
+    schedulers = {}
+
+    def get_model_scheduler(modelos):
+        chave = tuple(modelos)
+        if chave not in schedulers:
+            schedulers[chave] = ModelScheduler(modelos)
+        return schedulers[chave]
+
+    monkeypatch.setattr(thought_generator, "get_model_scheduler", get_model_scheduler)
+    monkeypatch.setattr(ModelScheduler, "backoff", staticmethod(lambda tentativa, **kwargs: 0.0))
+    return monkeypatch
+
+
+def _agente(modelos, resposta):
+    agente = UserAgent(UserProfile.generate_random())
+    agente.models = list(modelos)
+    agente.current = 0
+    agente.arun = resposta
+    return agente
+
+
+def test_respeita_o_teto_de_concorrencia(limites):
+    limites.setattr(rate_limit, "MAX_LLM_CONCURRENCY", 2)
+    ativas = {"agora": 0, "max": 0}
+
+    async def resposta(prompt):
+        ativas["agora"] += 1
+        ativas["max"] = max(ativas["max"], ativas["agora"])
+        await asyncio.sleep(0.01)
+        ativas["agora"] -= 1
+        return SimpleNamespace(content="ok")
+
+    async def cenario():
+        agentes = [_agente(["a"], resposta) for _ in range(6)]
+        return await asyncio.gather(*(a.agenerate_thought("futebol") for a in agentes))
+
+    assert asyncio.run(cenario()) == ["ok"] * 6
+    assert ativas["max"] == 2
+
+
+def test_modelo_limitado_nao_segura_vagas_de_outros_modelos(limites):
+    limites.setattr(rate_limit, "MAX_LLM_CONCURRENCY", 1)
+
+    async def resposta(prompt):
+        return SimpleNamespace(content="ok")
+
+    async def cenario():
+        # Balde do modelo "lento" vazio: o próximo token só sai daqui a 10 s
+        lento = rate_limit.get_rate_limiter("lento")
+        lento._tokens, lento.rate = 0.0, 0.1
+        esperando = asyncio.create_task(_agente(["lento"], resposta).agenerate_thought("futebol"))
+        await asyncio.sleep(0.01)
+        inicio = time.monotonic()
+        resultado = await asyncio.wait_for(_agente(["rapido"], resposta).agenerate_thought("futebol"), 1)
+        duracao = time.monotonic() - inicio
+        esperando.cancel()
+        await asyncio.gather(esperando, return_exceptions=True)
+        return resultado, duracao
+
+    resultado, duracao = asyncio.run(cenario())
+    assert resultado == "ok"
+    assert duracao < 0.5
+
+
+def test_falha_troca_de_modelo_com_backoff(limites):
+    esperas = []
+    limites.setattr(ModelScheduler, "backoff", staticmethod(lambda tentativa, **kwargs: esperas.append(tentativa) or 0.0))
+    chamadas = []
+
+    async def cenario():
+        agente = _agente(["a", "b"], None)
+
+        async def resposta(prompt):
+            chamadas.append(agente.models[agente.current])
+            if agente.models[agente.current] == "a":
+                raise RuntimeError("429")
+            return SimpleNamespace(content="ok")
+
+        agente.arun = resposta
+        return await agente.agenerate_thought("futebol")
+
+    assert asyncio.run(cenario()) == "ok"
+    assert chamadas == ["a", "b"]
+    assert esperas == [0]
+
+
+def test_todas_as_tentativas_falham(limites):
+    limites.setattr(thought_generator, "MAX_TENTATIVAS", 3)
+    esperas = []
+    limites.setattr(ModelScheduler, "backoff", staticmethod(lambda tentativa, **kwargs: esperas.append(tentativa) or 0.0))
+
+    async def resposta(prompt):
+        raise RuntimeError("fora do ar")
+
+    with pytest.raises(NenhumModeloDisponivel):
+        asyncio.run(_agente(["a", "b", "c", "d"], resposta).agenerate_thought("futebol"))
+    # Sem espera depois da última tentativa
+    assert esperas == [0, 1]
+
+
+def test_vaga_da_sessao_fica_livre_durante_o_backoff(limites):
+    from pulsenlp.simulation_module.sessions import FairShare
+
+    divisor = FairShare(1)
+    limites.setattr(ModelScheduler, "backoff", staticmethod(lambda tentativa, **kwargs: 0.3))
+    falhas = []
+
+    async def resposta(prompt):
+        if not falhas:
+            falhas.append(prompt)
+            raise RuntimeError("429")
+        return SimpleNamespace(content="ok")
+
+    async def cenario():
+        tentando = asyncio.create_task(
+            _agente(["a", "b"], resposta).agenerate_thought("futebol", vaga=lambda: divisor.vaga("presa")))
+        await asyncio.sleep(0.05)
+        # A primeira sessão está no backoff: a outra consegue a única vaga
+        await asyncio.wait_for(divisor.acquire("outra"), 0.1)
+        divisor.release()
+        return await tentando
+
+    assert asyncio.run(cenario()) == "ok"
+    assert divisor._em_uso == 0
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+from pulsenlp.nlp_module import topics
+from pulsenlp.nlp_module.topics import TopicEngine
+
+CORPUS = [
+    "gol jogo time campeonato torcida",
+    "time gol estadio jogo juiz",
+    "imposto juros inflacao mercado banco",
+    "banco juros mercado dolar imposto",
+] * 4
+
+
+@pytest.fixture(autouse=True)
+def lemas_por_palavra(monkeypatch):
+    # Sem o modelo do spaCy: cada palavra é o próprio lema
+    monkeypatch.setattr(topics, "process", lambda texto: texto.split())
+    monkeypatch.setattr(topics, "process_batch", lambda textos: [t.split() for t in textos])
+
+
+def _arquivos(path):
+    return {nome: os.path.getmtime(os.path.join(path, nome)) for nome in os.listdir(path)}
+
+
+def test_inferir_nao_altera_o_modelo(tmp_path):
+    engine = TopicEngine(num_topics=2, path=str(tmp_path))
+    engine.update(CORPUS)
+    dfs = dict(engine.dicionario.dfs_debug)
+    salvos = _arquivos(tmp_path)
+
+    assert engine.inferir("gol time torcida novidade") is not None
+    assert engine.dicionario.dfs_debug == dfs
+    assert _arquivos(tmp_path) == salvos
+
+
+def test_detect_topic_nao_grava_o_modelo_persistente(tmp_path, monkeypatch):
+    engine = TopicEngine(num_topics=2, path=str(tmp_path))
+    engine.update(CORPUS)
+    salvos = _arquivos(tmp_path)
+    monkeypatch.setattr(topics, "_engine", engine)
+
+    palavras = topics.detect_topic(["gol jogo time", "juros banco"])
+    assert palavras and all('*"' in p for p in palavras)
+    assert _arquivos(tmp_path) == salvos
+
+
+def test_detect_topic_sem_modelo_salvo_usa_modelo_temporario(tmp_path, monkeypatch):
+    engine = TopicEngine(num_topics=2, path=str(tmp_path / "modelo"))
+    monkeypatch.setattr(topics, "_engine", engine)
+    assert topics.detect_topic(CORPUS)
+    assert engine.modelo is None
+    assert not os.path.exists(tmp_path / "modelo")
+
+
+def test_recarregado_religa_o_dicionario(tmp_path):
+    TopicEngine(num_topics=2, path=str(tmp_path)).update(CORPUS)
+
+    recarregado = TopicEngine(num_topics=2, path=str(tmp_path))
+    assert recarregado.modelo.id2word is recarregado.dicionario
+    recarregado.update(["palavra inedita gol"])
+    assert recarregado.modelo.id2word is recarregado.dicionario
@@ -0,0 +1,110 @@
+import base64
+import io
+from collections import Counter
+
+import pandas as pd
+import pytest
+from PIL import Image
+
+import pulsenlp.wordcloud_gen as wordcloud_gen
+from pulsenlp.wordcloud_gen import PRESETS_NUVEM, FrequenciasIncrementais, RenderizadorNuvem
+
+
+@pytest.fixture
+def lemas_por_palavra(monkeypatch):
+    # Sem o modelo do spaCy: cada palavra é o próprio lema
+    chamadas = []
+
+    def process_batch(textos):
+        chamadas.append(list(textos))
+        return [t.lower().split() for t in textos]
+
+    monkeypatch.setattr(wordcloud_gen, "process_batch", process_batch)
+    return chamadas
+
+
+def test_conta_so_os_textos_novos(lemas_por_palavra):
+    frequencias = FrequenciasIncrementais()
+    frequencias.atualizar(["gol bonito", "gol"], identidade=1)
+    contagem = frequencias.atualizar(["gol bonito", "gol", "jogo bonito"], identidade=1)
+    assert contagem["gol"] == 2
+    assert contagem["bonito"] == 2
+    assert lemas_por_palavra[-1] == ["jogo bonito"]
+
+
+def test_serie_nao_e_copiada_a_cada_atualizacao(lemas_por_palavra):
+    class SerieSemCopia(list):
+        # list(textos) no caminho incremental copiaria a série inteira a cada tick
+        def __iter__(self):
+            raise AssertionError("a série inteira foi percorrida")
+
+    frequencias = FrequenciasIncrementais()
+    frequencias.atualizar(pd.Series(["gol", "jogo"]), identidade=1)
+    contagem = frequencias.atualizar(SerieSemCopia(["gol", "jogo", "gol bonito"]), identidade=1)
+    assert contagem["gol"] == 2
+    assert lemas_por_palavra[-1] == ["gol bonito"]
+
+
+def test_nova_identidade_recomeca_mesmo_com_o_mesmo_ultimo_texto(lemas_por_palavra):
+    frequencias = FrequenciasIncrementais()
+    frequencias.atualizar(["gol", "final"], identidade=1)
+    # Log reescrito com o mesmo texto final: só a identidade denuncia a troca
+    contagem = frequencias.atualizar(["juiz", "final"], identidade=2)
+    assert contagem["gol"] == 0
+    assert contagem["juiz"] == 1
+    assert contagem["final"] == 1
+
+
+def test_placeholder_substituido_pelos_dados(lemas_por_palavra):
+    frequencias = FrequenciasIncrementais()
+    frequencias.atualizar(["arroba"], identidade=None)
+    contagem = frequencias.atualizar(["primeiro comentario"], identidade=1)
+    assert "arroba" not in contagem
+    assert contagem["primeiro"] == 1
+
+
+def test_stopwords_e_pontuacao_removidas(lemas_por_palavra):
+    assert wordcloud_gen.lemas_dos_textos(["The gol!", "gol"]) == [["gol"], ["gol"]]
+    # Textos repetidos vão uma vez só para o spaCy
+    assert lemas_por_palavra[-1] == ["The gol", "gol"]
+
+
+def _abrir(src):
+    cabecalho, dados = src.split(",", 1)
+    return cabecalho, Image.open(io.BytesIO(base64.b64decode(dados)))
+
+
+@pytest.mark.parametrize("formato, pil", [("png", "PNG"), ("webp", "WEBP"), ("jpeg", "JPEG")])
+def test_formatos_de_saida(formato, pil):
+    _, src = RenderizadorNuvem(preset="baixa", formato=formato).renderizar(Counter({"gol": 3, "jogo": 1}))
+    cabecalho, imagem = _abrir(src)
+    assert cabecalho == f"data:image/{formato};base64"
+    assert imagem.format == pil
+
+
+@pytest.mark.parametrize("preset", list(PRESETS_NUVEM))
+def test_presets_definem_o_tamanho(preset):
+    _, src = RenderizadorNuvem(preset=preset, formato="png").renderizar(Counter({"gol": 3, "jogo": 1}))
+    _, imagem = _abrir(src)
+    assert imagem.size == (PRESETS_NUVEM[preset]["width"], PRESETS_NUVEM[preset]["height"])
+
+
+def test_preset_ou_formato_desconhecido():
+    with pytest.raises(ValueError):
+        RenderizadorNuvem(preset="gigante")
+    with pytest.raises(ValueError):
+        RenderizadorNuvem(formato="gif")
+
+
+def test_frequencias_iguais_nao_renderizam_de_novo(monkeypatch):
+    renderizador = RenderizadorNuvem(preset="baixa", formato="png")
+    chave, src = renderizador.renderizar(Counter({"gol": 3, "jogo": 1}))
+
+    def sem_render(*args, **kwargs):
+        raise AssertionError("renderizou de novo")
+
+    monkeypatch.setattr(wordcloud_gen, "WordCloud", sem_render)
+    # Mesmas palavras (outra instância do Counter): mesmo hash e a imagem guardada
+    assert renderizador.renderizar(Counter({"jogo": 1, "gol": 3})) == (chave, src)
+    with pytest.raises(AssertionError):
+        renderizador.renderizar(Counter({"gol": 4, "jogo": 1}))